@@ -0,0 +1 @@
+"""Benchmark suite and mock federal API server for Federal API Vault."""
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Entity History Store Scale Check
+Upserts a synthetic portfolio into a fresh EntityStore twice (the second run with
+a fraction of statuses changed), then times portfolio queries. No network.
+
+Usage:
+    python benchmarks/entity_history_scale.py [--entities 100000] [--changed 0.05]
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from datetime import date, timedelta
+from typing import Dict, Any, List, Callable
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from benchmarks.entity_memory import statuses
+from sam.entity_store import EntityStore
+
+
+def timed(fn: Callable[[], Any], repeat: int = 5) -> Dict[str, Any]:
+    """Best of `repeat` runs, in milliseconds."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return {"ms": best * 1000, "rows": len(result) if isinstance(result, list) else result}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk upsert and query the entity history store")
+    parser.add_argument("--entities", type=int, default=100000)
+    parser.add_argument("--changed", type=float, default=0.05, help="Fraction changed in the second run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records: List[Dict[str, Any]] = list(statuses(args.entities))
+    # Spread expirations over the next two years so "expiring soon" is a real subset
+    today = date.today()
+    for record in records:
+        record["expiration_date"] = (today + timedelta(days=rng.randint(-30, 730))).isoformat()
+
+    results: Dict[str, Any] = {"entities": args.entities}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EntityStore(f"sqlite:///{tmp}/vault.db")
+
+        started = time.perf_counter()
+        results["first_run"] = store.upsert_many(records, run_id="run-1")
+        results["first_run_seconds"] = time.perf_counter() - started
+
+        for record in rng.sample(records, int(len(records) * args.changed)):
+            record["registration_status"] = "Expired"
+            record["is_active"] = False
+        started = time.perf_counter()
+        results["second_run"] = store.upsert_many(records, run_id="run-2")
+        results["second_run_seconds"] = time.perf_counter() - started
+
+        sample = records[len(records) // 2]
+        results["queries"] = {
+            "expiring_within_30": timed(lambda: store.expiring_within(30)),
+            "get": timed(lambda: [store.get(sample["uei"])]),
+            "by_cage": timed(lambda: store.by_cage(sample["cage"])),
+            "history": timed(lambda: store.history(sample["uei"])),
+            "counts": timed(lambda: [store.counts()])
+        }
+
+    print(f"{args.entities:,} entities")
+    print(f"  first run:  {results['first_run_seconds']:.2f}s  {results['first_run']}")
+    print(f"  second run: {results['second_run_seconds']:.2f}s  {results['second_run']}")
+    for name, row in results["queries"].items():
+        print(f"  {name:<20} {row['ms']:8.2f} ms  ({row['rows']} rows)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
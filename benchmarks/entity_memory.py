@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Entity Portfolio Memory
+Measures bytes per entity for status records held as a list of dicts (what
+validate_entity_status returns) and as a compact EntityTable, and checks that
+every table row reproduces its dict. No network.
+
+Usage:
+    python benchmarks/entity_memory.py [--entities 500000] [--output results.json]
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from typing import Dict, Any, List, Iterator
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.mock_server import make_entity
+from sam.client import entity_status
+from sam.entity_table import EntityTable
+from utils import codec
+
+
+def statuses(count: int) -> Iterator[Dict[str, Any]]:
+    """Status dicts built from decoded API payloads, so strings are not shared."""
+    for i in range(count):
+        uei = f"MEM{i:09d}"
+        payload = codec.dumps(make_entity(uei, "entityRegistration,coreData"))
+        entity = codec.loads(payload)
+        entity["coreData"].pop("filler", None)
+        exclusions = [{"exclusionType": "Ineligible"}] if i % 50 == 0 else []
+        yield entity_status(uei, entity, exclusions)
+
+
+def measure(build) -> Dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"held": held, "bytes": current, "peak_bytes": peak, "seconds": elapsed}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bytes per entity: status dicts vs EntityTable")
+    parser.add_argument("--entities", type=int, default=500000)
+    parser.add_argument("--missing-every", type=int, default=200,
+                        help="Every Nth UEI is a not-found status (0 for none)")
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+    count = args.entities
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for i, status in enumerate(statuses(count)):
+            if args.missing_every and i % args.missing_every == 0:
+                yield entity_status(status["uei"], None, [])
+            else:
+                yield status
+
+    dicts = measure(lambda: list(records()))
+    reference: List[Dict[str, Any]] = dicts.pop("held")
+    table = measure(lambda: EntityTable(records()))
+    compact: EntityTable = table.pop("held")
+
+    mismatches = sum(1 for row, expected in zip(compact, reference) if row.to_dict() != expected)
+    results = {
+        "entities": count,
+        "dict_bytes_per_entity": dicts["bytes"] / count,
+        "table_bytes_per_entity": table["bytes"] / count,
+        "reduction": dicts["bytes"] / max(1, table["bytes"]),
+        "dict_build_seconds": dicts["seconds"],
+        "table_build_seconds": table["seconds"],
+        "interned_values": len(compact.pool),
+        "mismatched_rows": mismatches
+    }
+
+    print(f"{count:,} entity statuses")
+    print(f"  list of dicts:  {results['dict_bytes_per_entity']:8.0f} bytes/entity "
+          f"({dicts['bytes'] / 2 ** 20:.1f} MiB)")
+    print(f"  EntityTable:    {results['table_bytes_per_entity']:8.0f} bytes/entity "
+          f"({table['bytes'] / 2 ** 20:.1f} MiB, {len(compact.pool)} interned values)")
+    print(f"  {results['reduction']:.1f}x smaller; {mismatches} rows differ from their dict")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Hedged Request Tail Latency
+Sends uncached UEI lookups to a mock server where a fraction of requests stall,
+once with hedging off and once on, and reports p50/p99/max latency and the extra
+upstream requests hedging cost.
+
+Usage:
+    python benchmarks/hedging_tail.py [--requests 1000] [--stall-rate 0.03] [--stall-ms 1000]
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from typing import Dict, Any, List
+import argparse
+import json
+import time
+
+from benchmarks.mock_server import MockFederalServer, MockSettings
+from benchmarks.run_benchmarks import configure
+from config import Config
+from utils.metrics import metrics
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(server: MockFederalServer, count: int, hedge: bool) -> Dict[str, Any]:
+    from utils.http_client import SAMClient
+
+    Config.HEDGE_ENABLED = hedge
+    metrics.reset()
+    client = SAMClient()
+    before = server.requests_served
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        client.get("", params={"ueiSAM": f"HEDGE{i:07d}", "includeSections": "entityRegistration"},
+                   use_cache=False)
+        latencies.append(time.perf_counter() - started)
+    hedges = {result: int(metrics.counter_value("vault_hedged_requests_total", api="SAM", result=result))
+              for result in ("won", "lost", "failed", "capped", "no_token")}
+    return {
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "upstream_requests": server.requests_served - before,
+        "extra_request_ratio": (server.requests_served - before) / count - 1,
+        "hedges": hedges
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="p99 latency with and without hedged GETs")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall-ms", type=float, default=1000.0)
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    settings = MockSettings(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5,
+                            stall_rate=args.stall_rate, stall_ms=args.stall_ms)
+    server = MockFederalServer(settings).start()
+    configure(server.url)
+    Config.CACHE_WARM_ENABLED = False
+    results: Dict[str, Any] = {"settings": settings.to_dict()}
+    try:
+        results["unhedged"] = run(server, args.requests, hedge=False)
+        results["hedged"] = run(server, args.requests, hedge=True)
+    finally:
+        server.stop()
+
+    for label in ("unhedged", "hedged"):
+        row = results[label]
+        print(f"{label:>9}: p50 {row['p50_ms']:7.1f} ms  p99 {row['p99_ms']:7.1f} ms  "
+              f"max {row['max_ms']:7.1f} ms  extra requests {row['extra_request_ratio']:6.1%}  "
+              f"hedges {row['hedges']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
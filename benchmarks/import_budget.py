@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Startup Import Budget
+Runs short-lived entry points in fresh interpreters under `-X importtime` and fails
+when the modules they import cost more than their budget, or when they pull in a
+module they should never need (e.g. `requests` for a pure IRS validation).
+
+Usage:
+    python benchmarks/import_budget.py [--runs 5] [--budget-scale 1.0] [--output results.json]
+
+Only modules imported beyond a bare interpreter are counted, so site-packages
+start-up hooks do not skew the numbers. Each scenario is run once to write bytecode
+to a scratch PYTHONPYCACHEPREFIX before it is timed, so the budget measures import
+cost as installed (with .pyc files) rather than compiling source, which a checkout
+without __pycache__ would otherwise pay on every launch.
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from statistics import median
+from typing import Dict, Any, List, Set, Tuple
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+
+
+# name -> (interpreter args, import budget in ms, modules that must not be imported)
+SCENARIOS: Dict[str, Tuple[List[str], float, Tuple[str, ...]]] = {
+    "cli_usage": ([str(REPO_ROOT / "scripts" / "run.py")], 25.0, ("requests", "dotenv", "workflows")),
+    "cli_test": ([str(REPO_ROOT / "scripts" / "run.py"), "test"], 40.0, ("requests", "workflows")),
+    "irs_validate": (["-c", "from irs.client import validate_ein; validate_ein('12-3456789')"],
+                     10.0, ("requests", "config")),
+    "import_utils": (["-c", "import utils"], 15.0, ("requests", "http.server")),
+    "import_workflows": (["-c", "import workflows"], 5.0, ("requests", "workflows.implementations")),
+    "workflow_modules": (["-c", "import workflows.implementations"], 60.0, ("requests",)),
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Module -> self time in microseconds from `-X importtime` output."""
+    modules: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        modules[parts[2].strip()] = int(parts[0])
+    return modules
+
+
+def run_once(args: List[str], cwd: str, write_bytecode: bool = False) -> Dict[str, int]:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT), PYTHONPYCACHEPREFIX=os.path.join(cwd, "pycache"))
+    if write_bytecode:
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+    else:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return parse_importtime(proc.stderr)
+
+
+def measure(args: List[str], baseline: Set[str], runs: int, cwd: str) -> Dict[str, Any]:
+    samples = []
+    imported: Set[str] = set()
+    run_once(args, cwd, write_bytecode=True)
+    for _ in range(runs):
+        modules = run_once(args, cwd)
+        extra = {name: us for name, us in modules.items() if name not in baseline}
+        imported |= set(extra)
+        samples.append(sum(extra.values()) / 1000)
+    return {"import_ms": median(samples), "samples_ms": samples, "modules": sorted(imported)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail when CLI/library startup exceeds its import budget")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter launches per scenario (median is used)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    parser.add_argument("--only", default="", help="Comma-separated scenario names")
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    selected = [s for s in args.only.split(",") if s] or list(SCENARIOS)
+    unknown = [s for s in selected if s not in SCENARIOS]
+    if unknown:
+        print(f"❌ Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(SCENARIOS)}")
+        return 2
+
+    results: Dict[str, Any] = {}
+    failures = 0
+    # Scratch cwd (and bytecode cache) so entry points that touch data/ do not write into the repo
+    with tempfile.TemporaryDirectory() as cwd:
+        run_once(["-c", "pass"], cwd, write_bytecode=True)
+        baseline = set(run_once(["-c", "pass"], cwd))
+        for name in selected:
+            scenario_args, budget, forbidden = SCENARIOS[name]
+            budget *= args.budget_scale
+            result = measure(scenario_args, baseline, max(1, args.runs), cwd)
+            leaked = [m for m in forbidden if m in result["modules"]]
+            ok = result["import_ms"] <= budget and not leaked
+            failures += not ok
+            results[name] = {
+                "import_ms": round(result["import_ms"], 2),
+                "budget_ms": budget,
+                "modules": len(result["modules"]),
+                "forbidden_imported": leaked,
+                "ok": ok
+            }
+            note = f"  imported {', '.join(leaked)}" if leaked else ""
+            print(f"{'✅' if ok else '❌'} {name:<18} {result['import_ms']:7.1f} ms "
+                  f"(budget {budget:.0f} ms, {len(result['modules'])} modules){note}")
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+
+    if failures:
+        print(f"\n❌ {failures} scenario(s) over budget")
+        return 1
+    print("\n✅ All startup scenarios within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Opportunity Matching Scale Check
+Builds the matching index over synthetic notices, matches synthetic entity profiles
+against it, then folds in a batch of new notices incrementally. No network.
+
+Usage:
+    python benchmarks/matching_scale.py [--entities 10000] [--notices 500000] [--new 5000]
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from datetime import date, timedelta
+from typing import Dict, Any, List
+import argparse
+import json
+import random
+import time
+
+from workflows.matching import EntityProfile, MatchingEngine, OpportunityIndex, SET_ASIDE_CODES
+
+
+SET_ASIDES = ["", "", "", "SBA", "SBP", "8A", "8AN", "HZC", "WOSB", "EDWOSB", "SDVOSBC"]
+
+
+def make_notices(count: int, naics_pool: List[str], agencies: List[str], rng: random.Random,
+                 start: int = 0) -> List[Dict[str, Any]]:
+    today = date.today()
+    deadlines = [(today + timedelta(days=d)).isoformat() + "T17:00:00-04:00" for d in range(-10, 90)]
+    return [
+        {
+            "notice_id": f"N{start + i:09d}",
+            "title": f"Requirement {start + i}",
+            "agency": rng.choice(agencies),
+            "naics_code": rng.choice(naics_pool),
+            "set_aside": rng.choice(SET_ASIDES),
+            "response_deadline": rng.choice(deadlines)
+        }
+        for i in range(count)
+    ]
+
+
+def make_profiles(count: int, naics_pool: List[str], agencies: List[str],
+                  rng: random.Random) -> List[EntityProfile]:
+    flags = list(SET_ASIDE_CODES)
+    profiles = []
+    for i in range(count):
+        held = [flag for flag in flags if rng.random() < 0.25]
+        profiles.append(EntityProfile(
+            f"UEI{i:09d}",
+            naics=rng.sample(naics_pool, rng.randint(1, 5)),
+            set_asides=[code for flag in held for code in SET_ASIDE_CODES[flag]],
+            agencies=rng.sample(agencies, 2) if rng.random() < 0.3 else (),
+            eligible=rng.random() > 0.05
+        ))
+    return profiles
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time opportunity matching at scale")
+    parser.add_argument("--entities", type=int, default=10000)
+    parser.add_argument("--notices", type=int, default=500000)
+    parser.add_argument("--new", type=int, default=5000, help="Notices added after the full match")
+    parser.add_argument("--naics", type=int, default=400, help="Distinct NAICS codes")
+    parser.add_argument("--limit", type=int, default=25, help="Matches kept per entity")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    naics_pool = [str(541000 + i) for i in range(args.naics)]
+    agencies = [f"AGENCY {i}" for i in range(60)]
+    notices = make_notices(args.notices, naics_pool, agencies, rng)
+    profiles = make_profiles(args.entities, naics_pool, agencies, rng)
+    results: Dict[str, Any] = {"entities": args.entities, "notices": args.notices, "new": args.new}
+
+    engine = MatchingEngine(index=OpportunityIndex(), limit=args.limit, min_days_to_respond=7)
+    engine.set_profiles(profiles)
+
+    started = time.perf_counter()
+    engine.index.add_many(notices)
+    results["index_seconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results["matches"] = engine.match_all()
+    results["match_all_seconds"] = time.perf_counter() - started
+
+    fresh = make_notices(args.new, naics_pool, agencies, rng, start=args.notices)
+    started = time.perf_counter()
+    engine.add_opportunities(fresh)
+    results["incremental_seconds"] = time.perf_counter() - started
+
+    print(f"Index {args.notices:,} notices:        {results['index_seconds']:.2f}s")
+    print(f"Match {args.entities:,} entities:        {results['match_all_seconds']:.2f}s "
+          f"({results['matches']:,} matches)")
+    print(f"Fold in {args.new:,} new notices:    {results['incremental_seconds']:.2f}s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
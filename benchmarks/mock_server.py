@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the SAM entity, SAM opportunities and BLS endpoints.
+Responses are deterministic per identifier; latency, error rates, 429 throttling
+and payload sizes are configurable so benchmarks can emulate upstream behavior.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse, parse_qs
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+
+
+SET_ASIDES = ["8A", "WOSB", "HUBZone", "SBA", "SDVOSBC", ""]
+AGENCIES = ["DEPT OF DEFENSE", "GENERAL SERVICES ADMINISTRATION", "DEPT OF VETERANS AFFAIRS",
+            "DEPT OF HOMELAND SECURITY", "DEPT OF ENERGY", "DEPT OF HEALTH AND HUMAN SERVICES"]
+NAICS_POOL = ["541511", "541512", "541519", "541611", "541330", "561210", "236220", "518210"]
+STATES = ["VA", "MD", "DC", "TX", "CA", "FL", "GA", "NY"]
+
+
+def _digest(value: str) -> int:
+    return int(hashlib.md5(value.encode()).hexdigest()[:8], 16)
+
+
+class MockSettings:
+    """Tunable upstream behavior."""
+
+    def __init__(self, latency_ms: float = 2.0, jitter_ms: float = 1.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, rps_limit: float = 0.0, payload_bytes: int = 0,
+                 notices_total: int = 100000, seed: int = 7, compress: bool = True,
+                 name_matches: int = 0, stall_rate: float = 0.0, stall_ms: float = 1000.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rps_limit = rps_limit
+        self.payload_bytes = payload_bytes
+        self.notices_total = notices_total
+        self.seed = seed
+        # gzip bodies over 1 KB when the client sends Accept-Encoding: gzip
+        self.compress = compress
+        # Entities matching any name search, paged by page/size; 0 returns one page of `size`
+        self.name_matches = name_matches
+        # Fraction of requests that stall for stall_ms first (a slow upstream node)
+        self.stall_rate = stall_rate
+        self.stall_ms = stall_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def make_entity(uei: str, sections: str, payload_bytes: int = 0) -> Optional[Dict[str, Any]]:
+    """Deterministic SAM entity record for a UEI. UEIs starting with MISSING are not found."""
+    if uei.startswith("MISSING"):
+        return None
+
+    h = _digest(uei)
+    entity: Dict[str, Any] = {}
+    if "coreData" in sections or "entityRegistration" in sections:
+        entity["entityRegistration"] = {
+            "ueiSAM": uei,
+            "cageCode": f"{h % 100000:05d}",
+            "legalBusinessName": f"Benchmark Solutions {h % 9973} LLC",
+            "registrationStatus": "Expired" if h % 10 == 0 else "Active",
+            "registrationDate": f"20{15 + h % 8}-0{1 + h % 9}-15",
+            "expirationDate": f"20{25 + h % 3}-{1 + h % 12:02d}-{1 + h % 28:02d}"
+        }
+        entity["coreData"] = {
+            "ueiSAM": uei,
+            "cageCode": f"{h % 100000:05d}",
+            "legalBusinessName": f"Benchmark Solutions {h % 9973} LLC",
+            "dbaName": f"BSL {h % 997}" if h % 3 == 0 else None,
+            "entityStructureCode": ["2L", "2J", "2K", "8H"][h % 4],
+            "physicalAddress": {
+                "addressLine1": f"{h % 9000 + 100} Main St",
+                "city": "Arlington",
+                "stateOrProvinceCode": STATES[h % len(STATES)],
+                "zipCode": f"{20000 + h % 9999}",
+                "countryCode": "USA"
+            },
+            "filler": "x" * payload_bytes
+        }
+    if "assertions" in sections:
+        entity["assertions"] = {
+            "goodsAndServices": {
+                "primaryNaics": NAICS_POOL[h % len(NAICS_POOL)],
+                "naicsList": [{"naicsCode": NAICS_POOL[(h + i) % len(NAICS_POOL)]} for i in range(3)],
+                "sbaBusinessTypeCode": "8A" if h % 7 == 0 else None,
+                "hubZoneCertified": h % 11 == 0,
+                "womenOwnedSmallBusiness": h % 5 == 0,
+                "isSmallBusiness": h % 2 == 0
+            }
+        }
+    if "exclusionDetails" in sections:
+        exclusions = [{"exclusionType": "Ineligible", "activeDate": "2024-01-01"}] if h % 50 == 0 else []
+        entity["exclusionDetails"] = {"exclusions": exclusions}
+    return entity
+
+
+def make_opportunity(index: int, naics: str = "", set_aside: str = "",
+                     payload_bytes: int = 0) -> Dict[str, Any]:
+    """Deterministic opportunity notice for a position in the result set."""
+    h = _digest(f"{naics}|{set_aside}|{index}")
+    return {
+        "noticeId": f"{h:08x}{index:08d}",
+        "title": f"Benchmark services requirement {index}",
+        "solicitationNumber": f"SOL-{h % 1000000:06d}",
+        "department": AGENCIES[h % len(AGENCIES)],
+        "officeAddress": {"city": "Washington", "state": "DC"},
+        "postedDate": f"2026-{1 + h % 9:02d}-{1 + h % 28:02d}",
+        "responseDeadLine": f"2026-{10 + h % 3}-{1 + h % 28:02d}T17:00:00-04:00",
+        "naicsCode": naics or NAICS_POOL[h % len(NAICS_POOL)],
+        "typeOfSetAside": set_aside or SET_ASIDES[h % len(SET_ASIDES)],
+        "classificationCode": "D302",
+        "uiLink": f"https://sam.gov/opp/{h:08x}/view",
+        "description": ("Provide services. " * 20) + ("y" * payload_bytes)
+    }
+
+
+def make_series(series_id: str, start_year: int, end_year: int) -> Dict[str, Any]:
+    """Monthly BLS observations, newest first like the real API."""
+    base = 3.0 + (_digest(series_id) % 60) / 10
+    data = []
+    for year in range(end_year, start_year - 1, -1):
+        for month in range(12, 0, -1):
+            value = base + ((year * 12 + month) % 17) / 10
+            data.append({"year": str(year), "period": f"M{month:02d}",
+                         "periodName": "", "value": f"{value:.1f}", "footnotes": [{}]})
+    return {"seriesID": series_id, "data": data}
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.time()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class MockFederalServer:
+    """Threaded HTTP server emulating the federal endpoints the vault calls.
+
+    Routes: GET /entities, GET /opportunities, POST /bls/timeseries/data/
+    """
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or MockSettings()
+        self.requests_served = 0
+        self._rng = random.Random(self.settings.seed)
+        self._rng_lock = threading.Lock()
+        self._bucket = _TokenBucket(self.settings.rps_limit) if self.settings.rps_limit else None
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockFederalServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockFederalServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if (server.settings.compress and len(payload) > 1024
+                        and "gzip" in self.headers.get("Accept-Encoding", "")):
+                    payload = gzip.compress(payload, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _preamble(self) -> bool:
+                """Apply latency, throttling and injected errors. False if a response was sent."""
+                with server._count_lock:
+                    server.requests_served += 1
+                s = server.settings
+                delay = s.latency_ms + (server._roll() * 2 - 1) * s.jitter_ms
+                if s.stall_rate and server._roll() < s.stall_rate:
+                    delay += s.stall_ms
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                if (server._bucket and not server._bucket.take()) or server._roll() < s.throttle_rate:
+                    self._send(429, {"error": "Too Many Requests"}, {"Retry-After": "1"})
+                    return False
+                if server._roll() < s.error_rate:
+                    self._send(500, {"error": "Injected failure"})
+                    return False
+                return True
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                if not self._preamble():
+                    return
+
+                if parsed.path.rstrip("/") == "/entities":
+                    self._entities(query)
+                elif parsed.path.rstrip("/") == "/opportunities":
+                    self._opportunities(query)
+                else:
+                    self._send(404, {"error": "Not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self._preamble():
+                    return
+
+                if urlparse(self.path).path.rstrip("/") == "/bls/timeseries/data":
+                    start, end = int(body.get("startyear", 2024)), int(body.get("endyear", 2024))
+                    series = [make_series(sid, start, end) for sid in body.get("seriesid", [])]
+                    self._send(200, {"status": "REQUEST_SUCCEEDED", "Results": {"series": series}})
+                else:
+                    self._send(404, {"error": "Not found"})
+
+            def _entities(self, query: Dict[str, str]):
+                sections = query.get("includeSections", "")
+                uei = query.get("ueiSAM")
+                cage = query.get("cageCode")
+                if cage and not uei:
+                    uei = f"CAGE{cage}"
+                if not uei:
+                    name = query.get("legalBusinessName", "")
+                    size = int(query.get("size", 10))
+                    total = server.settings.name_matches or size
+                    start = int(query.get("page", 0)) * size
+                    records = [make_entity(f"N{_digest(name + str(i)):011X}", sections,
+                                           server.settings.payload_bytes)
+                               for i in range(start, min(total, start + size))]
+                    self._send(200, {"totalRecords": total, "entityData": records})
+                    return
+                entity = make_entity(uei, sections, server.settings.payload_bytes)
+                if entity is None:
+                    self._send(200, {"totalRecords": 0, "entityData": []})
+                else:
+                    self._send(200, {"totalRecords": 1, "entityData": [entity]})
+
+            def _opportunities(self, query: Dict[str, str]):
+                limit = int(query.get("limit", 10))
+                offset = int(query.get("offset", 0))
+                total = server.settings.notices_total
+                end = min(total, offset + limit)
+                naics = query.get("ncode", "")
+                set_aside = query.get("typeOfSetAside", "")
+                data = [make_opportunity(i, naics, set_aside, server.settings.payload_bytes)
+                        for i in range(offset, end)]
+                self._send(200, {"totalRecords": total, "limit": limit, "offset": offset,
+                                 "opportunitiesData": data})
+
+        return Handler
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the mock federal API server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--jitter-ms", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rps-limit", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--notices", type=int, default=100000)
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of requests that stall")
+    parser.add_argument("--stall-ms", type=float, default=1000.0)
+    parser.add_argument("--no-compress", action="store_true", help="Ignore Accept-Encoding")
+    args = parser.parse_args()
+
+    settings = MockSettings(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                            args.rps_limit, args.payload_bytes, args.notices,
+                            compress=not args.no_compress, stall_rate=args.stall_rate,
+                            stall_ms=args.stall_ms)
+    server = MockFederalServer(settings, port=args.port).start()
+    print(f"Mock federal API server on {server.url}")
+    print(f"  SAM_BASE_URL={server.url}/entities")
+    print(f"  SAM_OPPORTUNITIES_URL={server.url}/opportunities")
+    print(f"  DOL_BASE_URL={server.url}/bls")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
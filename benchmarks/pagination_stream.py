@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Paginated Search Streaming
+Streams every notice of an opportunity search and every match of a name search
+from the mock server, sequentially and with pages prefetched, and reports records
+per second, peak traced memory and the requests made when the caller stops early.
+Caching is off so every page is a network round trip.
+
+Usage:
+    python benchmarks/pagination_stream.py [--notices 20000] [--page-size 200] [--latency-ms 20]
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from itertools import islice
+from typing import Dict, Any, Callable, Iterator
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.mock_server import MockFederalServer, MockSettings
+from benchmarks.run_benchmarks import configure
+from config import Config
+
+
+def stream(make: Callable[[], Iterator[Dict[str, Any]]], server: MockFederalServer) -> Dict[str, Any]:
+    before = server.requests_served
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = sum(1 for _ in make())
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"records": count, "seconds": elapsed, "records_per_second": count / elapsed,
+            "peak_bytes": peak, "requests": server.requests_served - before}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sequential vs prefetched pagination")
+    parser.add_argument("--notices", type=int, default=20000)
+    parser.add_argument("--names", type=int, default=500, help="Matches for the name search")
+    parser.add_argument("--page-size", type=int, default=200, help="Opportunity page size")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--prefetch", type=int, default=2)
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    settings = MockSettings(latency_ms=args.latency_ms, jitter_ms=0, notices_total=args.notices,
+                            name_matches=args.names)
+    server = MockFederalServer(settings).start()
+    configure(server.url)
+    Config.CACHE_ENABLED = False
+    Config.CACHE_WARM_ENABLED = False
+    Config.ENTITY_CACHE_ENABLED = False
+    Config.NAME_INDEX_ENABLED = False
+
+    from sam.client import SAMEntityAPI
+    from sba.client import SBAOpportunitiesAPI
+    sam, sba = SAMEntityAPI(), SBAOpportunitiesAPI()
+
+    results: Dict[str, Any] = {"settings": settings.to_dict(), "page_size": args.page_size}
+    try:
+        for prefetch in (0, args.prefetch):
+            Config.PAGE_PREFETCH = prefetch
+            label = "sequential" if prefetch == 0 else f"prefetch_{prefetch}"
+            results[label] = {
+                "opportunities": stream(lambda: sba.iter_opportunities(page_size=args.page_size), server),
+                "names": stream(lambda: sam.iter_search_by_name("ACME"), server)
+            }
+
+        before = server.requests_served
+        first = list(islice(sba.iter_opportunities(page_size=args.page_size), args.page_size + 1))
+        time.sleep(args.latency_ms * 4 / 1000)  # let any in-flight prefetch land
+        results["early_stop"] = {"records": len(first), "requests": server.requests_served - before}
+    finally:
+        server.stop()
+
+    for label in ("sequential", f"prefetch_{args.prefetch}"):
+        for kind, row in results[label].items():
+            print(f"{label:>12} {kind:<14} {row['records']:>7,} records in {row['requests']:>4} pages  "
+                  f"{row['records_per_second']:>9,.0f}/s  peak {row['peak_bytes'] / 2 ** 20:6.1f} MiB")
+    stop = results["early_stop"]
+    print(f"Stopping after {stop['records']} records made {stop['requests']} requests")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Federal API Vault - Benchmark Suite
+Drives workflows, clients, the cache and normalizers against the local mock server
+and writes machine-readable results for comparison across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--quick] [--only a,b] [--compare results/<old>.json]
+
+Peak memory is tracked with tracemalloc, which slows Python-heavy benchmarks;
+compare runs made with the same --no-memory setting.
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.mock_server import MockFederalServer, MockSettings, make_entity, make_opportunity
+from config import Config
+
+
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+BENCHMARKS: Dict[str, Callable[["BenchContext"], Dict[str, Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark function."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+class BenchContext:
+    """Shared state handed to each benchmark."""
+
+    def __init__(self, server: MockFederalServer, scale: float):
+        self.server = server
+        self.scale = scale
+        self.latencies: List[float] = []
+
+    def n(self, full: int) -> int:
+        return max(1, int(full * self.scale))
+
+    def timed(self, fn: Callable) -> Callable:
+        """Wrap a callable so each call's latency is recorded."""
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+        return wrapper
+
+
+def configure(server_url: str) -> None:
+    """Point every client at the mock server and lift client-side rate limits."""
+    Config.SAM_BASE_URL = f"{server_url}/entities"
+    Config.SAM_OPPORTUNITIES_URL = f"{server_url}/opportunities"
+    Config.DOL_BASE_URL = f"{server_url}/bls"
+    Config.SAM_API_KEY = Config.SAM_API_KEY or "benchmark"
+    Config.DOL_API_KEY = Config.DOL_API_KEY or "benchmark"
+    Config.CACHE_ENABLED = True
+    for name in ("RATE_LIMIT_SAM", "RATE_LIMIT_SBA", "RATE_LIMIT_IRS", "RATE_LIMIT_DOL"):
+        setattr(Config, name, 10 ** 9)
+
+
+@benchmark("entity_refresh")
+def bench_entity_refresh(ctx: BenchContext) -> Dict[str, Any]:
+    """EntityRefreshWorkflow over tracked UEIs (two upstream calls per UEI)."""
+    from workflows.implementations import EntityRefreshWorkflow
+
+    count = ctx.n(10000)
+    Path("data").mkdir(exist_ok=True)
+    with open("data/tracked_entities.json", "w") as f:
+        json.dump({"ueis": [f"BENCH{i:07d}" for i in range(count)]}, f)
+
+    workflow = EntityRefreshWorkflow()
+    workflow.sam.validate_entity_status = ctx.timed(workflow.sam.validate_entity_status)
+    workflow.run()
+    return {"units": count, "unit": "entity"}
+
+
+@benchmark("opportunity_scan")
+def bench_opportunity_scan(ctx: BenchContext) -> Dict[str, Any]:
+    """OpportunityScanWorkflow across a NAICS x set-aside query plan."""
+    from workflows.implementations import OpportunityScanWorkflow
+
+    naics = [f"54{i:04d}" for i in range(ctx.n(50))]
+    Path("data").mkdir(exist_ok=True)
+    with open("data/opportunity_filters.json", "w") as f:
+        json.dump({"naics_codes": naics, "set_asides": ["8A", "WOSB", "HUBZone", "SBA"]}, f)
+
+    workflow = OpportunityScanWorkflow()
+    workflow.sba.search_opportunities = ctx.timed(workflow.sba.search_opportunities)
+    workflow.run()
+    return {"units": len(naics) * 4, "unit": "search"}
+
+
+@benchmark("opportunity_fetch")
+def bench_opportunity_fetch(ctx: BenchContext) -> Dict[str, Any]:
+    """Page through the notice corpus with the opportunities client."""
+    from utils.http_client import OpportunitiesClient
+
+    total = ctx.n(100000)
+    ctx.server.settings.notices_total = total
+    client = OpportunitiesClient()
+    get = ctx.timed(client.get)
+    fetched = 0
+    page_size = 1000
+    while fetched < total:
+        data = get("", params={"ptype": "o", "limit": page_size, "offset": fetched})
+        page = data.get("opportunitiesData", [])
+        if not page:
+            break
+        fetched += len(page)
+    return {"units": fetched, "unit": "notice", "latency_unit": "page"}
+
+
+@benchmark("dol_batching")
+def bench_dol_batching(ctx: BenchContext) -> Dict[str, Any]:
+    """BLSSeriesStore refresh of many series, batched per BLS request limits."""
+    from dol.client import DOLAPI
+    from dol.series_store import BLSSeriesStore
+
+    series_ids = [f"LAUSBENCH{i:05d}03" for i in range(ctx.n(2000))]
+    dol = DOLAPI()
+    dol.get_series_data = ctx.timed(dol.get_series_data)
+    store = BLSSeriesStore(dol=dol)
+    store.refresh(series_ids)
+    return {"units": len(series_ids), "unit": "series", "latency_unit": "batch"}
+
+
+@benchmark("cache_store")
+def bench_cache_store(ctx: BenchContext) -> Dict[str, Any]:
+    """CacheStore set then get of entity-sized payloads."""
+    from utils.http_client import CacheStore
+
+    count = ctx.n(10000)
+    cache = CacheStore()
+    payload = {"totalRecords": 1, "entityData": [make_entity("BENCH0000001", "coreData,entityRegistration,assertions")]}
+    put = ctx.timed(cache.set)
+    get = ctx.timed(cache.get)
+    for i in range(count):
+        put(f"SAM__ueiSAM=BENCH{i:07d}", payload)
+    for i in range(count):
+        get(f"SAM__ueiSAM=BENCH{i:07d}")
+    return {"units": count * 2, "unit": "op"}
+
+
+@benchmark("normalize_opportunities")
+def bench_normalize_opportunities(ctx: BenchContext) -> Dict[str, Any]:
+    """extract_opportunities over the notice corpus, in chunks of 1000."""
+    from sba.client import extract_opportunities
+
+    total = ctx.n(100000)
+    notices = [make_opportunity(i) for i in range(total)]
+    extract = ctx.timed(extract_opportunities)
+    for i in range(0, total, 1000):
+        extract({"opportunitiesData": notices[i:i + 1000]})
+    return {"units": total, "unit": "notice", "latency_unit": "1000 notices"}
+
+
+@benchmark("normalize_entities")
+def bench_normalize_entities(ctx: BenchContext) -> Dict[str, Any]:
+    """parse_entity_status over entity payloads."""
+    from sam.client import parse_entity_status
+
+    count = ctx.n(10000)
+    entities = [make_entity(f"BENCH{i:07d}", "coreData,entityRegistration") for i in range(count)]
+    parse = ctx.timed(parse_entity_status)
+    for entity in entities:
+        parse(entity)
+    return {"units": count, "unit": "entity"}
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_one(name: str, fn: Callable, server: MockFederalServer, scale: float,
+            trace_memory: bool) -> Dict[str, Any]:
+    """Run a benchmark in a scratch directory with fresh caches and metrics."""
+    from utils.metrics import metrics
+
+    metrics.reset()
+    ctx = BenchContext(server, scale)
+    served_before = server.requests_served
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix=f"vault-bench-{name}-") as scratch:
+        os.chdir(scratch)
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                info = fn(ctx)
+        finally:
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+            os.chdir(cwd)
+
+    p50 = percentile(ctx.latencies, 0.50)
+    p99 = percentile(ctx.latencies, 0.99)
+    return {
+        "units": info["units"],
+        "unit": info["unit"],
+        "latency_unit": info.get("latency_unit", info["unit"]),
+        "seconds": round(elapsed, 4),
+        "throughput_per_s": round(info["units"] / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+        "p99_ms": round(p99 * 1000, 3) if p99 is not None else None,
+        "peak_memory_mb": round(peak / 2 ** 20, 2) if peak is not None else None,
+        "upstream_requests": server.requests_served - served_before
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print throughput and p99 deltas. Returns 1 if any throughput dropped beyond threshold."""
+    print(f"\nComparison vs {baseline.get('commit')} ({baseline.get('timestamp')})")
+    for setting in ("scale", "trace_memory", "server"):
+        if baseline.get(setting) != current.get(setting):
+            print(f"  ⚠️  '{setting}' differs from the baseline; numbers are not like-for-like")
+    regressed = False
+    for name, result in current["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if not old or not old.get("throughput_per_s") or not result.get("throughput_per_s"):
+            continue
+        change = result["throughput_per_s"] / old["throughput_per_s"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  ❌ REGRESSION"
+            regressed = True
+        p99_note = ""
+        if old.get("p99_ms") and result.get("p99_ms"):
+            p99_note = f"  p99 {old['p99_ms']:.2f} -> {result['p99_ms']:.2f} ms"
+        print(f"  {name:<25} throughput {change:+.1%}{p99_note}{flag}")
+    return 1 if regressed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Federal API Vault benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="Run at 10%% scale")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default="", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed throughput drop")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc peak tracking")
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--jitter-ms", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    args = parser.parse_args()
+
+    scale = args.scale * (0.1 if args.quick else 1.0)
+    selected = [n for n in args.only.split(",") if n] or list(BENCHMARKS)
+    unknown = [n for n in selected if n not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}")
+        return 2
+
+    settings = MockSettings(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                            payload_bytes=args.payload_bytes)
+
+    results: Dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "trace_memory": not args.no_memory,
+        "server": settings.to_dict(),
+        "benchmarks": {}
+    }
+
+    with MockFederalServer(settings) as server:
+        configure(server.url)
+        for name in selected:
+            print(f"▶ {name} ...", flush=True)
+            result = run_one(name, BENCHMARKS[name], server, scale, not args.no_memory)
+            results["benchmarks"][name] = result
+            print(f"  {result['units']:,} x {result['unit']} in {result['seconds']:.2f}s "
+                  f"({result['throughput_per_s']}/s)  p50 {result['p50_ms']} ms  "
+                  f"p99 {result['p99_ms']} ms  peak {result['peak_memory_mb'] or '-'} MB")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            return compare(results, json.load(f), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
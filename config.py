@@ -4,11 +4,12 @@ Loads from .env and provides typed access to settings.
 """
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load .env from repo root
+# Load .env from repo root (python-dotenv is only imported when there is one)
 ROOT = Path(__file__).resolve().parent
-load_dotenv(ROOT / ".env")
+if (ROOT / ".env").exists():
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / ".env")
 
 
 class Config:
@@ -17,6 +18,7 @@ class Config:
     # SAM.gov
     SAM_API_KEY = os.getenv("SAM_API_KEY", "")
     SAM_BASE_URL = os.getenv("SAM_BASE_URL", "https://api.sam.gov/entity-information/v3/entities")
+    SAM_OPPORTUNITIES_URL = os.getenv("SAM_OPPORTUNITIES_URL", "https://api.sam.gov/opportunities/v2/search")
     
     # SBA
     SBA_API_KEY = os.getenv("SBA_API_KEY", "")
@@ -29,12 +31,44 @@ class Config:
     # DOL
     DOL_API_KEY = os.getenv("DOL_API_KEY", "")
     DOL_BASE_URL = os.getenv("DOL_BASE_URL", "https://api.bls.gov/publicAPI/v2")
+    # Stored BLS series older than this are re-fetched on lookup (picks up revisions)
+    BLS_SERIES_TTL_SECONDS = int(os.getenv("BLS_SERIES_TTL_SECONDS", "86400"))
     
     # General
     CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
     CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    CACHE_MEMORY_ENTRIES = int(os.getenv("CACHE_MEMORY_ENTRIES", "5000"))
+    CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", "0.1"))  # +/- fraction of the TTL
+    CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", "600"))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", "3.05"))
+    READ_TIMEOUT = float(os.getenv("READ_TIMEOUT", str(REQUEST_TIMEOUT)))  # per socket read, not total
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+    HTTP_COMPRESSION = os.getenv("HTTP_COMPRESSION", "true").lower() == "true"
+    JSON_CODEC = os.getenv("JSON_CODEC", "auto")  # auto | orjson | stdlib
+    
+    # Refresh-ahead cache warming (hot keys and tracked UEIs)
+    CACHE_WARM_ENABLED = os.getenv("CACHE_WARM_ENABLED", "true").lower() == "true"
+    CACHE_WARM_RATE_SHARE = float(os.getenv("CACHE_WARM_RATE_SHARE", "0.2"))
+    CACHE_WARM_INTERVAL_SECONDS = int(os.getenv("CACHE_WARM_INTERVAL_SECONDS", "30"))
+    CACHE_REFRESH_AHEAD_SECONDS = int(os.getenv("CACHE_REFRESH_AHEAD_SECONDS", "600"))
+    CACHE_WARM_MAX_KEYS = int(os.getenv("CACHE_WARM_MAX_KEYS", "2000"))
+    CACHE_WARM_MIN_HITS = int(os.getenv("CACHE_WARM_MIN_HITS", "2"))
+    
+    # Hedged GETs: a backup request once the primary is slower than HEDGE_QUANTILE
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+    HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.05"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "50"))
+    HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))  # hedges per GET, at most
+    
+    # Search pagination (pages fetched ahead while the caller consumes the current one)
+    PAGE_PREFETCH = int(os.getenv("PAGE_PREFETCH", "2"))
+    SAM_PAGE_SIZE = int(os.getenv("SAM_PAGE_SIZE", "10"))  # Entity API maximum
+    OPPORTUNITIES_PAGE_SIZE = int(os.getenv("OPPORTUNITIES_PAGE_SIZE", "1000"))  # Opportunities API maximum
+    # Opportunity pages expire sooner than other responses so new notices show up
+    OPPORTUNITIES_CACHE_TTL_SECONDS = int(os.getenv("OPPORTUNITIES_CACHE_TTL_SECONDS", "300"))
     
     # Rate limits
     RATE_LIMIT_SAM = int(os.getenv("RATE_LIMIT_SAM", "100"))
@@ -42,12 +76,54 @@ class Config:
     RATE_LIMIT_IRS = int(os.getenv("RATE_LIMIT_IRS", "30"))
     RATE_LIMIT_DOL = int(os.getenv("RATE_LIMIT_DOL", "500"))
     
+    # Concurrent workflow stages per upstream API
+    STAGE_CONCURRENCY_SAM = int(os.getenv("STAGE_CONCURRENCY_SAM", "2"))
+    STAGE_CONCURRENCY_DOL = int(os.getenv("STAGE_CONCURRENCY_DOL", "1"))
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = os.getenv("LOG_FILE", "logs/federal-api-vault.log")
     
+    # Background jobs (MCP server)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_PER_WORKFLOW = int(os.getenv("JOB_MAX_PER_WORKFLOW", "1"))
+    
+    # Local fuzzy business-name index (SAM search_by_name)
+    NAME_INDEX_ENABLED = os.getenv("NAME_INDEX_ENABLED", "true").lower() == "true"
+    NAME_INDEX_PATH = os.getenv("NAME_INDEX_PATH", "data/name_index.jsonl")
+    NAME_INDEX_MIN_SCORE = float(os.getenv("NAME_INDEX_MIN_SCORE", "0.6"))
+    
+    # Canonical SAM entity cache (per-section freshness, CAGE/name aliases, negative entries)
+    ENTITY_CACHE_ENABLED = os.getenv("ENTITY_CACHE_ENABLED", "true").lower() == "true"
+    ENTITY_CACHE_PATH = os.getenv("ENTITY_CACHE_PATH", "data/entity_cache.db")
+    ENTITY_TTL_SECONDS = int(os.getenv("ENTITY_TTL_SECONDS", "43200"))
+    ENTITY_EXCLUSIONS_TTL_SECONDS = int(os.getenv("ENTITY_EXCLUSIONS_TTL_SECONDS", "3600"))
+    ENTITY_NEGATIVE_TTL_SECONDS = int(os.getenv("ENTITY_NEGATIVE_TTL_SECONDS", "900"))
+    
+    # Distributed work queue (entity refresh workers)
+    WORK_QUEUE_PATH = os.getenv("WORK_QUEUE_PATH", "data/work_queue.db")
+    WORK_QUEUE_VISIBILITY_SECONDS = int(os.getenv("WORK_QUEUE_VISIBILITY_SECONDS", "300"))
+    WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "5"))
+    WORK_QUEUE_BATCH = int(os.getenv("WORK_QUEUE_BATCH", "10"))
+    
+    # Opportunity matching
+    MATCH_INDEX_PATH = os.getenv("MATCH_INDEX_PATH", "data/opportunity_index.jsonl")
+    MATCH_LIMIT = int(os.getenv("MATCH_LIMIT", "25"))
+    
+    # Metrics
+    METRICS_DIR = os.getenv("METRICS_DIR", "data/metrics")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    # Interface /metrics listens on; set 0.0.0.0 to expose it beyond this host
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    
+    # Profiling (scripts/run.py <workflow> --profile)
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+    
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///data/vault.db")
+    # Current entity status + change history, written at the end of each entity refresh
+    ENTITY_STORE_ENABLED = os.getenv("ENTITY_STORE_ENABLED", "true").lower() == "true"
 
     @classmethod
     def validate(cls) -> list[str]:
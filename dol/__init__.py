@@ -1,4 +1,16 @@
-"""DOL module for Federal API Vault."""
-from .client import DOLAPI, wotc_eligibility
+"""DOL module for Federal API Vault.
 
-__all__ = ["DOLAPI", "wotc_eligibility"]
+Names are resolved on first access so the client does not load the series store.
+"""
+from utils.lazy import lazy_module
+
+_LAZY = {
+    "DOLAPI": ".client",
+    "wotc_eligibility": ".client",
+    "BLSSeriesStore": ".series_store",
+    "SeriesData": ".series_store"
+}
+
+__getattr__, __dir__ = lazy_module(globals(), _LAZY)
+
+__all__ = list(_LAZY)
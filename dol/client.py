@@ -27,22 +27,20 @@ class DOLAPI:
                 "registrationkey": Config.DOL_API_KEY
             }
             
-            response = self.client.session.post(
-                f"{Config.DOL_BASE_URL}/timeseries/data/",
-                json=payload,
-                headers=self.client.session.headers,
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            return response.json()
+            return self.client.post("/timeseries/data/", payload)
         
         except Exception as e:
             print(f"Error fetching BLS series {series_ids}: {e}")
             return {"status": "REQUEST_FAILED", "message": str(e)}
     
+    @staticmethod
+    def unemployment_series_id(area_code: str) -> str:
+        """LAUS unemployment-rate series ID for an area."""
+        return f"LAUS{area_code}03"
+    
     def get_unemployment_rate(self, area_code: str, year: int) -> float:
         """Get unemployment rate for a specific area."""
-        series_id = f"LAUS{area_code}03"
+        series_id = self.unemployment_series_id(area_code)
         data = self.get_series_data([series_id], year, year)
         
         if data.get("status") == "REQUEST_SUCCEEDED":
@@ -0,0 +1,328 @@
+"""
+Local incremental store for BLS time series.
+Keeps each series as compact typed arrays and only fetches the trailing periods BLS
+may still revise plus anything newer than what is stored.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Callable
+import threading
+import time
+
+from config import Config
+from dol.client import DOLAPI
+from utils import codec
+
+
+def period_index(year: int, month: int) -> int:
+    """Encode a monthly period as a single sortable integer."""
+    return year * 12 + (month - 1)
+
+
+def period_label(index: int) -> str:
+    """Decode a period index back to YYYY-MM."""
+    year, month0 = divmod(index, 12)
+    return f"{year:04d}-{month0 + 1:02d}"
+
+
+class SeriesData:
+    """One BLS series held as parallel typed arrays, sorted by period."""
+
+    __slots__ = ("series_id", "periods", "values", "fetched_at")
+
+    def __init__(self, series_id: str, periods: Optional[array] = None, values: Optional[array] = None,
+                 fetched_at: float = 0.0):
+        self.series_id = series_id
+        self.periods = periods if periods is not None else array("l")
+        self.values = values if values is not None else array("d")
+        # When BLS last returned this series (0 if unknown)
+        self.fetched_at = fetched_at
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    @property
+    def last_period(self) -> Optional[int]:
+        return self.periods[-1] if self.periods else None
+
+    def merge(self, points: Iterable[Tuple[int, float]]) -> int:
+        """Merge parsed points: new periods are added and revised values overwrite stored ones.
+
+        Returns how many points were added or changed.
+        """
+        changed = 0
+        for idx, value in sorted(dict(points).items()):
+            if not self.periods or idx > self.periods[-1]:
+                self.periods.append(idx)
+                self.values.append(value)
+                changed += 1
+                continue
+            pos = bisect_left(self.periods, idx)
+            if self.periods[pos] != idx:
+                self.periods.insert(pos, idx)
+                self.values.insert(pos, value)
+                changed += 1
+            elif self.values[pos] != value:
+                self.values[pos] = value
+                changed += 1
+        return changed
+
+    def latest(self) -> Optional[Tuple[str, float]]:
+        """Most recent (period, value) pair."""
+        if not self.periods:
+            return None
+        return period_label(self.periods[-1]), self.values[-1]
+
+    def value_at(self, index: int) -> Optional[float]:
+        """Value for an exact period index, if present."""
+        pos = bisect_left(self.periods, index)
+        if pos < len(self.periods) and self.periods[pos] == index:
+            return self.values[pos]
+        return None
+
+    def rolling_average(self, window: int = 12) -> array:
+        """Trailing mean over `window` observations, computed from prefix sums."""
+        n = len(self.values)
+        out = array("d")
+        if window <= 0 or n < window:
+            return out
+        prefix = array("d", [0.0]) * (n + 1)
+        running = 0.0
+        for i, v in enumerate(self.values):
+            running += v
+            prefix[i + 1] = running
+        out.extend((prefix[i] - prefix[i - window]) / window for i in range(window, n + 1))
+        return out
+
+    def yoy_change(self) -> array:
+        """Change versus the same month one year earlier (NaN where the prior year is missing)."""
+        lookup = dict(zip(self.periods, self.values))
+        nan = float("nan")
+        return array("d", (
+            v - lookup[p - 12] if (p - 12) in lookup else nan
+            for p, v in zip(self.periods, self.values)
+        ))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "series_id": self.series_id,
+            "periods": self.periods.tolist(),
+            "values": self.values.tolist(),
+            "fetched_at": self.fetched_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeriesData":
+        return cls(
+            data.get("series_id", ""),
+            array("l", data.get("periods", [])),
+            array("d", data.get("values", [])),
+            data.get("fetched_at", 0.0)
+        )
+
+
+def parse_series_points(series: Dict[str, Any]) -> List[Tuple[int, float]]:
+    """Parse a BLS series payload into (period_index, value) pairs.
+
+    Only monthly observations (M01-M12) are kept; annual averages (M13) and
+    non-numeric placeholders such as "-" are skipped.
+    """
+    points = []
+    for row in series.get("data", []):
+        period = row.get("period", "")
+        if not period.startswith("M") or period == "M13":
+            continue
+        try:
+            idx = period_index(int(row["year"]), int(period[1:]))
+            value = float(str(row.get("value", "")).replace(",", ""))
+        except (KeyError, ValueError):
+            continue
+        points.append((idx, value))
+    return points
+
+
+class BLSSeriesStore:
+    """In-memory BLS series store backed by per-series JSON files."""
+
+    MAX_SERIES_PER_REQUEST = 50
+    MAX_YEARS_PER_REQUEST = 20
+    # Stored periods this recent are fetched again; BLS revises the latest months
+    REVISION_MONTHS = 12
+
+    def __init__(self, dol: Optional[DOLAPI] = None, store_dir: str = "data/bls", history_years: int = 3,
+                 ttl: Optional[float] = None):
+        self.dol = dol
+        self.store_dir = Path(store_dir)
+        self.history_years = history_years
+        self.ttl = Config.BLS_SERIES_TTL_SECONDS if ttl is None else ttl
+        self._series: Dict[str, SeriesData] = {}
+        self._lock = threading.Lock()
+
+    def _api(self) -> DOLAPI:
+        if self.dol is None:
+            self.dol = DOLAPI()
+        return self.dol
+
+    def _series_path(self, series_id: str) -> Path:
+        return self.store_dir / f"{series_id}.json"
+
+    def get(self, series_id: str) -> Optional[SeriesData]:
+        """Return a series from memory, loading it from disk on first access."""
+        with self._lock:
+            return self._load(series_id)
+
+    def _load(self, series_id: str) -> Optional[SeriesData]:
+        if series_id in self._series:
+            return self._series[series_id]
+
+        path = self._series_path(series_id)
+        if not path.exists():
+            return None
+
+        try:
+            series = SeriesData.from_dict(codec.load_file(path))
+        except Exception:
+            return None
+
+        self._series[series_id] = series
+        return series
+
+    def _save(self, series: SeriesData) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        codec.dump_file(series.to_dict(), self._series_path(series.series_id), atomic=True)
+
+    def plan_batches(self, series_ids: List[str], end_year: int) -> List[Tuple[int, List[str]]]:
+        """Group series by the first year still needed, chunked to the BLS per-request limits.
+
+        Stored series are re-fetched from the year REVISION_MONTHS before their last period.
+        """
+        by_start: Dict[int, List[str]] = {}
+        for sid in dict.fromkeys(series_ids):
+            existing = self._load(sid)
+            if existing is not None and existing.last_period is not None:
+                start = (existing.last_period - self.REVISION_MONTHS + 1) // 12
+            else:
+                start = end_year - self.history_years + 1
+            start = max(start, end_year - self.MAX_YEARS_PER_REQUEST + 1)
+            by_start.setdefault(start, []).append(sid)
+
+        batches = []
+        for start, ids in sorted(by_start.items()):
+            for i in range(0, len(ids), self.MAX_SERIES_PER_REQUEST):
+                batches.append((start, ids[i:i + self.MAX_SERIES_PER_REQUEST]))
+        return batches
+
+    def refresh(self, series_ids: List[str], end_year: Optional[int] = None,
+                on_batch: Optional[Callable[[Dict[str, int]], None]] = None,
+                on_failed: Optional[Callable[[List[str]], None]] = None) -> Dict[str, int]:
+        """Fetch recent and new periods. Returns new or revised point counts per series.
+
+        `on_batch` is called with each successfully merged batch's counts and
+        `on_failed` with the series IDs of each batch whose request failed.
+        """
+        end_year = end_year or datetime.now().year
+        with self._lock:
+            batches = self.plan_batches(series_ids, end_year)
+
+        added: Dict[str, int] = {}
+        for start_year, ids in batches:
+            batch = self.refresh_batch(ids, start_year, end_year)
+            if batch is None:
+                added.update({sid: 0 for sid in ids})
+                if on_failed:
+                    on_failed(ids)
+                continue
+            added.update(batch)
+            if on_batch:
+                on_batch(batch)
+        return added
+
+    def refresh_batch(self, series_ids: List[str], start_year: int, end_year: int) -> Optional[Dict[str, int]]:
+        """Fetch one BLS request worth of series and merge the results. None if the request failed."""
+        data = self._api().get_series_data(series_ids, start_year, end_year)
+        if data.get("status") != "REQUEST_SUCCEEDED":
+            return None
+
+        added = {sid: 0 for sid in series_ids}
+        fetched_at = time.time()
+
+        with self._lock:
+            for payload in data.get("Results", {}).get("series", []):
+                sid = payload.get("seriesID")
+                if not sid:
+                    continue
+                series = self._load(sid) or SeriesData(sid)
+                self._series[sid] = series
+                added[sid] = series.merge(parse_series_points(payload))
+                # Saved even when nothing changed, so ensure() knows the series is current
+                series.fetched_at = fetched_at
+                self._save(series)
+        return added
+
+    def ensure(self, series_ids: List[str]) -> None:
+        """Refresh series that have never been stored or were last fetched more than ttl ago."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            stale = []
+            for sid in series_ids:
+                series = self._load(sid)
+                if series is None or series.fetched_at < cutoff:
+                    stale.append(sid)
+        if stale:
+            self.refresh(stale)
+
+    def latest(self, series_id: str) -> Optional[float]:
+        """Latest stored value for a series."""
+        series = self.get(series_id)
+        latest = series.latest() if series else None
+        return latest[1] if latest else None
+
+    def rolling_average(self, series_id: str, window: int = 12) -> List[Tuple[str, float]]:
+        """Trailing rolling mean labelled by the period it ends on."""
+        series = self.get(series_id)
+        if not series:
+            return []
+        averages = series.rolling_average(window)
+        labels = series.periods[window - 1:]
+        return [(period_label(p), v) for p, v in zip(labels, averages)]
+
+    def yoy_change(self, series_id: str) -> List[Tuple[str, float]]:
+        """Year-over-year change labelled by period, omitting periods without a prior year."""
+        series = self.get(series_id)
+        if not series:
+            return []
+        changes = series.yoy_change()
+        return [(period_label(p), v) for p, v in zip(series.periods, changes) if v == v]
+
+    def unemployment_rate(self, area_code: str) -> Optional[float]:
+        """Latest stored unemployment rate for an area, fetching the series once if unknown."""
+        series_id = DOLAPI.unemployment_series_id(area_code)
+        self.ensure([series_id])
+        return self.latest(series_id)
+
+    def compare_areas(self, area_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Latest unemployment rate and YoY change for several areas side by side."""
+        ids = {area: DOLAPI.unemployment_series_id(area) for area in area_codes}
+        self.ensure(list(ids.values()))
+
+        comparison = {}
+        for area, sid in ids.items():
+            series = self.get(sid)
+            latest = series.latest() if series else None
+            yoy = None
+            if series and len(series):
+                prior = series.value_at(series.periods[-1] - 12)
+                if prior is not None:
+                    yoy = series.values[-1] - prior
+            comparison[area] = {
+                "series_id": sid,
+                "period": latest[0] if latest else None,
+                "rate": latest[1] if latest else None,
+                "yoy_change": yoy
+            }
+        return comparison
@@ -0,0 +1,197 @@
+"""
+Batch WOTC eligibility engine for applicant rosters.
+Streams CSV/NDJSON rosters in chunks and evaluates the category rules column-wise.
+Results are identical to dol.client.wotc_eligibility for every applicant. CSV
+cells and NDJSON values that are not finite numbers in numeric fields are treated
+as missing, so one bad row does not abort the batch.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from typing import Optional, Dict, Any, List, Iterator, Iterable
+import csv
+import math
+
+from dol.series_store import BLSSeriesStore
+from utils import codec
+
+
+BOOLEAN_FIELDS = ("veteran", "snap_recipient", "felony_conviction", "vocational_rehab")
+NUMERIC_FIELDS = ("age", "unemployment_months")
+TRUE_STRINGS = {"1", "true", "t", "yes", "y"}
+
+# Category order and credit amounts mirror wotc_eligibility exactly.
+CATEGORY_CREDITS = (
+    ("veteran", 2400),
+    ("veteran_long_term_unemployed", 9600),
+    ("snap_recipient", 2400),
+    ("ex_felon", 2400),
+    ("long_term_unemployed", 2400),
+    ("vocational_rehabilitation", 2400),
+    ("summer_youth", 1200),
+)
+
+
+def _number(text: Any) -> Optional[float]:
+    """Int or float value of a CSV cell or JSON value, or None if it is not a finite number."""
+    if isinstance(text, bool):
+        return None
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _coerce_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convert CSV strings to the types wotc_eligibility expects from JSON input."""
+    applicant: Dict[str, Any] = {k: v for k, v in row.items() if v not in ("", None)}
+    for field in BOOLEAN_FIELDS:
+        if field in applicant:
+            applicant[field] = str(applicant[field]).strip().lower() in TRUE_STRINGS
+    return _coerce_numbers(applicant)
+
+
+def _coerce_json_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop nulls and non-numeric values of numeric fields from an NDJSON record."""
+    return _coerce_numbers({k: v for k, v in row.items() if v is not None})
+
+
+def _coerce_numbers(applicant: Dict[str, Any]) -> Dict[str, Any]:
+    for field in NUMERIC_FIELDS:
+        if field in applicant:
+            value = _number(applicant[field])
+            if value is None:
+                del applicant[field]
+            else:
+                applicant[field] = value
+    return applicant
+
+
+def read_applicants(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream applicants from a CSV or NDJSON roster."""
+    path = Path(path)
+    with open(path, "r", newline="") as f:
+        if path.suffix.lower() in (".ndjson", ".jsonl"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _coerce_json_row(codec.loads(line))
+        else:
+            for row in csv.DictReader(f):
+                yield _coerce_csv_row(row)
+
+
+def evaluate_columns(applicants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Evaluate WOTC rules for a chunk of applicants one column at a time."""
+    ages = [int(a.get("age", 0) or 0) for a in applicants]
+    long_unemployed = [a.get("unemployment_months", 0) >= 6 for a in applicants]
+    veteran = [bool(a.get("veteran")) for a in applicants]
+    snap = [bool(a.get("snap_recipient")) and 18 <= age <= 39 for a, age in zip(applicants, ages)]
+    felon = [bool(a.get("felony_conviction")) for a in applicants]
+    rehab = [bool(a.get("vocational_rehab")) for a in applicants]
+    youth = [16 <= age <= 17 for age in ages]
+    veteran_long = [v and lu for v, lu in zip(veteran, long_unemployed)]
+    veteran_short = [v and not lu for v, lu in zip(veteran, long_unemployed)]
+
+    masks = (veteran, veteran_long, snap, felon, long_unemployed, rehab, youth)
+    credit_masks = (veteran_short, veteran_long, snap, felon, long_unemployed, rehab, youth)
+
+    credits = [0] * len(applicants)
+    for mask, (_, amount) in zip(credit_masks, CATEGORY_CREDITS):
+        credits = [max(c, amount) if m else c for c, m in zip(credits, mask)]
+
+    names = [name for name, _ in CATEGORY_CREDITS]
+    results = []
+    for i, applicant in enumerate(applicants):
+        categories = [name for name, mask in zip(names, masks) if mask[i]]
+        results.append({
+            "name": applicant.get("name"),
+            "eligible": len(categories) > 0,
+            "categories": categories,
+            "max_credit_usd": credits[i],
+            "age": ages[i]
+        })
+    return results
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class WOTCBatchEngine:
+    """Score applicant rosters in streaming chunks and aggregate credit totals."""
+
+    def __init__(self, chunk_size: int = 10000, series_store: Optional[BLSSeriesStore] = None,
+                 enrich_area_rates: bool = False):
+        self.chunk_size = chunk_size
+        self.enrich_area_rates = enrich_area_rates
+        self.series_store = series_store
+        if enrich_area_rates and self.series_store is None:
+            self.series_store = BLSSeriesStore()
+
+    def _area_rates(self, applicants: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+        """Resolve each distinct area once per chunk from the local BLS store."""
+        areas = sorted({str(a["area_code"]) for a in applicants if a.get("area_code")})
+        if not areas:
+            return {}
+        comparison = self.series_store.compare_areas(areas)
+        return {area: info.get("rate") for area, info in comparison.items()}
+
+    def evaluate(self, applicants: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield one result per applicant, in input order."""
+        for chunk in _chunks(applicants, self.chunk_size):
+            results = evaluate_columns(chunk)
+            if self.enrich_area_rates:
+                rates = self._area_rates(chunk)
+                for applicant, result in zip(chunk, results):
+                    area = applicant.get("area_code")
+                    result["area_code"] = area
+                    result["area_unemployment_rate"] = rates.get(str(area)) if area else None
+            yield from results
+
+    def run(self, input_path: str, output_path: str, summary_path: Optional[str] = None) -> Dict[str, Any]:
+        """Score a roster file, writing per-applicant results and returning aggregate totals."""
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        as_ndjson = output.suffix.lower() in (".ndjson", ".jsonl")
+
+        summary: Dict[str, Any] = {
+            "applicants": 0,
+            "eligible": 0,
+            "total_max_credit_usd": 0,
+            "by_category": {name: 0 for name, _ in CATEGORY_CREDITS}
+        }
+
+        with open(output, "w", newline="") as f:
+            writer = None
+            for result in self.evaluate(read_applicants(Path(input_path))):
+                summary["applicants"] += 1
+                if result["eligible"]:
+                    summary["eligible"] += 1
+                summary["total_max_credit_usd"] += result["max_credit_usd"]
+                for category in result["categories"]:
+                    summary["by_category"][category] += 1
+
+                if as_ndjson:
+                    f.write(codec.dumps(result).decode() + "\n")
+                    continue
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(result.keys()))
+                    writer.writeheader()
+                writer.writerow({**result, "categories": ";".join(result["categories"])})
+
+        if summary_path:
+            codec.dump_file(summary, summary_path, pretty=True)
+
+        return summary
@@ -1,4 +1,25 @@
-"""SAM module for Federal API Vault."""
-from .client import SAMEntityAPI, parse_entity_status, generate_sam_payload
+"""SAM module for Federal API Vault.
 
-__all__ = ["SAMEntityAPI", "parse_entity_status", "generate_sam_payload"]
+Names are resolved on first access, so importing the package or one submodule does
+not load the others. The client still imports the name index and entity cache it
+is built with; the entity store and entity table load only when asked for.
+"""
+from utils.lazy import lazy_module
+
+_LAZY = {
+    "SAMEntityAPI": ".client",
+    "parse_entity_status": ".client",
+    "entity_status": ".client",
+    "lookup_failed": ".client",
+    "generate_sam_payload": ".client",
+    "NameIndex": ".name_index",
+    "normalize_name": ".name_index",
+    "EntityCache": ".entity_cache",
+    "EntityTable": ".entity_table",
+    "EntityRow": ".entity_table",
+    "EntityStore": ".entity_store"
+}
+
+__getattr__, __dir__ = lazy_module(globals(), _LAZY)
+
+__all__ = list(_LAZY)
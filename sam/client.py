@@ -7,28 +7,102 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from utils.http_client import SAMClient
-from typing import Optional, Dict, Any, List
+from utils.pagination import Paginator, total_records
+from sam.name_index import NameIndex
+from sam.entity_cache import EntityCache, REGISTRATION_SECTIONS
+from config import Config
+from typing import Optional, Dict, Any, List, Iterator
+
+
+# Status error for a UEI SAM.gov has no record of (as opposed to a failed refresh)
+ENTITY_NOT_FOUND = "Entity not found"
+# Prefix of the status error for a lookup that failed (network, HTTP or rate-limit error)
+LOOKUP_FAILED = "Lookup failed"
 
 
 class SAMEntityAPI:
-    """SAM.gov Entity Management Data API wrapper."""
+    """SAM.gov Entity Management Data API wrapper.
+    
+    Every entity fetched is added to the local name index, which answers
+    search_by_name before the API is asked. UEI, CAGE and exclusion lookups go
+    through the canonical entity cache, so any known identifier resolves without a
+    request and recent misses are not retried.
+    """
+    
+    UEI_SECTIONS = REGISTRATION_SECTIONS + ("assertions",)
+    STATUS_SECTIONS = UEI_SECTIONS + ("exclusionDetails",)
     
-    def __init__(self):
+    def __init__(self, name_index: Optional[NameIndex] = None,
+                 entity_cache: Optional[EntityCache] = None):
         self.client = SAMClient()
+        if name_index is None and Config.NAME_INDEX_ENABLED:
+            name_index = NameIndex.default()
+        if entity_cache is None and Config.ENTITY_CACHE_ENABLED:
+            entity_cache = EntityCache.default()
+        self.name_index = name_index
+        self.entity_cache = entity_cache
+    
+    def _remember(self, entities: List[Dict[str, Any]]) -> None:
+        if self.name_index is not None and entities:
+            self.name_index.add_many(entities)
+    
+    def _fetch(self, kind: str, value: str, sections: tuple,
+               refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """One entity by UEI or CAGE with the given sections, from the entity cache when fresh."""
+        value = value.strip().upper()
+        cache = self.entity_cache
+        if cache is not None and not refresh:
+            if cache.is_negative(kind, value):
+                return None
+            uei = value if kind == "uei" else cache.resolve(kind, value)
+            if uei:
+                warmer = self._warm(uei, sections)
+                cached = cache.get(uei, sections, kind=kind)
+                if cached is None and warmer is not None:
+                    # Serve recently expired sections while the warmer refreshes them
+                    cached = cache.get(uei, sections, max_stale=Config.CACHE_STALE_SECONDS, kind=kind)
+                    if cached is not None:
+                        warmer.revalidate(f"SAM_entity_{uei}")
+                if cached is not None:
+                    return cached
+        
+        params = {
+            "ueiSAM" if kind == "uei" else "cageCode": value,
+            "includeSections": ",".join(sections)
+        }
+        # The entity cache supersedes the raw response cache for these lookups. Errors
+        # are not negative-cached: callers see them and the next lookup retries.
+        response = self.client.get("", params=params, use_cache=cache is None)
+        
+        if response.get("totalRecords", 0) > 0:
+            entity = response.get("entityData", [{}])[0]
+            self._remember([entity])
+            if cache is not None:
+                uei = cache.put(entity, sections, uei=value if kind == "uei" else None)
+                if uei and kind != "uei":
+                    cache.alias(kind, value, uei)
+            return entity
+        if cache is not None:
+            cache.put_negative(kind, value)
+        return None
+    
+    def _warm(self, uei: str, sections: tuple):
+        """Report an entity cache lookup to the running cache warmer so hot UEIs are refreshed ahead."""
+        if not Config.CACHE_WARM_ENABLED:
+            return None
+        from utils.cache_warmer import CacheWarmer
+        warmer = CacheWarmer.active()
+        if warmer is None:
+            return None
+        warmer.touch(f"SAM_entity_{uei}", self.client.rate_limiter,
+                     lambda: self.entity_cache.expires_at(uei, sections),
+                     lambda: self.refresh_entity(uei))
+        return warmer
     
     def get_entity_by_uei(self, uei: str) -> Optional[Dict[str, Any]]:
         """Retrieve entity details by Unique Entity ID (UEI)."""
         try:
-            params = {
-                "ueiSAM": uei.strip().upper(),
-                "includeSections": "entityRegistration,coreData,assertions"
-            }
-            response = self.client.get("", params=params)
-            
-            if response.get("totalRecords", 0) > 0:
-                return response.get("entityData", [{}])[0]
-            return None
-        
+            return self._fetch("uei", uei, self.UEI_SECTIONS)
         except Exception as e:
             print(f"Error fetching UEI {uei}: {e}")
             return None
@@ -36,83 +110,152 @@ class SAMEntityAPI:
     def get_entity_by_cage(self, cage_code: str) -> Optional[Dict[str, Any]]:
         """Retrieve entity by CAGE code."""
         try:
-            params = {
-                "cageCode": cage_code.strip().upper(),
-                "includeSections": "entityRegistration,coreData"
-            }
-            response = self.client.get("", params=params)
-            
-            if response.get("totalRecords", 0) > 0:
-                return response.get("entityData", [{}])[0]
-            return None
-        
+            return self._fetch("cage", cage_code, REGISTRATION_SECTIONS)
         except Exception as e:
             print(f"Error fetching CAGE {cage_code}: {e}")
             return None
     
-    def search_by_name(self, legal_business_name: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search entities by legal business name."""
+    def refresh_entity(self, uei: str) -> Optional[Dict[str, Any]]:
+        """Re-fetch every status section of a UEI in one request (used by the cache warmer)."""
+        return self._fetch("uei", uei, self.STATUS_SECTIONS, refresh=True)
+    
+    def entity_expires_at(self, uei: str) -> Optional[float]:
+        """When the cached status of a UEI (registration and exclusions) first expires."""
+        if self.entity_cache is None:
+            return None
+        return self.entity_cache.expires_at(uei.strip().upper(), self.STATUS_SECTIONS)
+    
+    def resolve_uei(self, identifier: str) -> Optional[str]:
+        """UEI for a UEI, CAGE code or exact business name already in the entity cache."""
+        identifier = identifier.strip()
+        if self.entity_cache is None or not identifier:
+            return None
+        upper = identifier.upper()
+        if self.entity_cache.get(upper, ("entityRegistration",)) is not None:
+            return upper
+        return self.entity_cache.resolve("cage", upper) or self.entity_cache.resolve("name", identifier)
+    
+    def search_by_name(self, legal_business_name: str, limit: int = 10,
+                       fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """Search entities by legal or DBA name.
+        
+        With fuzzy, the local index answers partial or misspelled names when its best
+        match scores at least NAME_INDEX_MIN_SCORE; otherwise the API is queried and
+        its results are indexed.
+        """
+        if fuzzy and self.name_index is not None:
+            hits = self.name_index.search(legal_business_name, limit=limit)
+            if hits and hits[0]["matchScore"] >= Config.NAME_INDEX_MIN_SCORE:
+                return hits
+        
         try:
+            return list(self.iter_search_by_name(legal_business_name, max_records=limit,
+                                                 page_size=max(1, min(limit, Config.SAM_PAGE_SIZE))))
+        
+        except Exception as e:
+            print(f"Error searching for '{legal_business_name}': {e}")
+            return []
+    
+    def iter_search_by_name(self, legal_business_name: str, max_records: Optional[int] = None,
+                            page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Every API match for a name, page by page, with the next pages fetched ahead.
+        
+        Always queries the API (no local index shortcut). Each page is cached and
+        added to the name index and entity cache. Errors propagate.
+        """
+        name = legal_business_name.strip()
+        size = page_size or Config.SAM_PAGE_SIZE
+        
+        def fetch_page(page: int):
             params = {
-                "legalBusinessName": legal_business_name.strip(),
+                "legalBusinessName": name,
                 "includeSections": "entityRegistration",
-                "page": "0",
-                "size": str(limit)
+                "page": str(page),
+                "size": str(size)
             }
             response = self.client.get("", params=params)
-            return response.get("entityData", [])
+            entities = response.get("entityData", [])
+            self._remember(entities)
+            if self.entity_cache is not None:
+                self.entity_cache.put_many(entities, ("entityRegistration",))
+            return entities, total_records(response)
         
-        except Exception as e:
-            print(f"Error searching for '{legal_business_name}': {e}")
-            return []
+        return iter(Paginator(fetch_page, size, max_records=max_records, name=self.client.api_name))
+    
+    def _exclusions(self, uei: str) -> List[Dict[str, Any]]:
+        entity = self._fetch("uei", uei, ("exclusionDetails",))
+        if entity:
+            return (entity.get("exclusionDetails") or {}).get("exclusions", [])
+        return []
     
     def get_exclusions(self, uei: str) -> List[Dict[str, Any]]:
         """Check if entity has any active exclusions."""
         try:
-            params = {
-                "ueiSAM": uei.strip().upper(),
-                "includeSections": "exclusionDetails"
-            }
-            response = self.client.get("", params=params)
-            
-            if response.get("totalRecords", 0) > 0:
-                entity = response.get("entityData", [{}])[0]
-                return entity.get("exclusionDetails", {}).get("exclusions", [])
-            return []
+            return self._exclusions(uei)
         
         except Exception as e:
             print(f"Error checking exclusions for {uei}: {e}")
             return []
     
-    def validate_entity_status(self, uei: str) -> Dict[str, Any]:
-        """Comprehensive entity status validation."""
-        entity = self.get_entity_by_uei(uei)
-        exclusions = self.get_exclusions(uei)
-        
-        if not entity:
-            return {
-                "uei": uei,
-                "error": "Entity not found",
-                "is_active": False
-            }
-        
-        core = entity.get("coreData", {})
-        reg = entity.get("entityRegistration", {})
+    def autocomplete_name(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Prefix completion over locally indexed legal and DBA names (no API call)."""
+        if self.name_index is None:
+            return []
+        return self.name_index.autocomplete(prefix, limit=limit)
+    
+    def validate_entity_status(self, uei: str, raise_errors: bool = False) -> Dict[str, Any]:
+        """Comprehensive entity status validation.
         
+        Only a UEI SAM.gov has no record of is reported as ENTITY_NOT_FOUND. A failed
+        lookup raises with raise_errors, otherwise it returns a LOOKUP_FAILED status.
+        """
+        try:
+            entity = self._fetch("uei", uei, self.UEI_SECTIONS)
+            exclusions = self._exclusions(uei) if entity else []
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error validating UEI {uei}: {e}")
+            return lookup_failed(uei, e)
+        return entity_status(uei, entity, exclusions)
+
+
+def lookup_failed(uei: str, error: Exception) -> Dict[str, Any]:
+    """Status of a UEI whose lookup failed, as returned by validate_entity_status."""
+    return {
+        "uei": uei,
+        "error": f"{LOOKUP_FAILED}: {error}",
+        "is_active": False
+    }
+
+
+def entity_status(uei: str, entity: Optional[Dict[str, Any]],
+                  exclusions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Status summary of one SAM record, as returned by validate_entity_status."""
+    if not entity:
         return {
             "uei": uei,
-            "cage": core.get("cageCode"),
-            "legal_name": core.get("legalBusinessName"),
-            "dba_name": core.get("dbaName"),
-            "registration_status": reg.get("registrationStatus"),
-            "registration_date": reg.get("registrationDate"),
-            "expiration_date": reg.get("expirationDate"),
-            "is_active": reg.get("registrationStatus") == "Active",
-            "has_exclusions": len(exclusions) > 0,
-            "exclusion_count": len(exclusions),
-            "physical_address": core.get("physicalAddress", {}),
-            "entity_structure": core.get("entityStructureCode")
+            "error": ENTITY_NOT_FOUND,
+            "is_active": False
         }
+    
+    core = entity.get("coreData", {})
+    reg = entity.get("entityRegistration", {})
+    
+    return {
+        "uei": uei,
+        "cage": core.get("cageCode"),
+        "legal_name": core.get("legalBusinessName"),
+        "dba_name": core.get("dbaName"),
+        "registration_status": reg.get("registrationStatus"),
+        "registration_date": reg.get("registrationDate"),
+        "expiration_date": reg.get("expirationDate"),
+        "is_active": reg.get("registrationStatus") == "Active",
+        "has_exclusions": len(exclusions) > 0,
+        "exclusion_count": len(exclusions),
+        "physical_address": core.get("physicalAddress", {}),
+        "entity_structure": core.get("entityStructureCode")
+    }
 
 
 def parse_entity_status(api_response: dict) -> dict:
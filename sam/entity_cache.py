@@ -0,0 +1,256 @@
+"""
+Canonical SAM entity cache keyed by UEI.
+Each entity section (registration, core data, assertions, exclusions) is stored and
+expires on its own, CAGE codes and normalized names point at the owning UEI, and
+identifiers that came back "not found" are remembered briefly so bad IDs in watch
+lists do not hit the API on every run. Failed requests are never remembered.
+Several entities can share a name, so a name only resolves while exactly one
+cached UEI carries it. The database file is created on first read or write.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from typing import Optional, Dict, Any, List, Iterable
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import Config
+from sam.name_index import normalize_name, registration_summary
+from utils import codec
+from utils.metrics import metrics
+
+
+REGISTRATION_SECTIONS = ("entityRegistration", "coreData")
+
+
+def section_ttl(section: str, uei: str = "") -> float:
+    """TTL of a section, spread by CACHE_TTL_JITTER per UEI so a bulk refresh does not expire at once."""
+    ttl = Config.ENTITY_EXCLUSIONS_TTL_SECONDS if section == "exclusionDetails" else Config.ENTITY_TTL_SECONDS
+    if not uei:
+        return ttl
+    # Stable per UEI (unlike random jitter) since the expiry is derived on every read
+    spread = (zlib.crc32(uei.encode()) % 2001 - 1000) / 1000
+    return ttl * (1 + Config.CACHE_TTL_JITTER * spread)
+
+
+class EntityCache:
+    """SQLite-backed canonical entity records with alias and negative entries."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entity_sections (
+            uei TEXT NOT NULL,
+            section TEXT NOT NULL,
+            data BLOB,
+            fetched REAL NOT NULL,
+            PRIMARY KEY (uei, section)
+        );
+        CREATE TABLE IF NOT EXISTS entity_aliases (
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            uei TEXT NOT NULL,
+            PRIMARY KEY (kind, value)
+        );
+        CREATE TABLE IF NOT EXISTS entity_names (
+            value TEXT NOT NULL,
+            uei TEXT NOT NULL,
+            PRIMARY KEY (value, uei)
+        );
+        CREATE INDEX IF NOT EXISTS entity_names_uei ON entity_names (uei);
+        CREATE TABLE IF NOT EXISTS entity_negative (
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            expires REAL NOT NULL,
+            PRIMARY KEY (kind, value)
+        );
+    """
+
+    _defaults: Dict[str, "EntityCache"] = {}
+    _defaults_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or Config.ENTITY_CACHE_PATH).resolve()
+        self._local = threading.local()
+        # The file and schema are created on first use, so building a client has no side effects
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "EntityCache":
+        """Process-wide cache at ENTITY_CACHE_PATH (per resolved path)."""
+        key = str(Path(Config.ENTITY_CACHE_PATH).resolve())
+        with cls._defaults_lock:
+            if key not in cls._defaults:
+                cls._defaults[key] = cls(key)
+            return cls._defaults[key]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Once per thread; the first connection also creates the file and schema
+            with self._ready_lock:
+                if not self._ready:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                if not self._ready:
+                    conn.executescript(self.SCHEMA)
+                    self._ready = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _count(kind: str, result: str) -> None:
+        metrics.inc("vault_entity_cache_requests_total", kind=kind, result=result)
+
+    def resolve(self, kind: str, value: str) -> Optional[str]:
+        """UEI for a CAGE code or business name alias, or None if a name is ambiguous."""
+        if kind == "name":
+            rows = self._connect().execute(
+                "SELECT uei FROM entity_names WHERE value = ? LIMIT 2", (normalize_name(value),)
+            ).fetchall()
+            return rows[0][0] if len(rows) == 1 else None
+        row = self._connect().execute(
+            "SELECT uei FROM entity_aliases WHERE kind = ? AND value = ?", (kind, value.upper())
+        ).fetchone()
+        return row[0] if row else None
+
+    def get(self, uei: str, sections: Iterable[str], max_stale: float = 0,
+            kind: str = "uei") -> Optional[Dict[str, Any]]:
+        """Entity assembled from cached sections, or None if any section is missing or expired.
+
+        With max_stale, sections expired for at most that many seconds are accepted.
+        kind is the identifier the caller looked up (e.g. "cage"), used to label metrics.
+        """
+        sections = list(sections)
+        rows = self._connect().execute(
+            f"SELECT section, data, fetched FROM entity_sections WHERE uei = ? "
+            f"AND section IN ({','.join('?' * len(sections))})",
+            (uei, *sections)
+        ).fetchall()
+        now = time.time()
+        fresh = {s: d for s, d, fetched in rows if now - fetched <= section_ttl(s, uei) + max_stale}
+        if len(fresh) < len(sections):
+            if not max_stale:
+                self._count(kind, "miss")
+            return None
+        self._count(kind, "stale" if max_stale else "hit")
+        return {s: codec.loads(d) for s, d in fresh.items() if d is not None}
+
+    def expires_at(self, uei: str, sections: Iterable[str]) -> Optional[float]:
+        """When the first of the given sections expires, or None if any is not cached."""
+        sections = list(sections)
+        rows = self._connect().execute(
+            f"SELECT section, fetched FROM entity_sections WHERE uei = ? "
+            f"AND section IN ({','.join('?' * len(sections))})",
+            (uei, *sections)
+        ).fetchall()
+        if len(rows) < len(sections):
+            return None
+        return min(fetched + section_ttl(s, uei) for s, fetched in rows)
+
+    def put(self, entity: Dict[str, Any], sections: Iterable[str],
+            uei: Optional[str] = None) -> Optional[str]:
+        """Store the requested sections of one API record and refresh its aliases.
+
+        Sections the API did not return are stored empty so they are not re-requested.
+        Pass uei when the record may not carry it (e.g. an exclusions-only response).
+        """
+        summary = registration_summary(entity)
+        reg = entity.get("entityRegistration") or entity.get("coreData") or {}
+        uei = uei or (summary or {}).get("ueiSAM") or reg.get("ueiSAM")
+        if not uei:
+            return None
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entity_sections (uei, section, data, fetched) VALUES (?, ?, ?, ?)",
+                [
+                    (uei, s, codec.dumps(entity[s]) if entity.get(s) is not None else None, now)
+                    for s in sections
+                ]
+            )
+            aliases = []
+            if summary and summary.get("cageCode"):
+                aliases.append(("cage", summary["cageCode"].upper()))
+            conn.executemany(
+                "INSERT OR REPLACE INTO entity_aliases (kind, value, uei) VALUES (?, ?, ?)",
+                [(kind, value, uei) for kind, value in aliases]
+            )
+            if summary:
+                names = {normalize_name(name) for name in (summary.get("legalBusinessName"),
+                                                           summary.get("dbaName")) if name}
+                # Replace this UEI's names so a renamed entity stops resolving by its old name
+                conn.execute("DELETE FROM entity_names WHERE uei = ?", (uei,))
+                conn.executemany("INSERT OR IGNORE INTO entity_names (value, uei) VALUES (?, ?)",
+                                 [(name, uei) for name in names])
+                aliases += [("name", name) for name in names]
+            conn.executemany(
+                "DELETE FROM entity_negative WHERE kind = ? AND value = ?",
+                [("uei", uei)] + aliases
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return uei
+
+    def alias(self, kind: str, value: str, uei: str) -> None:
+        """Point an identifier that was looked up at the UEI it resolved to."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO entity_aliases (kind, value, uei) VALUES (?, ?, ?)",
+            (kind, value.upper(), uei)
+        )
+
+    def put_many(self, entities: Iterable[Dict[str, Any]], sections: Iterable[str]) -> int:
+        sections = list(sections)
+        return sum(1 for entity in entities if self.put(entity, sections))
+
+    def is_negative(self, kind: str, value: str) -> bool:
+        row = self._connect().execute(
+            "SELECT expires FROM entity_negative WHERE kind = ? AND value = ?", (kind, value.upper())
+        ).fetchone()
+        if row and row[0] > time.time():
+            self._count(kind, "negative")
+            return True
+        return False
+
+    def put_negative(self, kind: str, value: str) -> None:
+        """Remember for ENTITY_NEGATIVE_TTL_SECONDS that an identifier was not found."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO entity_negative (kind, value, reason, expires) VALUES (?, ?, ?, ?)",
+            (kind, value.upper(), "not_found", time.time() + Config.ENTITY_NEGATIVE_TTL_SECONDS)
+        )
+
+    def forget(self, uei: str) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM entity_sections WHERE uei = ?", (uei,))
+        conn.execute("DELETE FROM entity_aliases WHERE uei = ?", (uei,))
+        conn.execute("DELETE FROM entity_names WHERE uei = ?", (uei,))
+        conn.execute("DELETE FROM entity_negative WHERE kind = 'uei' AND value = ?", (uei,))
+        conn.execute("COMMIT")
+
+    def purge_expired(self) -> int:
+        """Drop expired negative entries. Stale sections are kept until overwritten."""
+        cursor = self._connect().execute("DELETE FROM entity_negative WHERE expires <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        return {
+            "entities": conn.execute("SELECT COUNT(DISTINCT uei) FROM entity_sections").fetchone()[0],
+            "aliases": conn.execute("SELECT COUNT(*) FROM entity_aliases").fetchone()[0]
+                       + conn.execute("SELECT COUNT(*) FROM entity_names").fetchone()[0],
+            "negative": conn.execute("SELECT COUNT(*) FROM entity_negative WHERE expires > ?",
+                                     (time.time(),)).fetchone()[0]
+        }
+
+    def known_ueis(self) -> List[str]:
+        return [row[0] for row in self._connect().execute("SELECT DISTINCT uei FROM entity_sections")]
@@ -0,0 +1,252 @@
+"""
+Persistent entity status store at DATABASE_URL.
+`entity_current` holds the latest status of every UEI refreshed so far, with the
+fields portfolio queries filter on (CAGE, registration status, expiration date)
+as indexed columns; `entity_history` is append-only and gets a row whenever a
+UEI's status differs from the one stored before it. A refresh run is written as
+one bulk upsert in a single transaction.
+
+Only sqlite:/// URLs are supported: sqlite:///data/vault.db (relative to the
+working directory) or sqlite:////var/lib/vault.db (absolute).
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, List, Iterable
+import sqlite3
+import threading
+import time
+
+from config import Config
+from sam.client import ENTITY_NOT_FOUND
+from utils import codec
+
+
+def sqlite_path(url: str) -> Path:
+    """File path of a sqlite:/// database URL."""
+    prefix = "sqlite:///"
+    if not url.startswith(prefix):
+        raise ValueError(f"Unsupported DATABASE_URL '{url}': only {prefix}<path> is supported")
+    return Path(url[len(prefix):])
+
+
+def _date(value: Any) -> Optional[str]:
+    """YYYY-MM-DD prefix of an ISO date or timestamp, so range queries compare as text."""
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _flag(value: Any) -> Optional[int]:
+    return int(value) if isinstance(value, bool) else None
+
+
+def _digest(payload: bytes) -> str:
+    import hashlib  # only needed when writing; keeps `import sam` light
+    return hashlib.blake2b(payload, digest_size=12).hexdigest()
+
+
+class EntityStore:
+    """Current entity statuses plus their change history, in SQLite."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entity_current (
+            uei TEXT PRIMARY KEY,
+            cage TEXT,
+            legal_name TEXT,
+            registration_status TEXT,
+            registration_date TEXT,
+            expiration_date TEXT,
+            is_active INTEGER,
+            has_exclusions INTEGER,
+            exclusion_count INTEGER,
+            error TEXT,
+            record BLOB NOT NULL,
+            digest TEXT NOT NULL,
+            run_id TEXT,
+            first_seen REAL NOT NULL,
+            changed REAL NOT NULL,
+            updated REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entity_current_cage ON entity_current (cage);
+        -- Serves status lookups and "active and expiring between" range scans alike
+        CREATE INDEX IF NOT EXISTS entity_current_status
+            ON entity_current (registration_status, expiration_date);
+        CREATE INDEX IF NOT EXISTS entity_current_expiration ON entity_current (expiration_date);
+        CREATE TABLE IF NOT EXISTS entity_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            uei TEXT NOT NULL,
+            run_id TEXT,
+            recorded REAL NOT NULL,
+            registration_status TEXT,
+            expiration_date TEXT,
+            is_active INTEGER,
+            has_exclusions INTEGER,
+            error TEXT,
+            record BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entity_history_uei ON entity_history (uei, recorded);
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or Config.DATABASE_URL
+        self.path = sqlite_path(self.url)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]], run_id: Optional[str] = None,
+                    observed: Optional[float] = None) -> Dict[str, int]:
+        """Write one run's statuses in a single transaction.
+
+        New and changed UEIs are (re)written and appended to history; unchanged ones
+        only get their `updated` time and run ID bumped. Rows that record a failed
+        refresh (any error but "Entity not found") are skipped so they do not
+        overwrite the last known status. Returns counts per outcome.
+        """
+        observed = time.time() if observed is None else observed
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "skipped": 0}
+        rows: Dict[str, tuple] = {}
+        for record in records:
+            uei = record.get("uei")
+            error = record.get("error")
+            if not isinstance(uei, str) or (error and error != ENTITY_NOT_FOUND):
+                counts["skipped"] += 1
+                continue
+            payload = codec.dumps(record)
+            # Later duplicates of a UEI in the same run win
+            rows[uei] = (
+                uei, record.get("cage"), record.get("legal_name"), record.get("registration_status"),
+                _date(record.get("registration_date")), _date(record.get("expiration_date")),
+                _flag(record.get("is_active")), _flag(record.get("has_exclusions")),
+                record.get("exclusion_count"), error, payload, _digest(payload)
+            )
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            known = self._digests(conn, list(rows))
+            upserts, touched, history = [], [], []
+            for uei, row in rows.items():
+                previous = known.get(uei)
+                if previous == row[-1]:
+                    counts["unchanged"] += 1
+                    touched.append((run_id, observed, uei))
+                    continue
+                counts["new" if previous is None else "changed"] += 1
+                upserts.append(row + (run_id, observed, observed, observed))
+                history.append((uei, run_id, observed, row[3], row[5], row[6], row[7], row[9], row[10]))
+
+            conn.executemany(
+                "INSERT INTO entity_current (uei, cage, legal_name, registration_status, "
+                "registration_date, expiration_date, is_active, has_exclusions, exclusion_count, "
+                "error, record, digest, run_id, first_seen, changed, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (uei) DO UPDATE SET cage = excluded.cage, legal_name = excluded.legal_name, "
+                "registration_status = excluded.registration_status, "
+                "registration_date = excluded.registration_date, expiration_date = excluded.expiration_date, "
+                "is_active = excluded.is_active, has_exclusions = excluded.has_exclusions, "
+                "exclusion_count = excluded.exclusion_count, error = excluded.error, "
+                "record = excluded.record, digest = excluded.digest, run_id = excluded.run_id, "
+                "changed = excluded.changed, updated = excluded.updated",
+                upserts
+            )
+            conn.executemany("UPDATE entity_current SET run_id = ?, updated = ? WHERE uei = ?", touched)
+            conn.executemany(
+                "INSERT INTO entity_history (uei, run_id, recorded, registration_status, "
+                "expiration_date, is_active, has_exclusions, error, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                history
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return counts
+
+    @staticmethod
+    def _digests(conn: sqlite3.Connection, ueis: List[str]) -> Dict[str, str]:
+        known = {}
+        for i in range(0, len(ueis), 500):
+            chunk = ueis[i:i + 500]
+            known.update(conn.execute(
+                f"SELECT uei, digest FROM entity_current WHERE uei IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+        return known
+
+    def _current(self, where: str, params: tuple, order: str = "uei") -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            f"SELECT record, first_seen, changed, updated FROM entity_current WHERE {where} ORDER BY {order}",
+            params
+        ).fetchall()
+        return [self._status(row) for row in rows]
+
+    @staticmethod
+    def _status(row: sqlite3.Row) -> Dict[str, Any]:
+        status = codec.loads(row["record"])
+        status.update(first_seen=row["first_seen"], changed=row["changed"], updated=row["updated"])
+        return status
+
+    def get(self, uei: str) -> Optional[Dict[str, Any]]:
+        """Latest stored status of a UEI, with first_seen/changed/updated timestamps."""
+        rows = self._current("uei = ?", (uei.strip().upper(),))
+        return rows[0] if rows else None
+
+    def by_cage(self, cage: str) -> List[Dict[str, Any]]:
+        return self._current("cage = ?", (cage.strip().upper(),))
+
+    def by_status(self, registration_status: str) -> List[Dict[str, Any]]:
+        return self._current("registration_status = ?", (registration_status,))
+
+    def expiring_within(self, days: int = 30, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Active registrations whose expiration date falls in the next `days` days, soonest first."""
+        today = today or date.today()
+        return self._current(
+            "expiration_date BETWEEN ? AND ? AND registration_status = 'Active'",
+            (today.isoformat(), (today + timedelta(days=days)).isoformat()),
+            order="expiration_date, uei"
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """UEIs per registration status (None for not-found UEIs)."""
+        return dict(self._connect().execute(
+            "SELECT registration_status, COUNT(*) FROM entity_current GROUP BY registration_status"
+        ).fetchall())
+
+    def history(self, uei: str) -> List[Dict[str, Any]]:
+        """Every recorded status of a UEI, oldest first, each with its run ID and time."""
+        rows = self._connect().execute(
+            "SELECT run_id, recorded, record FROM entity_history WHERE uei = ? ORDER BY recorded, id",
+            (uei.strip().upper(),)
+        ).fetchall()
+        return [{"run_id": row["run_id"], "recorded": row["recorded"], **codec.loads(row["record"])}
+                for row in rows]
+
+    def lapsed_at(self, uei: str) -> Optional[float]:
+        """When the UEI was first seen inactive after its last active status, or None if active or never active."""
+        rows = self._connect().execute(
+            "SELECT recorded, is_active FROM entity_history WHERE uei = ? ORDER BY recorded DESC, id DESC",
+            (uei.strip().upper(),)
+        ).fetchall()
+        lapsed = None
+        for row in rows:
+            if row["is_active"]:
+                return lapsed
+            lapsed = row["recorded"]
+        return None
@@ -0,0 +1,366 @@
+"""
+Compact in-memory table of entity status records (see SAMEntityAPI.validate_entity_status).
+Fields are stored column-wise: names and addresses as packed UTF-8, repeated
+categorical values (registration status, structure code, city, state, ZIP, country)
+as integer codes into a shared pool, dates as day ordinals and flags as bytes, so a
+large portfolio costs a few hundred bytes per entity instead of a dict tree each.
+
+Rows behave like read-only dicts and reproduce the original record exactly,
+including key order. Values that do not fit their column type are kept per row
+as-is.
+"""
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from datetime import date
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator
+
+
+# key -> column kind, in validate_entity_status order
+STATUS_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("uei", "key"),
+    ("cage", "text"),
+    ("legal_name", "text"),
+    ("dba_name", "text"),
+    ("registration_status", "category"),
+    ("registration_date", "date"),
+    ("expiration_date", "date"),
+    ("is_active", "flag"),
+    ("has_exclusions", "flag"),
+    ("exclusion_count", "count"),
+    ("entity_structure", "category"),
+    ("error", "text")
+)
+
+ADDRESS_KEY = "physical_address"
+ADDRESS_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("addressLine1", "text"),
+    ("addressLine2", "text"),
+    ("city", "category"),
+    ("stateOrProvinceCode", "category"),
+    ("zipCode", "category"),
+    ("zipCodePlus4", "category"),
+    ("countryCode", "category")
+)
+
+_NONE = -1
+_MAX_CODE = 2 ** 31 - 1
+
+
+class CategoryPool:
+    """Interns repeated values as small integer codes shared by every column."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _KeyColumn:
+    """Plain str objects; the UEI column shares them with the table's row lookup."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, pool: CategoryPool):
+        self.data: List[Optional[str]] = []
+
+    def push(self) -> None:
+        self.data.append(None)
+
+    def set(self, row: int, value: Any) -> bool:
+        if value is not None and not isinstance(value, str):
+            self.data[row] = None
+            return False
+        self.data[row] = value
+        return True
+
+    def get(self, row: int) -> Any:
+        return self.data[row]
+
+
+class _TextColumn:
+    """UTF-8 packed into one buffer with per-row offset and length (-1 is None).
+
+    Replacing a row appends its new text; the old bytes stay in the buffer.
+    """
+
+    __slots__ = ("buffer", "offsets", "lengths")
+
+    def __init__(self, pool: CategoryPool):
+        self.buffer = bytearray()
+        self.offsets = array("q")
+        self.lengths = array("i")
+
+    def push(self) -> None:
+        self.offsets.append(0)
+        self.lengths.append(_NONE)
+
+    def set(self, row: int, value: Any) -> bool:
+        if not isinstance(value, str):
+            self.lengths[row] = _NONE
+            return value is None
+        encoded = value.encode("utf-8", "surrogatepass")
+        self.offsets[row] = len(self.buffer)
+        self.lengths[row] = len(encoded)
+        self.buffer += encoded
+        return True
+
+    def get(self, row: int) -> Any:
+        length = self.lengths[row]
+        if length == _NONE:
+            return None
+        start = self.offsets[row]
+        return self.buffer[start:start + length].decode("utf-8", "surrogatepass")
+
+
+class _CodeColumn:
+    """Categories, dates and counts as 32-bit integers (-1 is None)."""
+
+    __slots__ = ("kind", "pool", "data")
+
+    def __init__(self, pool: CategoryPool, kind: str):
+        self.kind = kind
+        self.pool = pool
+        self.data = array("i")
+
+    def push(self) -> None:
+        self.data.append(_NONE)
+
+    def set(self, row: int, value: Any) -> bool:
+        code = _NONE
+        fits = value is None
+        if value is None:
+            pass
+        elif self.kind == "category":
+            if isinstance(value, str) and len(self.pool) < _MAX_CODE:
+                code, fits = self.pool.code(value), True
+        elif self.kind == "count":
+            if type(value) is int and 0 <= value <= _MAX_CODE:
+                code, fits = value, True
+        elif isinstance(value, str) and len(value) == 10:
+            # date: only canonical YYYY-MM-DD, so decoding reproduces the input
+            try:
+                code, fits = date.fromisoformat(value).toordinal(), True
+            except ValueError:
+                pass
+        self.data[row] = code
+        return fits
+
+    def get(self, row: int) -> Any:
+        return self.decode(self.data[row])
+
+    def decode(self, code: int) -> Any:
+        if code == _NONE:
+            return None
+        if self.kind == "category":
+            return self.pool.values[code]
+        if self.kind == "date":
+            return date.fromordinal(code).isoformat()
+        return code
+
+
+class _FlagColumn:
+    """True/False/None as one byte."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, pool: CategoryPool):
+        self.data = bytearray()
+
+    def push(self) -> None:
+        self.data.append(2)
+
+    def set(self, row: int, value: Any) -> bool:
+        self.data[row] = int(value) if isinstance(value, bool) else 2
+        return value is None or isinstance(value, bool)
+
+    def get(self, row: int) -> Any:
+        stored = self.data[row]
+        return None if stored == 2 else bool(stored)
+
+
+def _column(kind: str, pool: CategoryPool):
+    if kind == "key":
+        return _KeyColumn(pool)
+    if kind == "text":
+        return _TextColumn(pool)
+    if kind == "flag":
+        return _FlagColumn(pool)
+    return _CodeColumn(pool, kind)
+
+
+class EntityRow(Mapping):
+    """Read-only dict view of one table row.
+
+    `physical_address` is rebuilt on each access; use to_dict() for a plain,
+    mutable copy of the whole record.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "EntityTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table._value(self._row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table._shape(self._row))
+
+    def __len__(self) -> int:
+        return len(self._table._shape(self._row))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._table._shape(self._row)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"EntityRow({self.to_dict()!r})"
+
+
+class EntityTable:
+    """Column-oriented store of entity status dicts keyed by UEI.
+
+    Appending a UEI that is already present replaces its row in place.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self.pool = CategoryPool()
+        self._columns = {key: _column(kind, self.pool) for key, kind in STATUS_COLUMNS}
+        self._address = {key: _column(kind, self.pool) for key, kind in ADDRESS_COLUMNS}
+        # Interned key tuples: which keys a row (and its address) has, in order
+        self._shapes = CategoryPool()
+        self._row_shape = array("i")
+        self._address_shape = array("i")
+        self._overflow: Dict[int, Dict[str, Any]] = {}
+        self._rows: Dict[str, int] = {}
+        self._count = 0
+        self.extend(records)
+
+    @classmethod
+    def from_statuses(cls, records: Iterable[Dict[str, Any]]) -> "EntityTable":
+        return cls(records)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, uei: object) -> bool:
+        return uei in self._rows
+
+    def __getitem__(self, row: int) -> EntityRow:
+        if not -self._count <= row < self._count:
+            raise IndexError("entity row out of range")
+        return EntityRow(self, row % self._count)
+
+    def __iter__(self) -> Iterator[EntityRow]:
+        return (EntityRow(self, row) for row in range(self._count))
+
+    def get(self, uei: str) -> Optional[EntityRow]:
+        row = self._rows.get(uei)
+        return EntityRow(self, row) if row is not None else None
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Store one status dict and return its row number."""
+        uei = record.get("uei")
+        row = self._rows.get(uei) if isinstance(uei, str) else None
+        if row is None:
+            row = self._count
+            self._count += 1
+            for column in self._columns.values():
+                column.push()
+            for column in self._address.values():
+                column.push()
+            self._row_shape.append(_NONE)
+            self._address_shape.append(_NONE)
+            if isinstance(uei, str):
+                self._rows[uei] = row
+        self._write(row, record)
+        return row
+
+    def _write(self, row: int, record: Dict[str, Any]) -> None:
+        overflow: Dict[str, Any] = {}
+        for key, column in self._columns.items():
+            if not column.set(row, record.get(key)):
+                overflow[key] = record[key]
+
+        address = record.get(ADDRESS_KEY)
+        address_shape = _NONE
+        for column in self._address.values():
+            column.set(row, None)
+        if isinstance(address, dict):
+            address_shape = self._shapes.code(tuple(address))
+            for key, value in address.items():
+                column = self._address.get(key)
+                if column is None or not column.set(row, value):
+                    overflow[f"{ADDRESS_KEY}.{key}"] = value
+        elif ADDRESS_KEY in record:
+            overflow[ADDRESS_KEY] = address
+
+        for key, value in record.items():
+            if key not in self._columns and key != ADDRESS_KEY:
+                overflow[key] = value
+
+        self._row_shape[row] = self._shapes.code(tuple(record))
+        self._address_shape[row] = address_shape
+        if overflow:
+            self._overflow[row] = overflow
+        else:
+            self._overflow.pop(row, None)
+
+    def _shape(self, row: int) -> Tuple[str, ...]:
+        return self._shapes.values[self._row_shape[row]]
+
+    def _value(self, row: int, key: str) -> Any:
+        if key not in self._shape(row):
+            raise KeyError(key)
+        overflow = self._overflow.get(row)
+        if overflow and key in overflow:
+            return overflow[key]
+        if key == ADDRESS_KEY:
+            return self._address_dict(row, overflow)
+        return self._columns[key].get(row)
+
+    def _address_dict(self, row: int, overflow: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        address = {}
+        for key in self._shapes.values[self._address_shape[row]]:
+            spilled = f"{ADDRESS_KEY}.{key}"
+            if overflow and spilled in overflow:
+                address[key] = overflow[spilled]
+            else:
+                address[key] = self._address[key].get(row)
+        return address
+
+    def column(self, key: str) -> List[Any]:
+        """Every row's value for one top-level field (None where a row lacks it)."""
+        return [row.get(key) for row in self]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [row.to_dict() for row in self]
+
+    def counts(self, key: str) -> Dict[Any, int]:
+        """Rows per value of a categorical field, e.g. counts("registration_status").
+
+        Rows without a value (including error rows) are counted under None.
+        """
+        column = self._columns.get(key)
+        if not isinstance(column, _CodeColumn) or column.kind != "category":
+            raise ValueError(f"'{key}' is not a categorical field")
+        return {column.decode(code): n for code, n in Counter(column.data).items()}
@@ -0,0 +1,307 @@
+"""
+Local fuzzy index over legal and DBA names of SAM entities we have already seen.
+Trigram postings give ranked fuzzy search and a sorted key list gives prefix
+autocomplete, both in memory. Records are appended to a JSONL log as they arrive,
+so the index grows incrementally and survives restarts.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import merge
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+import math
+import re
+import threading
+
+from config import Config
+from utils import codec
+
+
+# Dropped before indexing so "Acme Inc" and "ACME, L.L.C." compare as the same name
+LEGAL_SUFFIXES = {
+    "LLC", "INC", "INCORPORATED", "CORP", "CORPORATION", "CO", "COMPANY", "LTD", "LIMITED",
+    "LP", "LLP", "PLLC", "PC", "PA", "THE"
+}
+
+_PUNCTUATION = re.compile(r"[^A-Z0-9& ]+")
+
+
+def normalize_name(name: str) -> str:
+    """Uppercase, strip punctuation and legal suffixes, collapse whitespace."""
+    text = (name or "").upper().replace("L.L.C.", "LLC").replace("&", " & ")
+    words = _PUNCTUATION.sub(" ", text).split()
+    kept = [w for w in words if w not in LEGAL_SUFFIXES]
+    return " ".join(kept or words)
+
+
+def trigrams(normalized: str) -> List[str]:
+    """Distinct padded character trigrams of a normalized name."""
+    padded = f"  {normalized} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def registration_summary(entity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The entityRegistration-shaped fields the index keeps for one SAM record."""
+    reg = entity.get("entityRegistration") or {}
+    core = entity.get("coreData") or {}
+    uei = reg.get("ueiSAM") or core.get("ueiSAM") or entity.get("uei")
+    legal = reg.get("legalBusinessName") or core.get("legalBusinessName") or entity.get("legal_name")
+    if not uei or not legal:
+        return None
+    return {
+        "ueiSAM": uei,
+        "cageCode": reg.get("cageCode") or core.get("cageCode") or entity.get("cage"),
+        "legalBusinessName": legal,
+        "dbaName": reg.get("dbaName") or core.get("dbaName") or entity.get("dba_name"),
+        "registrationStatus": reg.get("registrationStatus") or entity.get("registration_status")
+    }
+
+
+def _name_keys(name: str, name_id: int) -> List[Tuple[str, int]]:
+    """Autocomplete keys of a name: the whole name and its suffix from each later word."""
+    keys = [(name, name_id)]
+    keys += [(name[i + 1:], name_id) for i, char in enumerate(name) if char == " "]
+    return keys
+
+
+class NameIndex:
+    """Trigram and prefix index keyed by UEI.
+
+    Each entity contributes one indexed name for its legal name and one for its DBA
+    name. Replaced names are tombstoned and dropped at the next compaction.
+    """
+
+    COMPACT_RATIO = 0.25
+    # Prefix keys of newly added names wait in a small sorted list that is merged into
+    # the main one once it outgrows this share of it (or PREFIX_MERGE_MIN keys)
+    PREFIX_MERGE_RATIO = 1 / 32
+    PREFIX_MERGE_MIN = 1024
+
+    _default: Optional["NameIndex"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._names: List[Tuple[str, str, str]] = []     # (uei, normalized, "legal" | "dba")
+        self._sizes = array("l")                          # trigram count per name
+        self._postings: Dict[str, array] = {}
+        self._by_uei: Dict[str, List[int]] = {}
+        self._dead: set = set()
+        self._prefix_keys: List[Tuple[str, int]] = []
+        self._prefix_new: List[Tuple[str, int]] = []
+        # Set while bulk (re)indexing; the next autocomplete sorts all keys once
+        self._prefix_dirty = False
+        self._log_lines = 0
+        self._loaded = self.path is None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def default(cls) -> "NameIndex":
+        """Process-wide index at NAME_INDEX_PATH, loaded on first use."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(Config.NAME_INDEX_PATH)
+            return cls._default
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self.records)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path and self.path.exists():
+                self._prefix_dirty = True
+                with open(self.path, "rb") as f:
+                    for line in f:
+                        try:
+                            record = codec.loads(line)
+                        except ValueError:
+                            # Truncated last line from an interrupted append
+                            continue
+                        self._index(record)
+                        self._log_lines += 1
+            self._loaded = True
+
+    def add(self, entity: Dict[str, Any]) -> bool:
+        """Index one SAM entity record (or entity-status dict). True if anything changed."""
+        return self.add_many([entity]) > 0
+
+    def add_many(self, entities: Iterable[Dict[str, Any]]) -> int:
+        """Index records and append the changed ones to the log in one write."""
+        self._ensure_loaded()
+        changed = []
+        with self._lock:
+            for entity in entities:
+                record = registration_summary(entity)
+                if record is None:
+                    continue
+                previous = self.records.get(record["ueiSAM"])
+                if previous is not None:
+                    # Keep fields a sparser record (e.g. a status dict) does not carry
+                    record = {k: v if v is not None else previous.get(k) for k, v in record.items()}
+                    if record == previous:
+                        continue
+                self._index(record)
+                changed.append(record)
+            if changed and self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(b"".join(codec.dumps(r) + b"\n" for r in changed))
+                self._log_lines += len(changed)
+                if self._log_lines > len(self.records) * (1 + self.COMPACT_RATIO) + 100:
+                    self.compact()
+        return len(changed)
+
+    def _index(self, record: Dict[str, Any]) -> None:
+        uei = record["ueiSAM"]
+        for name_id in self._by_uei.pop(uei, []):
+            self._dead.add(name_id)
+        self.records[uei] = record
+
+        ids = []
+        seen = set()
+        for kind, raw in (("legal", record.get("legalBusinessName")), ("dba", record.get("dbaName"))):
+            normalized = normalize_name(raw or "")
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            name_id = len(self._names)
+            grams = trigrams(normalized)
+            self._names.append((uei, normalized, kind))
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("l")
+                postings.append(name_id)
+            ids.append(name_id)
+            if not self._prefix_dirty:
+                for key in _name_keys(normalized, name_id):
+                    insort(self._prefix_new, key)
+        self._by_uei[uei] = ids
+        if len(self._prefix_new) > max(self.PREFIX_MERGE_MIN, len(self._prefix_keys) * self.PREFIX_MERGE_RATIO):
+            self._merge_prefix_keys()
+
+    def compact(self) -> None:
+        """Rebuild postings without tombstoned names and rewrite the log with live records.
+        
+        Lines another process appends while the log is rewritten are lost; the index
+        is a cache, and those entities are re-added the next time they are fetched.
+        """
+        with self._lock:
+            records = list(self.records.values())
+            self.records = {}
+            self._names = []
+            self._sizes = array("l")
+            self._postings = {}
+            self._by_uei = {}
+            self._dead = set()
+            self._prefix_dirty = True
+            for record in records:
+                self._index(record)
+            if self.path:
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(b"".join(codec.dumps(r) + b"\n" for r in records))
+                tmp.replace(self.path)
+                self._log_lines = len(records)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.4) -> List[Dict[str, Any]]:
+        """Ranked fuzzy matches by trigram Dice similarity, best name per entity."""
+        self._ensure_loaded()
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        grams = trigrams(normalized)
+        # Fewest shared trigrams any name needs to reach min_score
+        min_shared = max(1, math.ceil(min_score * len(grams) / (2.0 - min_score)))
+        with self._lock:
+            shared: Counter = Counter()
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings:
+                    shared.update(postings)
+            dead = self._dead
+            candidates = [(n, c) for n, c in shared.items() if c >= min_shared and n not in dead]
+
+            best: Dict[str, Tuple[float, int]] = {}
+            for name_id, overlap in candidates:
+                uei, name, _ = self._names[name_id]
+                score = 2.0 * overlap / (len(grams) + self._sizes[name_id])
+                if name == normalized:
+                    score = 1.0
+                elif name.startswith(normalized):
+                    score = min(1.0, score + 0.1)
+                if score >= min_score and score > best.get(uei, (0.0, 0))[0]:
+                    best[uei] = (score, name_id)
+
+            ranked = sorted(best.items(), key=lambda item: (-item[1][0], self._names[item[1][1]][1]))
+            return [self._hit(uei, score, name_id) for uei, (score, name_id) in ranked[:limit]]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Entities whose name, or any word of it, starts with the prefix.
+
+        Whole-name matches rank ahead of later-word matches; shorter names first.
+        """
+        self._ensure_loaded()
+        normalized = normalize_name(prefix) if prefix.strip() else ""
+        if not normalized:
+            return []
+        with self._lock:
+            if self._prefix_dirty:
+                self._rebuild_prefix_keys()
+            matches: Dict[str, Tuple[int, int, int]] = {}
+            for keys in (self._prefix_keys, self._prefix_new):
+                # Walk from the first candidate in place; slicing would copy the rest of the list
+                for i in range(bisect_left(keys, (normalized, -1)), len(keys)):
+                    key, name_id = keys[i]
+                    if not key.startswith(normalized):
+                        break
+                    if name_id in self._dead:
+                        continue
+                    uei, name, _ = self._names[name_id]
+                    rank = (0 if key == name else 1, len(name), name_id)
+                    if uei not in matches or rank < matches[uei]:
+                        matches[uei] = rank
+            ranked = sorted(matches.items(), key=lambda item: item[1])
+            return [self._hit(uei, 1.0 if rank[0] == 0 else 0.9, rank[2]) for uei, rank in ranked[:limit]]
+
+    def _rebuild_prefix_keys(self) -> None:
+        """Sort every live name's keys after a load or compaction."""
+        keys = []
+        for name_id, (_, name, _) in enumerate(self._names):
+            if name_id not in self._dead:
+                keys.extend(_name_keys(name, name_id))
+        keys.sort()
+        self._prefix_keys = keys
+        self._prefix_new = []
+        self._prefix_dirty = False
+
+    def _merge_prefix_keys(self) -> None:
+        """Fold the new keys into the main list in one linear pass, dropping replaced names."""
+        dead = self._dead
+        self._prefix_keys = [key for key in merge(self._prefix_keys, self._prefix_new) if key[1] not in dead]
+        self._prefix_new = []
+
+    def _hit(self, uei: str, score: float, name_id: int) -> Dict[str, Any]:
+        """entityData-shaped result, like an API search with includeSections=entityRegistration.
+
+        matchedName is the legal or DBA name as registered; matchedNameType says which.
+        """
+        record = self.records[uei]
+        kind = self._names[name_id][2]
+        return {
+            "entityRegistration": dict(record),
+            "matchScore": round(score, 3),
+            "matchedName": record.get("legalBusinessName" if kind == "legal" else "dbaName"),
+            "matchedNameType": kind
+        }
@@ -6,8 +6,9 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Optional, Iterator
+from utils.http_client import OpportunitiesClient
+from utils.pagination import Paginator, total_records
 from config import Config
 
 
@@ -15,7 +16,8 @@ class SBAOpportunitiesAPI:
     """SBA contracting opportunities via SAM.gov."""
     
     def __init__(self):
-        self.base_url = "https://api.sam.gov/opportunities/v2/search"
+        self.client = OpportunitiesClient()
+        self.base_url = self.client.base_url
         self.api_key = Config.SAM_API_KEY
     
     def search_opportunities(self,
@@ -23,39 +25,54 @@ class SBAOpportunitiesAPI:
                             naics_code: str = "",
                             set_aside: str = "",
                             posted_from: str = "",
-                            limit: int = 10) -> List[Dict[str, Any]]:
-        """Search federal contracting opportunities."""
+                            limit: int = 10,
+                            raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """Search federal contracting opportunities.
+        
+        A failed search returns [] unless raise_errors is set.
+        """
         try:
-            params = {
-                "api_key": self.api_key,
-                "ptype": "o",
-                "limit": limit
-            }
-            
-            if keywords:
-                params["q"] = keywords
-            if naics_code:
-                params["ncode"] = naics_code
-            if set_aside:
-                params["typeOfSetAside"] = set_aside
-            if posted_from:
-                params["postedFrom"] = posted_from
-            
-            response = requests.get(
-                self.base_url,
-                params=params,
-                headers={"X-Api-Key": self.api_key},
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get("opportunitiesData", [])
+            return list(self.iter_opportunities(keywords, naics_code, set_aside, posted_from,
+                                                max_records=limit,
+                                                page_size=max(1, min(limit, Config.OPPORTUNITIES_PAGE_SIZE))))
         
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error searching opportunities: {e}")
             return []
     
+    def iter_opportunities(self,
+                           keywords: str = "",
+                           naics_code: str = "",
+                           set_aside: str = "",
+                           posted_from: str = "",
+                           max_records: Optional[int] = None,
+                           page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Every matching opportunity, page by page, with the next pages fetched ahead.
+        
+        Each page is cached under its own offset for OPPORTUNITIES_CACHE_TTL_SECONDS,
+        well short of CACHE_TTL_SECONDS, so repeated searches reuse pages while newly
+        posted notices still show up within minutes. Errors propagate.
+        """
+        size = page_size or Config.OPPORTUNITIES_PAGE_SIZE
+        params = {"ptype": "o", "limit": size}
+        if keywords:
+            params["q"] = keywords
+        if naics_code:
+            params["ncode"] = naics_code
+        if set_aside:
+            params["typeOfSetAside"] = set_aside
+        if posted_from:
+            params["postedFrom"] = posted_from
+        
+        def fetch_page(page: int):
+            data = self.client.get("", params={**params, "offset": page * size},
+                                   ttl=Config.OPPORTUNITIES_CACHE_TTL_SECONDS)
+            return data.get("opportunitiesData", []), total_records(data)
+        
+        return iter(Paginator(fetch_page, size, max_records=max_records, name=self.client.api_name))
+    
     def get_8a_opportunities(self, naics_code: str = "", limit: int = 10) -> List[Dict[str, Any]]:
         """Get opportunities set aside for 8(a) certified businesses."""
         return self.search_opportunities(set_aside="8A", naics_code=naics_code, limit=limit)
@@ -83,6 +100,7 @@ def extract_opportunities(data: dict) -> list[dict]:
     normalized = []
     for item in ops:
         normalized.append({
+            "notice_id": item.get("noticeId"),
             "title": (item.get("title") or item.get("noticeTitle") or item.get("solicitationNumber")),
             "solicitation_number": item.get("solicitationNumber"),
             "agency": (item.get("agency") or item.get("department") or item.get("organizationName")),
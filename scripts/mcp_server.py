@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 import os
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, List
 
 from mcp.server.fastmcp import FastMCP
 
@@ -9,38 +12,250 @@ from mcp.server.fastmcp import FastMCP
 REPO_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(REPO_ROOT))
 
+from config import Config
+from workflows.jobs import Job, JobQueue
+
 mcp = FastMCP("federal-api-vault")
 
+# Workflow name -> (class in workflows.implementations, shared clients it takes)
 WORKFLOWS = {
-    "scan": "workflows.opportunity_scan",
-    "nightly": "workflows.nightly_sync",
-    "refresh": "workflows.entity_refresh",
+    "scan": ("OpportunityScanWorkflow", ("sba",)),
+    "nightly": ("NightlySyncWorkflow", ("sam", "sba", "dol")),
+    "refresh": ("EntityRefreshWorkflow", ("sam",)),
+    "labor": ("LaborStatsWorkflow", ("dol",)),
+    "match": ("OpportunityMatchingWorkflow", ("sam",)),
 }
 
+jobs = JobQueue(workers=Config.JOB_WORKERS, max_per_workflow=Config.JOB_MAX_PER_WORKFLOW)
+
+
+class JobOutputStream:
+    """stdout proxy: workflow prints from job threads go to the job log, never the MCP stream."""
+
+    def __init__(self, original, fallback):
+        self._original = original
+        self._fallback = fallback
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        job = jobs.current_job
+        if job is not None:
+            job.write_log(text)
+            return len(text)
+        with self._lock:
+            return self._fallback.write(text)
+
+    def flush(self) -> None:
+        self._fallback.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def services():
+    """Process-wide API clients and local stores, built once and shared by every tool call.
+
+    Sessions keep their connection pools and CacheStore keeps its in-memory tier
+    warm across calls, so repeat lookups never rebuild a client or touch disk.
+    """
+    from utils.registry import clients
+    return clients
+
+
+def _timed(started: float, payload: Dict[str, Any]) -> Dict[str, Any]:
+    payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return payload
+
+
+def _workflow_job(name: str, resume: bool):
+    def run(job: Job) -> Dict[str, Any]:
+        import workflows.implementations as implementations
+        class_name, client_names = WORKFLOWS[name]
+        shared = services()
+        workflow = getattr(implementations, class_name)(**{c: getattr(shared, c) for c in client_names})
+        workflow.run(resume=resume, progress=job)
+        return {"workflow": name, "resumed": resume}
+    return run
+
+
+def _not_found(job_id: str) -> Dict[str, Any]:
+    return {"error": f"Unknown job '{job_id}'"}
+
+
 @mcp.tool()
 def list_workflows() -> list[str]:
     """List available workflows."""
     return sorted(WORKFLOWS.keys())
 
 @mcp.tool()
-def run_workflow(name: str) -> str:
-    """Run a workflow by name: scan | nightly | refresh."""
+def run_workflow(name: str, resume: bool = False, client_id: str = "") -> Dict[str, Any]:
+    """Start a workflow in the background: scan | nightly | refresh | labor | match.
+
+    Returns immediately with a job ID. If the same workflow is already queued or
+    running with the same resume flag, that job is returned instead of starting a
+    duplicate.
+    """
     name = (name or "").strip().lower()
     if name not in WORKFLOWS:
-        return f"Unknown workflow '{name}'. Available: {', '.join(sorted(WORKFLOWS))}"
+        return {"error": f"Unknown workflow '{name}'. Available: {', '.join(sorted(WORKFLOWS))}"}
+
+    job = jobs.submit(name, _workflow_job(name, resume), client=client_id, options={"resume": resume})
+    return job.to_dict()
+
+@mcp.tool()
+def job_status(job_id: str) -> Dict[str, Any]:
+    """Status, per-stage progress counts and recent log lines for a job."""
+    job = jobs.get(job_id)
+    return job.to_dict() if job else _not_found(job_id)
+
+@mcp.tool()
+def list_jobs() -> List[Dict[str, Any]]:
+    """All recent jobs, newest last."""
+    return [job.to_dict() for job in jobs.list()]
+
+@mcp.tool()
+def job_results(job_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """Partial results produced so far (e.g. entity statuses), paged by offset/limit."""
+    job = jobs.get(job_id)
+    return job.partial(offset, min(max(limit, 1), 1000)) if job else _not_found(job_id)
+
+@mcp.tool()
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a job. Completed units stay checkpointed, so it can be resumed later."""
+    job = jobs.cancel(job_id)
+    return job.to_dict() if job else _not_found(job_id)
+
+@mcp.tool()
+def entity_status(uei: str = "", cage: str = "") -> Dict[str, Any]:
+    """Registration status, expiration and exclusion summary for one entity by UEI or CAGE code."""
+    started = time.perf_counter()
+    sam = services().sam
+    if not uei and cage:
+        entity = sam.get_entity_by_cage(cage)
+        if not entity:
+            return _timed(started, {"cage": cage, "error": "Entity not found", "is_active": False})
+        uei = entity.get("entityRegistration", {}).get("ueiSAM") or entity.get("coreData", {}).get("ueiSAM", "")
+    if not uei:
+        return _timed(started, {"error": "Provide a UEI or CAGE code"})
+    return _timed(started, sam.validate_entity_status(uei))
+
+@mcp.tool()
+def search_entities(name: str, limit: int = 10, prefix: bool = False) -> Dict[str, Any]:
+    """Fuzzy (or prefix, for autocomplete) search over legal and DBA names.
+
+    Answered from the local name index when it has a good match; otherwise falls
+    back to a SAM.gov name search.
+    """
+    started = time.perf_counter()
+    sam = services().sam
+    limit = min(max(limit, 1), 100)
+    if prefix:
+        entities = sam.autocomplete_name(name, limit=limit)
+    else:
+        entities = sam.search_by_name(name, limit=limit)
+    return _timed(started, {
+        "count": len(entities),
+        "source": "local" if entities and "matchScore" in entities[0] else "api",
+        "entities": entities
+    })
+
+@mcp.tool()
+def check_exclusions(uei: str) -> Dict[str, Any]:
+    """Active SAM.gov exclusions for an entity."""
+    started = time.perf_counter()
+    exclusions = services().sam.get_exclusions(uei)
+    return _timed(started, {
+        "uei": uei,
+        "has_exclusions": len(exclusions) > 0,
+        "exclusion_count": len(exclusions),
+        "exclusions": exclusions
+    })
+
+@mcp.tool()
+def search_opportunities(keywords: str = "", naics_code: str = "", set_aside: str = "",
+                         posted_from: str = "", limit: int = 10) -> Dict[str, Any]:
+    """Search contract opportunities; results are normalized like the scan workflow output."""
+    from sba.client import extract_opportunities
+
+    started = time.perf_counter()
+    ops = services().sba.search_opportunities(keywords=keywords, naics_code=naics_code,
+                                              set_aside=set_aside, posted_from=posted_from,
+                                              limit=min(max(limit, 1), 1000))
+    normalized = extract_opportunities({"opportunitiesData": ops})
+    return _timed(started, {"count": len(normalized), "opportunities": normalized})
+
+@mcp.tool()
+def validate_tax_id(tax_id: str) -> Dict[str, Any]:
+    """Identify and validate an EIN, SSN or ITIN (format rules only, no IRS lookup)."""
+    from irs.client import TaxIDValidator, validate_ein, validate_ssn, format_ein
+
+    started = time.perf_counter()
+    kind = TaxIDValidator.identify_tax_id_type(tax_id or "")
+    valid = {
+        "EIN": validate_ein,
+        "SSN": validate_ssn,
+        "ITIN": TaxIDValidator.validate_itin
+    }.get(kind, lambda _: False)(tax_id or "")
+    return _timed(started, {
+        "tax_id_type": kind,
+        "valid": valid,
+        "formatted": format_ein(tax_id) if kind == "EIN" else None
+    })
+
+@mcp.tool()
+def unemployment_rate(area_code: str) -> Dict[str, Any]:
+    """Latest unemployment rate and YoY change for an area from the local BLS series store."""
+    started = time.perf_counter()
+    comparison = services().series_store.compare_areas([area_code])
+    return _timed(started, {"area_code": area_code, **comparison.get(area_code, {})})
+
+@mcp.tool()
+def expiring_registrations(days: int = 30) -> Dict[str, Any]:
+    """Tracked entities whose active SAM registration expires within `days`, from the history store."""
+    started = time.perf_counter()
+    entities = services().entity_store.expiring_within(min(max(days, 0), 3650))
+    return _timed(started, {"days": days, "count": len(entities), "entities": entities})
+
+@mcp.tool()
+def entity_history(uei: str) -> Dict[str, Any]:
+    """Every recorded status change of a tracked entity and when its registration lapsed."""
+    started = time.perf_counter()
+    store = services().entity_store
+    return _timed(started, {
+        "uei": uei,
+        "current": store.get(uei),
+        "lapsed_at": store.lapsed_at(uei),
+        "history": store.history(uei)
+    })
+
+@mcp.tool()
+def cache_status() -> Dict[str, Any]:
+    """Refresh-ahead cache warmer: tracked, pinned and hot keys, pending revalidations."""
+    from utils.cache_warmer import CacheWarmer
+    return CacheWarmer.default().status()
 
-    mod_path = WORKFLOWS[name]
-    mod = __import__(mod_path, fromlist=["run"])
-    run_fn = getattr(mod, "run", None)
-    if not callable(run_fn):
-        return f"Workflow module '{mod_path}' has no callable run()"
+def start_cache_warmer() -> None:
+    """Pin tracked UEIs and refresh them and other hot keys ahead of expiry in the background."""
+    if not Config.CACHE_WARM_ENABLED:
+        return
+    from utils import codec
+    from utils.cache_warmer import CacheWarmer, pin_entities
 
-    run_fn()
-    return f"OK: ran workflow '{name}'"
+    warmer = CacheWarmer.default()
+    tracked = Path("data/tracked_entities.json")
+    if tracked.exists():
+        try:
+            pin_entities(warmer, services().sam, codec.load_file(tracked).get("ueis", []))
+        except (OSError, ValueError):
+            pass
+    warmer.start()
 
 def main():
     # MCP servers commonly use bearer token; keep it simple & compatible
     os.environ.setdefault("MCP_BEARER_TOKEN", os.environ.get("MCP_BEARER_TOKEN", "change_me"))
+    sys.stdout = JobOutputStream(sys.stdout, sys.stderr)
+    services().warm()
+    start_cache_warmer()
     mcp.run()
 
 if __name__ == "__main__":
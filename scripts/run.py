@@ -10,36 +10,73 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(REPO_ROOT))
 
 
+# Workflow name -> runner in workflows.implementations, imported only when selected
+RUNNERS = {
+    "nightly": "run_nightly_sync",
+    "scan": "run_opportunity_scan",
+    "refresh": "run_entity_refresh",
+    "labor": "run_labor_sync",
+    "match": "run_opportunity_matching"
+}
+
+
 def main():
     """Main entry point for workflow execution."""
-    from config import Config
-    
     if len(sys.argv) < 2:
         print("Federal API Vault - Workflow Runner")
-        print("\nUsage: python scripts/run.py <workflow>")
+        print("\nUsage: python scripts/run.py <workflow> [--resume] [--profile]")
         print("\nAvailable workflows:")
         print("  nightly   - Run complete nightly sync")
         print("  scan      - Scan for new opportunities")
         print("  refresh   - Refresh tracked entities")
+        print("  labor     - Refresh tracked BLS labor statistics")
+        print("  match     - Rank scanned opportunities for tracked entities")
         print("  test      - Run API connectivity test")
+        print("  wotc      - Score a WOTC roster: wotc <roster.csv|.ndjson> <output> [--area-rates]")
+        print("  queue     - Distributed entity refresh: queue <enqueue|work|collect|status>")
+        print("              [--run-id ID] [--threads N]")
+        print("  expiring  - Tracked registrations expiring soon: expiring [--days 30]")
+        print("\nOptions:")
+        print("  --resume  - Continue the last interrupted run, skipping completed units")
+        print("  --profile - Profile each stage (network/limiter/cache/JSON/CPU breakdown,")
+        print("              .prof files and collapsed stacks under data/profiles/)")
         return 2
     
     workflow = sys.argv[1].strip().lower()
+    resume = "--resume" in sys.argv[2:]
+    profile = "--profile" in sys.argv[2:]
     
-    from workflows.implementations import (
-        run_nightly_sync,
-        run_opportunity_scan,
-        run_entity_refresh
-    )
-    
-    if workflow == "nightly":
-        run_nightly_sync()
-    elif workflow == "scan":
-        run_opportunity_scan()
-    elif workflow == "refresh":
-        run_entity_refresh()
+    if workflow in RUNNERS:
+        from importlib import import_module
+        from config import Config
+        from utils.metrics import metrics, serve_prometheus
+        
+        runner = getattr(import_module("workflows.implementations"), RUNNERS[workflow])
+        if Config.METRICS_PORT:
+            serve_prometheus(Config.METRICS_PORT, host=Config.METRICS_HOST)
+            print(f"Metrics: http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics")
+        profiler = None
+        if profile:
+            from utils.profiling import WorkflowProfiler
+            profiler = WorkflowProfiler(workflow).start()
+        try:
+            if profiler:
+                with profiler.stage(workflow):
+                    runner(resume=resume)
+            else:
+                runner(resume=resume)
+        finally:
+            export_metrics(metrics, workflow)
+            if profiler:
+                export_profile(profiler)
     elif workflow == "test":
         run_api_test()
+    elif workflow == "wotc":
+        return run_wotc_batch(sys.argv[2:])
+    elif workflow == "queue":
+        return run_entity_queue(sys.argv[2:])
+    elif workflow == "expiring":
+        return run_expiring(sys.argv[2:])
     else:
         print(f"❌ Unknown workflow: {workflow}")
         return 2
@@ -47,34 +84,127 @@ def main():
     return 0
 
 
+def export_metrics(registry, workflow):
+    """Write Prometheus text and a JSON summary for this run."""
+    from config import Config
+    
+    metrics_dir = Path(Config.METRICS_DIR)
+    prom = registry.write_prometheus(str(metrics_dir / f"{workflow}.prom"))
+    summary_path = registry.write_summary(str(metrics_dir / f"{workflow}_summary.json"))
+    
+    summary = registry.summary()
+    requests_total = sum(summary["counters"].get("vault_responses_total", {}).values())
+    cache = summary["counters"].get("vault_cache_requests_total", {})
+    hits = sum(v for k, v in cache.items() if "result=hit" in k)
+    print(f"\n📊 {int(requests_total)} upstream requests, {int(hits)}/{int(sum(cache.values()))} cache hits")
+    print(f"   Metrics: {prom}  Summary: {summary_path}")
+
+
+def export_profile(profiler):
+    """Write the run's profiles and print where the time went."""
+    from utils.profiling import format_breakdown
+    
+    breakdown = profiler.stop()
+    print("\n⏱  Profile (seconds of thread time per stage)")
+    print(format_breakdown(breakdown))
+    print(f"   Profiles: {profiler.output_dir}")
+
+
+def run_wotc_batch(args):
+    """Score an applicant roster with the batch WOTC engine."""
+    paths = [a for a in args if not a.startswith("--")]
+    if len(paths) < 2:
+        print("Usage: python scripts/run.py wotc <roster.csv|.ndjson> <output> [--area-rates]")
+        return 2
+    
+    from dol.wotc_batch import WOTCBatchEngine
+    
+    engine = WOTCBatchEngine(enrich_area_rates="--area-rates" in args)
+    summary_path = str(Path(paths[1]).with_suffix(".summary.json"))
+    summary = engine.run(paths[0], paths[1], summary_path=summary_path)
+    
+    print(f"✅ Scored {summary['applicants']} applicants, {summary['eligible']} eligible")
+    print(f"   Total max credit: ${summary['total_max_credit_usd']:,}")
+    print(f"   Results: {paths[1]}  Summary: {summary_path}")
+    return 0
+
+
+def option(args, name, default=None):
+    """Value following `--name` in args, or default."""
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return default
+
+
+def run_entity_queue(args):
+    """Shard entity refresh across worker processes through the shared work queue."""
+    action = args[0] if args and not args[0].startswith("--") else ""
+    if action not in ("enqueue", "work", "collect", "status"):
+        print("Usage: python scripts/run.py queue <enqueue|work|collect|status> [--run-id ID] [--threads N]")
+        return 2
+    
+    from workflows.implementations import EntityRefreshWorkflow
+    from utils.metrics import metrics
+    
+    workflow = EntityRefreshWorkflow()
+    run_id = option(args, "--run-id")
+    if action == "enqueue":
+        workflow.enqueue(run_id)
+    elif action == "work":
+        try:
+            workflow.work(run_id, threads=int(option(args, "--threads", "1")))
+        finally:
+            export_metrics(metrics, "entity_refresh_worker")
+    elif action == "collect":
+        workflow.collect(run_id)
+    else:
+        run_id = run_id or workflow.work_queue.latest_run()
+        if run_id is None:
+            print("Nothing queued.")
+            return 0
+        counts = workflow.work_queue.stats(run_id)
+        print(f"Run {run_id}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    return 0
+
+
+def run_expiring(args):
+    """List active registrations expiring soon from the entity history store (no API calls)."""
+    from sam.entity_store import EntityStore
+    
+    days = int(option(args, "--days", "30"))
+    entities = EntityStore().expiring_within(days)
+    print(f"{len(entities)} active registrations expire within {days} days")
+    for entity in entities:
+        print(f"  {entity['expiration_date']}  {entity['uei']}  {entity.get('legal_name') or ''}")
+    return 0
+
+
 def run_api_test():
     """Quick connectivity test for all APIs."""
     print("=" * 50)
     print("API CONNECTIVITY TEST")
     print("=" * 50)
     
-    from sam.client import SAMEntityAPI
-    from sba.client import SBAOpportunitiesAPI
-    from dol.client import DOLAPI
+    from utils.registry import clients
     from irs.client import validate_ein
     
     print("\n[SAM.gov]")
     try:
-        sam = SAMEntityAPI()
+        clients.get("sam")
         print("✅ SAM.gov client initialized")
     except Exception as e:
         print(f"❌ SAM.gov error: {e}")
     
     print("\n[SBA Opportunities]")
     try:
-        sba = SBAOpportunitiesAPI()
+        clients.get("sba")
         print("✅ SBA client initialized")
     except Exception as e:
         print(f"❌ SBA error: {e}")
     
     print("\n[DOL/BLS]")
     try:
-        dol = DOLAPI()
+        clients.get("dol")
         print("✅ DOL/BLS client initialized")
     except Exception as e:
         print(f"❌ DOL/BLS error: {e}")
@@ -0,0 +1,79 @@
+"""The warmer reads each target's expiry once, not on every pass, and bounds pinned targets."""
+from utils.cache_warmer import CacheWarmer
+
+
+class FakeLimiter:
+    name = "test"
+    rate = 100
+
+
+class Entry:
+    """A cached value whose expiry reads are counted."""
+
+    def __init__(self, expires):
+        self.expires = expires
+        self.reads = 0
+        self.refreshes = 0
+
+    def expires_at(self):
+        self.reads += 1
+        return self.expires
+
+    def refresh(self):
+        self.refreshes += 1
+        self.expires += 3600
+
+
+def pinned(warmer, count, expires):
+    entries = {f"k{i}": Entry(expires) for i in range(count)}
+    for key, entry in entries.items():
+        assert warmer.pin(key, FakeLimiter(), entry.expires_at, entry.refresh)
+    return entries
+
+
+def test_expiry_is_read_once_until_it_comes_due():
+    warmer = CacheWarmer(refresh_ahead=600, max_keys=100)
+    entries = pinned(warmer, 50, expires=10_000)
+
+    for now in (0, 30, 60, 90):
+        assert warmer.due(now) == []
+    assert all(e.reads == 1 for e in entries.values())
+
+    due = warmer.due(now=9_500)
+    assert len(due) == 50
+    assert all(e.reads == 2 for e in entries.values())
+
+
+def test_renewed_entry_is_not_refreshed():
+    warmer = CacheWarmer(refresh_ahead=600, max_keys=10)
+    entry = pinned(warmer, 1, expires=1_000)["k0"]
+    assert warmer.due(now=0) == []
+
+    # A lookup re-cached it after the warmer read its expiry
+    entry.expires = 5_000
+    assert warmer.due(now=500) == []
+    assert warmer.due(now=4_500)[0][1].key == "k0"
+
+
+def test_refreshed_target_is_reread_and_rescheduled():
+    warmer = CacheWarmer(refresh_ahead=600, max_keys=10)
+    entry = pinned(warmer, 1, expires=100)["k0"]
+
+    assert warmer.run_once()["refreshed"] == 1
+    assert entry.refreshes == 1
+    # Its new expiry is read once on the next pass, then held
+    assert warmer.due(now=0) == [] and warmer.due(now=30) == []
+    assert entry.reads == 2
+
+
+def test_pinned_targets_count_toward_max_keys():
+    warmer = CacheWarmer(max_keys=3)
+    entry = Entry(10_000)
+    warmer.touch("hot", FakeLimiter(), entry.expires_at, entry.refresh)
+    pinned(warmer, 3, expires=10_000)
+
+    assert not warmer.pin("k3", FakeLimiter(), entry.expires_at, entry.refresh)
+    # Re-pinning a pinned key is still allowed
+    assert warmer.pin("k0", FakeLimiter(), entry.expires_at, entry.refresh)
+    status = warmer.status()
+    assert status["pinned"] == 3 and status["tracked_keys"] == 3
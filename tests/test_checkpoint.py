@@ -0,0 +1,49 @@
+"""A resumed run skips the units an interrupted run completed, and finished runs are never resumed."""
+from workflows.checkpoint import WorkflowCheckpoint
+
+
+UNITS = [f"UEI{i:09d}" for i in range(6)]
+
+
+def interrupted_run(directory, done):
+    checkpoint = WorkflowCheckpoint.start("refresh", checkpoint_dir=str(directory))
+    for unit in done:
+        checkpoint.record(unit, {"uei": unit, "is_active": True})
+    return checkpoint
+
+
+def test_resume_skips_completed_units(tmp_path):
+    first = interrupted_run(tmp_path, UNITS[:4])
+
+    resumed = WorkflowCheckpoint.start("refresh", resume=True, checkpoint_dir=str(tmp_path))
+    assert resumed.resumed and resumed.run_id == first.run_id
+    assert resumed.pending(UNITS) == UNITS[4:]
+    assert resumed.completed[UNITS[0]] == {"uei": UNITS[0], "is_active": True}
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    first = interrupted_run(tmp_path, UNITS[:2])
+    with open(first.path, "ab") as f:
+        f.write(b'{"unit": "UEI0000000')
+
+    resumed = WorkflowCheckpoint.latest_incomplete("refresh", checkpoint_dir=str(tmp_path))
+    assert resumed.pending(UNITS) == UNITS[2:]
+
+
+def test_without_resume_a_new_run_starts(tmp_path):
+    first = interrupted_run(tmp_path, UNITS[:4])
+
+    fresh = WorkflowCheckpoint.start("refresh", checkpoint_dir=str(tmp_path))
+    assert not fresh.resumed and fresh.run_id != first.run_id
+    assert fresh.pending(UNITS) == UNITS
+
+
+def test_finished_run_is_not_resumed_and_drops_older_runs(tmp_path):
+    older = interrupted_run(tmp_path, UNITS[:1])
+    latest = interrupted_run(tmp_path, UNITS)
+    latest.finish()
+
+    assert not older.path.exists()
+    assert WorkflowCheckpoint.latest_incomplete("refresh", checkpoint_dir=str(tmp_path)) is None
+    resumed = WorkflowCheckpoint.start("refresh", resume=True, checkpoint_dir=str(tmp_path))
+    assert not resumed.resumed and resumed.pending(UNITS) == UNITS
@@ -0,0 +1,51 @@
+"""Every JSON codec round-trips the same payloads, and atomic writes leave no temp file."""
+import pytest
+
+from utils import codec
+
+
+PAYLOAD = {"entityData": [{"ueiSAM": "ABCDEFGH1234", "name": "Café Ünïcode", "amount": 12.5,
+                           "active": True, "exclusions": None}], "totalRecords": 1}
+
+
+def codecs():
+    available = [codec.JSONCodec()]
+    try:
+        available.append(codec.OrjsonCodec())
+    except ImportError:
+        pass
+    return available
+
+
+@pytest.mark.parametrize("json_codec", codecs(), ids=lambda c: c.name)
+def test_round_trip(json_codec):
+    data = json_codec.dumps(PAYLOAD)
+    assert isinstance(data, bytes)
+    assert json_codec.loads(data) == PAYLOAD
+    assert json_codec.loads(memoryview(data)) == PAYLOAD
+    assert json_codec.loads(json_codec.dumps(PAYLOAD, pretty=True)) == PAYLOAD
+
+
+def test_codecs_agree():
+    encoded = [c.dumps(PAYLOAD) for c in codecs()]
+    assert all(c.loads(e) == PAYLOAD for c in codecs() for e in encoded)
+
+
+def test_orjson_falls_back_for_big_integers():
+    pytest.importorskip("orjson")
+    big = {"value": 2 ** 80}
+    assert codec.OrjsonCodec().loads(codec.OrjsonCodec().dumps(big)) == big
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        codec.set_codec("simdjson")
+
+
+def test_atomic_dump_file(tmp_path):
+    path = tmp_path / "series.json"
+    codec.dump_file({"old": True}, path)
+    codec.dump_file(PAYLOAD, path, atomic=True)
+
+    assert codec.load_file(path) == PAYLOAD
+    assert [p.name for p in tmp_path.iterdir()] == ["series.json"]
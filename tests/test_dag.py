@@ -0,0 +1,91 @@
+"""A failed stage skips everything downstream of it and nothing else."""
+import threading
+import time
+
+import pytest
+
+from workflows.dag import StageDAG
+from workflows.jobs import JobCancelled
+
+
+def fail():
+    raise RuntimeError("upstream API down")
+
+
+def test_failure_skips_transitive_dependents_only():
+    ran = []
+    dag = StageDAG()
+    dag.add_stage("entities", fail)
+    dag.add_stage("matching", lambda: ran.append("matching"), depends_on=["entities"])
+    dag.add_stage("report", lambda: ran.append("report"), depends_on=["matching"])
+    dag.add_stage("labor", lambda: ran.append("labor"))
+    dag.add_stage("labor_report", lambda: ran.append("labor_report"), depends_on=["labor"])
+
+    results = dag.run()
+
+    assert results["entities"].status == "failed"
+    assert "upstream API down" in results["entities"].error
+    assert results["matching"].status == "skipped"
+    assert results["report"].status == "skipped"
+    assert results["labor"].status == "succeeded"
+    assert results["labor_report"].status == "succeeded"
+    assert sorted(ran) == ["labor", "labor_report"]
+
+
+def test_stage_waits_for_every_dependency():
+    order = []
+    dag = StageDAG()
+    dag.add_stage("merge", lambda: order.append("merge"), depends_on=["slow", "fast"])
+    dag.add_stage("slow", lambda: (time.sleep(0.05), order.append("slow")))
+    dag.add_stage("fast", lambda: order.append("fast"))
+
+    dag.run()
+
+    assert order[-1] == "merge" and sorted(order[:2]) == ["fast", "slow"]
+
+
+def test_concurrency_limit_per_api():
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def call():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    dag = StageDAG(concurrency_limits={"sam": 1})
+    for i in range(4):
+        dag.add_stage(f"sam_{i}", call, api="sam")
+    results = dag.run()
+
+    assert all(r.status == "succeeded" for r in results.values())
+    assert peak[0] == 1
+
+
+def test_cancelled_stage_stops_the_dag():
+    def cancelled():
+        raise JobCancelled()
+
+    ran = []
+    dag = StageDAG()
+    dag.add_stage("scan", cancelled)
+    dag.add_stage("match", lambda: ran.append("match"), depends_on=["scan"])
+
+    with pytest.raises(JobCancelled):
+        dag.run()
+    assert ran == []
+
+
+@pytest.mark.parametrize("deps, message", [
+    ({"a": ["b"], "b": ["a"]}, "cycle"),
+    ({"a": ["missing"]}, "unknown stage"),
+])
+def test_invalid_graphs_are_rejected(deps, message):
+    dag = StageDAG()
+    for name, depends_on in deps.items():
+        dag.add_stage(name, lambda: None, depends_on=depends_on)
+    with pytest.raises(ValueError, match=message):
+        dag.run()
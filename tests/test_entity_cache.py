@@ -0,0 +1,34 @@
+"""The entity cache touches disk on first use, not when a client is built."""
+from sam.entity_cache import EntityCache
+
+
+ENTITY = {
+    "entityRegistration": {"ueiSAM": "ABCDEFGH1234", "registrationStatus": "Active"},
+    "coreData": {"ueiSAM": "ABCDEFGH1234", "cageCode": "1ABC2", "legalBusinessName": "Example Corp"}
+}
+
+
+def test_constructing_the_cache_creates_no_files(tmp_path):
+    path = tmp_path / "data" / "entity_cache.db"
+    cache = EntityCache(str(path))
+    assert not path.parent.exists()
+
+    assert cache.put(ENTITY, ("entityRegistration", "coreData")) == "ABCDEFGH1234"
+    assert path.exists()
+    assert cache.resolve("cage", "1abc2") == "ABCDEFGH1234"
+    assert cache.get("ABCDEFGH1234", ("entityRegistration",)) is not None
+
+
+def test_hits_are_labelled_with_the_kind_looked_up(tmp_path):
+    from utils.metrics import metrics
+
+    def counts():
+        return dict(metrics.summary()["counters"].get("vault_entity_cache_requests_total", {}))
+
+    cache = EntityCache(str(tmp_path / "entity_cache.db"))
+    cache.put(ENTITY, ("entityRegistration", "coreData"))
+    before = counts()
+    cache.get("ABCDEFGH1234", ("entityRegistration",), kind="cage")
+    after = counts()
+    assert after.get("kind=cage,result=hit", 0) == before.get("kind=cage,result=hit", 0) + 1
+    assert after.get("kind=uei,result=hit", 0) == before.get("kind=uei,result=hit", 0)
@@ -0,0 +1,67 @@
+"""A failed refresh must not overwrite or lapse the stored status of a UEI."""
+import pytest
+
+from config import Config
+from sam.client import LOOKUP_FAILED, SAMEntityAPI
+from sam.entity_store import EntityStore
+
+
+UEI = "ABCDEFGH1234"
+ENTITY = {
+    "entityRegistration": {"ueiSAM": UEI, "registrationStatus": "Active", "expirationDate": "2027-01-31"},
+    "coreData": {"ueiSAM": UEI, "cageCode": "1ABC2", "legalBusinessName": "Example Corp"}
+}
+
+
+class FakeClient:
+    """Stands in for SAMClient: answers from ENTITY or raises like a dropped connection."""
+
+    rate_limiter = None
+
+    def __init__(self, fail=False, fail_exclusions=False):
+        self.fail = fail
+        self.fail_exclusions = fail_exclusions
+
+    def get(self, endpoint, params=None, use_cache=True, refresh=False):
+        exclusions = params["includeSections"] == "exclusionDetails"
+        if self.fail or (exclusions and self.fail_exclusions):
+            raise ConnectionError("connection reset by peer")
+        return {"totalRecords": 1, "entityData": [ENTITY]}
+
+
+@pytest.fixture
+def sam(monkeypatch):
+    monkeypatch.setattr(Config, "NAME_INDEX_ENABLED", False)
+    monkeypatch.setattr(Config, "ENTITY_CACHE_ENABLED", False)
+    api = SAMEntityAPI()
+    api.client = FakeClient()
+    return api
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EntityStore(f"sqlite:///{tmp_path / 'vault.db'}")
+
+
+def test_failed_lookup_keeps_last_status(sam, store):
+    assert store.upsert_many([sam.validate_entity_status(UEI)], run_id="r1")["new"] == 1
+
+    sam.client = FakeClient(fail=True)
+    failed = sam.validate_entity_status(UEI)
+    assert failed["error"].startswith(LOOKUP_FAILED)
+
+    counts = store.upsert_many([failed], run_id="r2")
+    assert counts["changed"] == 0 and counts["skipped"] == 1
+    assert store.lapsed_at(UEI) is None
+    assert store.get(UEI)["registration_status"] == "Active"
+    assert len(store.history(UEI)) == 1
+
+
+def test_failed_exclusions_lookup_is_not_recorded_as_clean(sam, store):
+    sam.client = FakeClient(fail_exclusions=True)
+    status = sam.validate_entity_status(UEI)
+    assert status["error"].startswith(LOOKUP_FAILED)
+    assert "has_exclusions" not in status
+
+    assert store.upsert_many([status], run_id="r1")["skipped"] == 1
+    assert store.get(UEI) is None
@@ -0,0 +1,68 @@
+"""Hedged GETs never exceed HEDGE_MAX_RATIO of GETs, even when many are slow at once."""
+import threading
+import time
+
+import pytest
+
+from config import Config
+from utils.http_client import FederalAPIClient
+
+
+class SlowSession:
+    """Every request takes `latency` seconds; counts the requests sent."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.sent += 1
+        time.sleep(self.latency)
+        return Response()
+
+
+class Response:
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch, request):
+    monkeypatch.setattr(Config, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(Config, "HEDGE_MAX_RATIO", 0.1)
+    api = FederalAPIClient(f"hedge_test_{request.node.name}", "", "http://localhost", rate_limit=10_000)
+    # Hedge any GET still unanswered after 1 ms
+    monkeypatch.setattr(api, "_hedge_delay", lambda endpoint_label: 0.001)
+    return api
+
+
+def send(api, session):
+    return api._send(session, "GET", "http://localhost/x", {}, None, {}, "/x")
+
+
+def test_sequential_hedges_stay_within_ratio(client):
+    session = SlowSession(latency=0.01)
+    for count in range(1, 41):
+        send(client, session)
+        assert client._hedges_sent <= Config.HEDGE_MAX_RATIO * count
+    assert client._hedges_sent == 4
+
+
+def test_concurrent_hedges_stay_within_ratio(client):
+    session = SlowSession(latency=0.02)
+    threads = [threading.Thread(target=send, args=(client, session)) for _ in range(60)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client._hedge_gets == 60
+    assert 0 < client._hedges_sent <= 6
+
+
+def test_posts_are_never_hedged(client):
+    session = SlowSession(latency=0.01)
+    client._send(session, "POST", "http://localhost/x", {}, b"{}", {}, "/x")
+    assert session.sent == 1 and client._hedge_gets == 0
@@ -0,0 +1,72 @@
+"""The job queue serves clients round-robin and only dedupes identical requests."""
+import threading
+import time
+
+import pytest
+
+from workflows.jobs import JobQueue
+
+
+@pytest.fixture
+def queue():
+    jobs = JobQueue(workers=1, max_per_workflow=4)
+    yield jobs
+    jobs.shutdown()
+
+
+def blocker(queue):
+    """Occupy the only worker until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def run(job):
+        started.set()
+        release.wait(5)
+    queue.submit("block", run, client="setup")
+    assert started.wait(5)
+    return release
+
+
+def wait_all(jobs, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not all(job.done for job in jobs) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert all(job.done for job in jobs), [job.to_dict() for job in jobs]
+
+
+def test_clients_take_turns(queue):
+    release = blocker(queue)
+    order = []
+    jobs = [queue.submit(f"{client}{i}", lambda job: order.append(job.workflow), client=client)
+            for client, i in (("a", 1), ("a", 2), ("a", 3), ("b", 1), ("c", 1))]
+    release.set()
+    wait_all(jobs)
+
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+
+
+def test_dedupe_matches_workflow_and_options(queue):
+    release = blocker(queue)
+    fresh = queue.submit("refresh", lambda job: None, options={"resume": False})
+    assert queue.submit("refresh", lambda job: None, options={"resume": False}) is fresh
+
+    resumed = queue.submit("refresh", lambda job: None, options={"resume": True})
+    assert resumed is not fresh
+    assert queue.submit("refresh", lambda job: None, options={"resume": True}) is resumed
+    assert queue.submit("refresh", lambda job: None, options={"resume": False}, dedupe=False) is not fresh
+
+    release.set()
+    wait_all([fresh, resumed])
+    assert queue.submit("refresh", lambda job: None, options={"resume": False}) is not fresh
+
+
+def test_cancelled_queued_job_never_runs_and_is_not_reused(queue):
+    release = blocker(queue)
+    ran = []
+    job = queue.submit("scan", lambda job: ran.append(job.id))
+    queue.cancel(job.id)
+    again = queue.submit("scan", lambda job: ran.append(job.id))
+    release.set()
+    wait_all([job, again])
+
+    assert job.status == "cancelled" and again is not job
+    assert ran == [again.id]
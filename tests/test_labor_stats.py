@@ -0,0 +1,60 @@
+"""Labor stats runs with failed BLS batches stay resumable."""
+from datetime import datetime
+
+import pytest
+
+from utils import codec
+from workflows.checkpoint import WorkflowCheckpoint
+from workflows.implementations import LaborStatsWorkflow
+from workflows.jobs import Job, JobCancelled
+
+
+SERIES = [f"CUUR{i:04d}SA0" for i in range(60)]    # two BLS requests: 50 + 10 series
+
+
+class FakeDOL:
+    """Answers every requested series with one observation, failing requests that include `down`."""
+
+    def __init__(self, down=()):
+        self.down = set(down)
+        self.requests = []
+
+    def get_series_data(self, series_ids, start_year, end_year):
+        self.requests.append(list(series_ids))
+        if self.down & set(series_ids):
+            return {"status": "REQUEST_FAILED", "message": "timed out"}
+        year = str(datetime.now().year)
+        return {"status": "REQUEST_SUCCEEDED", "Results": {"series": [
+            {"seriesID": sid, "data": [{"year": year, "period": "M01", "value": "3.5"}]}
+            for sid in series_ids
+        ]}}
+
+
+@pytest.fixture
+def workflow_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    codec.dump_file({"series_ids": SERIES, "area_codes": []}, tmp_path / "data" / "labor_series.json")
+    return tmp_path
+
+
+def test_failed_batch_leaves_run_resumable(workflow_dir):
+    LaborStatsWorkflow(dol=FakeDOL(down={SERIES[55]})).run()
+
+    pending = WorkflowCheckpoint.latest_incomplete("labor_stats")
+    assert pending is not None
+    assert sorted(pending.completed) == sorted(SERIES[:50])
+
+    retry = FakeDOL()
+    LaborStatsWorkflow(dol=retry).run(resume=True)
+    assert retry.requests == [SERIES[50:]]
+    assert WorkflowCheckpoint.latest_incomplete("labor_stats") is None
+
+
+def test_cancel_before_first_batch(workflow_dir):
+    dol = FakeDOL()
+    job = Job("labor_stats", lambda job: None)
+    job.cancel()
+    with pytest.raises(JobCancelled):
+        LaborStatsWorkflow(dol=dol).run(progress=job)
+    assert dol.requests == []
@@ -0,0 +1,129 @@
+"""MatchingEngine must agree with a brute-force scan, including its incremental paths."""
+from datetime import datetime
+import random
+import time
+
+from workflows.matching import (
+    AGENCY_WEIGHT, PRIMARY_NAICS_WEIGHT, SECONDARY_NAICS_WEIGHT,
+    EntityProfile, MatchingEngine, OpportunityIndex,
+    normalize_set_aside, opportunity_key, parse_deadline, set_aside_weight
+)
+
+
+NAICS = ["541511", "541512", "541519", "236220", "561210", "334111"]
+SET_ASIDES = ["", "NONE", "SBA", "8A", "HZC", "WOSB", "EDWOSB", "SDVOSBC"]
+AGENCIES = ["DOD", "GSA", "VA", "NASA", None]
+LIMIT = 5
+
+
+def brute_force(profile, notices, limit, cutoff):
+    """Score every live notice directly, best score first, then earliest deadline."""
+    if not profile.eligible or not profile.naics:
+        return []
+    found = []
+    for notice in notices:
+        naics = notice.get("naics_code") or ""
+        set_aside = normalize_set_aside(notice.get("set_aside"))
+        deadline = parse_deadline(notice.get("response_deadline"))
+        if naics not in profile.naics or set_aside not in profile.set_asides or deadline < cutoff:
+            continue
+        weight = PRIMARY_NAICS_WEIGHT if naics == profile.naics[0] else SECONDARY_NAICS_WEIGHT
+        score = weight + set_aside_weight(set_aside)
+        if (notice.get("agency") or "").upper() in profile.agencies:
+            score += AGENCY_WEIGHT
+        found.append((round(score, 3), deadline, opportunity_key(notice)))
+    found.sort(key=lambda m: (-m[0], m[1], m[2]))
+    return found[:limit]
+
+
+class Corpus:
+    """Random notices with distinct deadlines (whole hours + 30 min from now) so rankings have no ties."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.now = time.time()
+        self.hours = iter(self.rng.sample(range(-48, 24 * 120), 24 * 100))
+        self.live = {}
+        self.count = 0
+
+    def deadline(self):
+        stamp = self.now + next(self.hours) * 3600 + 1800
+        return datetime.fromtimestamp(stamp).isoformat(timespec="seconds")
+
+    def notice(self, notice_id=None):
+        if notice_id is None:
+            notice_id = f"N{self.count:05d}"
+            self.count += 1
+        record = {
+            "notice_id": notice_id,
+            "naics_code": self.rng.choice(NAICS),
+            "set_aside": self.rng.choice(SET_ASIDES),
+            "agency": self.rng.choice(AGENCIES),
+            "response_deadline": self.deadline()
+        }
+        self.live[notice_id] = record
+        return record
+
+    def new(self, count):
+        return [self.notice() for _ in range(count)]
+
+    def amend(self, count):
+        return [self.notice(notice_id) for notice_id in self.rng.sample(sorted(self.live), count)]
+
+
+def profiles(rng, count):
+    result = []
+    for i in range(count):
+        result.append(EntityProfile(
+            f"UEI{i:04d}",
+            naics=rng.sample(NAICS, rng.randint(0, 3)),
+            set_asides=rng.sample(SET_ASIDES[2:], rng.randint(0, 3)),
+            agencies=[a for a in rng.sample(AGENCIES, 2) if a],
+            eligible=rng.random() > 0.1
+        ))
+    return result
+
+
+def assert_matches_brute_force(engine, corpus):
+    cutoff = engine.cutoff()
+    notices = list(corpus.live.values())
+    for uei, profile in engine.profiles.items():
+        assert engine.matches.get(uei, []) == brute_force(profile, notices, engine.limit, cutoff), uei
+
+
+def test_incremental_matching_equals_brute_force():
+    corpus = Corpus(seed=3)
+    engine = MatchingEngine(index=OpportunityIndex(), limit=LIMIT)
+    engine.set_profiles(profiles(corpus.rng, 60))
+
+    engine.add_opportunities(corpus.new(400))           # mostly new: full probe
+    assert_matches_brute_force(engine, corpus)
+
+    for _ in range(3):
+        engine.add_opportunities(corpus.new(30))         # delta probe and merge
+        assert_matches_brute_force(engine, corpus)
+        engine.add_opportunities(corpus.amend(30))       # amended notices, refills
+        assert_matches_brute_force(engine, corpus)
+
+
+def test_prune_refills_to_brute_force():
+    corpus = Corpus(seed=5)
+    engine = MatchingEngine(index=OpportunityIndex(), limit=LIMIT)
+    engine.set_profiles(profiles(corpus.rng, 60))
+    engine.add_opportunities(corpus.new(500))
+
+    for days in (3, 10, 30):
+        engine.min_days_to_respond = days
+        engine.prune()
+        assert_matches_brute_force(engine, corpus)
+
+
+def test_changed_profiles_are_rematched():
+    corpus = Corpus(seed=7)
+    engine = MatchingEngine(index=OpportunityIndex(), limit=LIMIT)
+    engine.set_profiles(profiles(corpus.rng, 40))
+    engine.add_opportunities(corpus.new(300))
+
+    changed = engine.set_profiles(profiles(random.Random(8), 40))
+    engine.match_all(changed)
+    assert_matches_brute_force(engine, corpus)
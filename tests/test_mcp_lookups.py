@@ -0,0 +1,76 @@
+"""MCP lookup tools answer from the shared clients and always report elapsed_ms."""
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("mcp")
+
+
+UEI = "ABCDEFGH1234"
+
+
+@pytest.fixture(scope="module")
+def server():
+    path = Path(__file__).resolve().parents[1] / "scripts" / "mcp_server.py"
+    spec = importlib.util.spec_from_file_location("mcp_server_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module.jobs.shutdown()
+
+
+class FakeSAM:
+    """Knows one entity by UEI and CAGE; records the UEIs it validated."""
+
+    def __init__(self):
+        self.validated = []
+
+    def get_entity_by_cage(self, cage):
+        if cage == "1ABC2":
+            return {"entityRegistration": {"ueiSAM": UEI}}
+        return None
+
+    def validate_entity_status(self, uei):
+        self.validated.append(uei)
+        return {"uei": uei, "is_active": True}
+
+    def autocomplete_name(self, prefix, limit=10):
+        return [{"ueiSAM": UEI, "legalBusinessName": "Example Corp", "matchScore": 100.0}]
+
+    def search_by_name(self, name, limit=10):
+        return [{"entityRegistration": {"ueiSAM": UEI}}]
+
+
+@pytest.fixture
+def sam(server, monkeypatch):
+    fake = FakeSAM()
+    monkeypatch.setattr(server, "services", lambda: SimpleNamespace(sam=fake))
+    return fake
+
+
+def test_entity_status_by_cage_resolves_the_uei(server, sam):
+    result = server.entity_status(cage="1ABC2")
+    assert result["uei"] == UEI and result["is_active"]
+    assert sam.validated == [UEI]
+    assert result["elapsed_ms"] >= 0
+
+
+@pytest.mark.parametrize("kwargs, error", [
+    ({}, "Provide a UEI or CAGE code"),
+    ({"cage": "0NONE"}, "Entity not found"),
+])
+def test_entity_status_errors_are_timed(server, sam, kwargs, error):
+    result = server.entity_status(**kwargs)
+    assert result["error"] == error
+    assert "elapsed_ms" in result
+    assert sam.validated == []
+
+
+def test_search_entities_reports_its_source(server, sam):
+    local = server.search_entities("exam", prefix=True)
+    assert local["source"] == "local" and local["count"] == 1
+
+    remote = server.search_entities("example corp")
+    assert remote["source"] == "api" and "elapsed_ms" in remote
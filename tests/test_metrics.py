@@ -0,0 +1,51 @@
+"""Metrics render as valid Prometheus text and histogram quantiles stay within their bucket."""
+from utils.metrics import MetricsRegistry
+
+
+def test_prometheus_text():
+    registry = MetricsRegistry()
+    registry.describe("vault_requests_total", "API requests")
+    registry.inc("vault_requests_total", api="sam", status="200")
+    registry.inc("vault_requests_total", 2, api="sam", status="200")
+    registry.set_gauge("vault_queue_depth", 4, queue='entity "refresh"')
+    for value in (0.02, 0.2, 3.0):
+        registry.observe("vault_request_duration_seconds", value, buckets=(0.1, 1.0), api="sam")
+
+    lines = registry.render_prometheus().splitlines()
+
+    assert "# HELP vault_requests_total API requests" in lines
+    assert "# TYPE vault_requests_total counter" in lines
+    assert 'vault_requests_total{api="sam",status="200"} 3.0' in lines
+    assert 'vault_queue_depth{queue="entity \\"refresh\\""} 4' in lines
+    assert 'vault_request_duration_seconds_bucket{api="sam",le="0.1"} 1' in lines
+    assert 'vault_request_duration_seconds_bucket{api="sam",le="1.0"} 2' in lines
+    assert 'vault_request_duration_seconds_bucket{api="sam",le="+Inf"} 3' in lines
+    assert 'vault_request_duration_seconds_count{api="sam"} 3' in lines
+
+
+def test_quantile_needs_min_count_and_interpolates():
+    registry = MetricsRegistry()
+    assert registry.quantile("latency", 0.5) is None
+    for _ in range(10):
+        registry.observe("latency", 0.3, buckets=(0.1, 0.5, 1.0), api="sam")
+
+    assert registry.quantile("latency", 0.5, min_count=11, api="sam") is None
+    median = registry.quantile("latency", 0.5, min_count=10, api="sam")
+    assert 0.1 < median <= 0.5
+    assert registry.quantile("latency", 0.5, api="other") is None
+
+
+def test_summary_and_reset():
+    registry = MetricsRegistry()
+    registry.inc("hits", api="sam")
+    registry.observe("latency", 0.2, api="sam")
+    registry.record_workflow("refresh", units=10, seconds=2.0)
+
+    summary = registry.summary()
+    assert summary["counters"]["hits"] == {"api=sam": 1.0}
+    assert summary["histograms"]["latency"]["api=sam"]["count"] == 1
+    assert summary["gauges"]["vault_workflow_last_units_per_second"] == {"workflow=refresh": 5.0}
+
+    registry.reset()
+    assert registry.counter_value("hits", api="sam") == 0.0
+    assert registry.summary()["counters"] == {}
@@ -0,0 +1,39 @@
+"""The API clients work end to end against the benchmark mock server (HTTP, gzip, paging)."""
+import pytest
+
+pytest.importorskip("requests")
+
+from benchmarks.mock_server import MockFederalServer, MockSettings
+from config import Config
+from sam.client import ENTITY_NOT_FOUND, SAMEntityAPI
+from sba.client import SBAOpportunitiesAPI
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with MockFederalServer(MockSettings(latency_ms=0, jitter_ms=0, notices_total=2500)) as mock:
+        monkeypatch.setattr(Config, "SAM_BASE_URL", f"{mock.url}/entities")
+        monkeypatch.setattr(Config, "SAM_OPPORTUNITIES_URL", f"{mock.url}/opportunities")
+        monkeypatch.setattr(Config, "SAM_API_KEY", "test")
+        monkeypatch.setattr(Config, "CACHE_ENABLED", False)
+        monkeypatch.setattr(Config, "NAME_INDEX_ENABLED", False)
+        monkeypatch.setattr(Config, "ENTITY_CACHE_ENABLED", False)
+        yield mock
+
+
+def test_entity_status_over_http(server):
+    sam = SAMEntityAPI()
+
+    status = sam.validate_entity_status("ABCDEFGH1234")
+    assert status["uei"] == "ABCDEFGH1234" and "error" not in status
+    assert sam.validate_entity_status("MISSING00001")["error"] == ENTITY_NOT_FOUND
+    assert server.requests_served == 3
+
+
+def test_opportunity_pages_stream_over_http(server):
+    sba = SBAOpportunitiesAPI()
+
+    notices = list(sba.iter_opportunities(naics_code="541512", page_size=1000))
+    assert len(notices) == 2500
+    assert len({n["noticeId"] for n in notices}) == 2500
+    assert server.requests_served == 3
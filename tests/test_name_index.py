@@ -0,0 +1,29 @@
+"""Autocomplete over incrementally added names matches a freshly rebuilt index."""
+import random
+
+from sam.name_index import NameIndex
+
+
+WORDS = ["acme", "federal", "systems", "solutions", "group", "global", "tech", "services", "north", "apex"]
+
+
+def entity(rng, uei):
+    name = " ".join(rng.sample(WORDS, rng.randint(1, 3))).title()
+    dba = " ".join(rng.sample(WORDS, 2)).title() if rng.random() < 0.3 else None
+    return {"entityRegistration": {"ueiSAM": uei, "legalBusinessName": name, "dbaName": dba,
+                                   "registrationStatus": "Active"}}
+
+
+def test_incremental_autocomplete_equals_rebuild():
+    rng = random.Random(11)
+    index = NameIndex()
+    index.PREFIX_MERGE_MIN = 16                  # exercise the side list and several merges
+    prefixes = ["a", "acme", "fed", "global t", "s", "north apex", "zz"]
+
+    for round_ in range(30):
+        # New entities and renames of existing ones, between autocomplete calls
+        index.add_many(entity(rng, f"UEI{rng.randint(0, 120):04d}") for _ in range(10))
+        incremental = {prefix: index.autocomplete(prefix, limit=50) for prefix in prefixes}
+        index._prefix_dirty = True               # next call re-sorts every key from scratch
+        for prefix in prefixes:
+            assert index.autocomplete(prefix, limit=50) == incremental[prefix], (round_, prefix)
@@ -0,0 +1,52 @@
+"""Paged searches stream every record once, and opportunity pages are cached briefly."""
+import time
+
+from config import Config
+from sba.client import SBAOpportunitiesAPI
+from utils.http_client import CacheStore
+from utils.pagination import Paginator
+
+
+def numbered_pages(total, page_size, calls):
+    def fetch_page(page):
+        calls.append(page)
+        start = page * page_size
+        return [{"n": n} for n in range(start, min(start + page_size, total))], total
+    return fetch_page
+
+
+def test_prefetched_pages_stream_in_order():
+    calls = []
+    records = list(Paginator(numbered_pages(95, 10, calls), 10, prefetch=3))
+    assert [r["n"] for r in records] == list(range(95))
+    assert sorted(calls) == list(range(10))
+
+
+def test_max_records_stops_requests():
+    calls = []
+    records = list(Paginator(numbered_pages(1000, 10, calls), 10, max_records=25, prefetch=2))
+    assert len(records) == 25
+    assert sorted(calls) == [0, 1, 2]
+
+
+def test_opportunity_pages_are_cached_with_short_ttl(tmp_path, monkeypatch):
+    api = SBAOpportunitiesAPI()
+    api.client.cache = CacheStore(str(tmp_path / "cache"))
+    requests = []
+
+    def request(method, endpoint, params, json_body=None):
+        requests.append(params["offset"])
+        offset = params["offset"]
+        return {"totalRecords": 5, "opportunitiesData": [{"noticeId": str(n)} for n in range(offset, min(offset + 2, 5))]}
+
+    monkeypatch.setattr(api.client, "_request", request)
+    first = list(api.iter_opportunities(naics_code="541512", page_size=2))
+    second = list(api.iter_opportunities(naics_code="541512", page_size=2))
+
+    assert first == second and len(first) == 5
+    assert sorted(requests) == [0, 2, 4]
+
+    key = api.client._build_cache_key("", {"ptype": "o", "limit": 2, "ncode": "541512", "offset": 0})
+    remaining = api.client.cache.expires_at(key) - time.time()
+    ttl = Config.OPPORTUNITIES_CACHE_TTL_SECONDS
+    assert ttl * (1 - Config.CACHE_TTL_JITTER) - 1 <= remaining <= ttl * (1 + Config.CACHE_TTL_JITTER)
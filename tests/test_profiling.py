@@ -0,0 +1,17 @@
+"""Profiler rules must match on interpreters without co_qualname (before Python 3.11)."""
+import utils.http_client as http_client
+from utils.profiling import _RULES, _find_qualname
+
+
+def test_qualnames_are_found_without_co_qualname():
+    namespace = vars(http_client)
+    found = {
+        _find_qualname(http_client.RateLimiter.acquire.__code__, namespace),
+        _find_qualname(http_client.FederalAPIClient._send.__code__, namespace),
+        _find_qualname(http_client.FederalAPIClient._backoff.__code__, namespace),    # staticmethod
+        _find_qualname(http_client.CacheStore.get.__code__, namespace)
+    }
+    assert found == {"RateLimiter.acquire", "FederalAPIClient._send",
+                     "FederalAPIClient._backoff", "CacheStore.get"}
+    rules = [prefix for _, file_name, prefix in _RULES if file_name == "http_client.py"]
+    assert all(any(name.startswith(prefix) for name in found) for prefix in rules)
@@ -0,0 +1,58 @@
+"""Stored BLS series pick up revised values and are re-fetched once older than the TTL."""
+from datetime import datetime
+
+from dol.series_store import BLSSeriesStore, SeriesData, period_index
+
+
+YEAR = datetime.now().year
+
+
+class FakeDOL:
+    """Serves `values` ({(year, month): value}) for every requested series, recording each request."""
+
+    def __init__(self, values):
+        self.values = values
+        self.requests = []
+
+    def get_series_data(self, series_ids, start_year, end_year):
+        self.requests.append((list(series_ids), start_year))
+        data = [{"year": str(y), "period": f"M{m:02d}", "value": str(v)}
+                for (y, m), v in self.values.items() if start_year <= y <= end_year]
+        return {"status": "REQUEST_SUCCEEDED", "Results": {"series": [
+            {"seriesID": sid, "data": data} for sid in series_ids
+        ]}}
+
+
+def test_merge_overwrites_revised_periods():
+    series = SeriesData("S")
+    assert series.merge([(period_index(YEAR, m), 4.0) for m in (1, 2, 4)]) == 3
+    changed = series.merge([(period_index(YEAR, 2), 4.2), (period_index(YEAR, 3), 4.1),
+                            (period_index(YEAR, 4), 4.0), (period_index(YEAR, 5), 3.9)])
+    assert changed == 3
+    assert series.periods.tolist() == [period_index(YEAR, m) for m in range(1, 6)]
+    assert series.values.tolist() == [4.0, 4.2, 4.1, 4.0, 3.9]
+
+
+def test_refresh_picks_up_revisions(tmp_path):
+    dol = FakeDOL({(YEAR - 1, 12): 3.0, (YEAR, 1): 3.5})
+    store = BLSSeriesStore(dol, store_dir=str(tmp_path))
+    store.refresh(["S"], end_year=YEAR)
+
+    dol.values[(YEAR - 1, 12)] = 3.1
+    assert store.refresh(["S"], end_year=YEAR) == {"S": 1}
+    assert dol.requests[-1][1] == YEAR - 1
+
+    reloaded = BLSSeriesStore(dol, store_dir=str(tmp_path)).get("S")
+    assert reloaded.value_at(period_index(YEAR - 1, 12)) == 3.1
+
+
+def test_ensure_refetches_only_stale_series(tmp_path):
+    dol = FakeDOL({(YEAR, 1): 3.5})
+    store = BLSSeriesStore(dol, store_dir=str(tmp_path), ttl=3600)
+    store.ensure(["S"])
+    store.ensure(["S"])
+    assert len(dol.requests) == 1
+
+    store.get("S").fetched_at -= 7200
+    store.ensure(["S"])
+    assert len(dol.requests) == 2
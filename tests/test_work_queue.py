@@ -0,0 +1,42 @@
+"""Leases expire, nacked items are retried and released items keep their attempt."""
+import time
+
+import pytest
+
+from workflows.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue("test", path=str(tmp_path / "queue.db"), visibility_timeout=0.2, max_attempts=2)
+    queue.enqueue("run", ["a", "b"])
+    return queue
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    [item] = queue.claim("run", "w1", limit=1)
+    assert queue.claim("run", "w2", limit=2)[0].key == "b"    # "a" is still leased
+    time.sleep(0.25)
+
+    [again] = queue.claim("run", "w2", limit=1)
+    assert again.key == item.key and again.attempts == 2
+    assert not queue.ack(item, "w1")                           # w1 lost the lease
+    assert queue.ack(again, "w2", {"ok": True})
+
+
+def test_nack_retries_until_attempts_run_out(queue):
+    [item] = queue.claim("run", "w1", limit=1)
+    assert queue.nack(item, "w1", "boom")
+    [item] = queue.claim("run", "w1", limit=1)
+    assert item.key == "a" and item.attempts == 2
+    assert queue.nack(item, "w1", "boom")
+
+    assert [i.key for i in queue.claim("run", "w1", limit=2)] == ["b"]
+    assert queue.stats("run") == {"pending": 0, "leased": 1, "done": 0, "failed": 1}
+
+
+def test_release_does_not_spend_an_attempt(queue):
+    [item] = queue.claim("run", "w1", limit=1)
+    assert queue.release(item, "w1")
+    [item] = queue.claim("run", "w2", limit=1)
+    assert item.key == "a" and item.attempts == 1
@@ -0,0 +1,93 @@
+"""Batch WOTC scoring must match dol.client.wotc_eligibility applicant for applicant."""
+import csv
+import random
+
+from dol.client import wotc_eligibility
+from dol.wotc_batch import WOTCBatchEngine, BOOLEAN_FIELDS, evaluate_columns, read_applicants
+
+
+COLUMNS = ("name", "age", "unemployment_months") + BOOLEAN_FIELDS
+BOOLEAN_CELLS = ("", "true", "False", "YES", "n", "1", "0", "t", "maybe")
+MONTH_CELLS = ("", "0", "5", "6", "5.99", "6.0", "6.5", "12", "-3", "abc", "nan", "inf", "1e1")
+AGE_CELLS = ("", "15", "16", "17", "17.9", "18", "39", "39.5", "40", "65", "x")
+
+
+def write_roster(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def generated_rows(count, seed=11):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {"name": f"Applicant {i}", "age": rng.choice(AGE_CELLS),
+               "unemployment_months": rng.choice(MONTH_CELLS)}
+        for field in BOOLEAN_FIELDS:
+            row[field] = rng.choice(BOOLEAN_CELLS)
+        rows.append(row)
+    return rows
+
+
+def test_csv_batch_matches_scalar(tmp_path):
+    roster = tmp_path / "roster.csv"
+    write_roster(roster, generated_rows(3000))
+    applicants = list(read_applicants(roster))
+
+    batch = list(WOTCBatchEngine(chunk_size=128).evaluate(applicants))
+
+    assert batch == [wotc_eligibility(a) for a in applicants]
+    assert any(r["eligible"] for r in batch) and not all(r["eligible"] for r in batch)
+
+
+def test_edge_case_records_match_scalar():
+    applicants = [
+        {},
+        {"name": "Missing everything"},
+        {"age": 17, "veteran": True},
+        {"age": 39, "snap_recipient": True, "unemployment_months": 5.99},
+        {"age": 40, "snap_recipient": True, "unemployment_months": 6},
+        {"veteran": True, "unemployment_months": 6.5},
+        {"veteran": False, "felony_conviction": True, "vocational_rehab": True},
+        {"age": None, "unemployment_months": 0},
+        {"age": "18", "snap_recipient": 1},
+    ]
+    assert evaluate_columns(applicants) == [wotc_eligibility(a) for a in applicants]
+
+
+def test_bad_numeric_cells_do_not_abort_run(tmp_path):
+    roster = tmp_path / "roster.csv"
+    write_roster(roster, [
+        {"name": "Bad months", "age": "30", "unemployment_months": "six", "veteran": "yes"},
+        {"name": "Bad age", "age": "unknown", "felony_conviction": "true"},
+        {"name": "Fine", "age": "17", "unemployment_months": "7"},
+    ])
+
+    summary = WOTCBatchEngine().run(str(roster), str(tmp_path / "results.ndjson"))
+
+    assert summary["applicants"] == 3
+    results = list(read_applicants(tmp_path / "results.ndjson"))
+    assert results[0]["categories"] == ["veteran"]
+    assert results[1]["categories"] == ["ex_felon"] and results[1]["age"] == 0
+    assert results[2]["categories"] == ["long_term_unemployed", "summer_youth"]
+
+
+def test_bad_numeric_values_in_ndjson_are_treated_as_missing(tmp_path):
+    roster = tmp_path / "roster.ndjson"
+    roster.write_text(
+        '{"name": "Null months", "age": 30, "unemployment_months": null, "veteran": true}\n'
+        '{"name": "Text months", "age": "unknown", "unemployment_months": "six", "felony_conviction": true}\n'
+        '{"name": "Odd types", "age": [17], "unemployment_months": true}\n'
+        '{"name": "Fine", "age": "17", "unemployment_months": 7}\n'
+    )
+
+    summary = WOTCBatchEngine().run(str(roster), str(tmp_path / "results.ndjson"))
+
+    assert summary["applicants"] == 4
+    results = list(read_applicants(tmp_path / "results.ndjson"))
+    assert results[0]["categories"] == ["veteran"]
+    assert results[1]["categories"] == ["ex_felon"] and results[1]["age"] == 0
+    assert results[2]["categories"] == [] and results[2]["age"] == 0
+    assert results[3]["categories"] == ["long_term_unemployed", "summer_youth"]
@@ -1,20 +1,37 @@
 """
 utils module for Federal API Vault.
 Shared utilities across all federal API integrations.
+
+HTTP clients and the client registry are loaded on first attribute access.
 """
+from .lazy import lazy_module
+
+from .metrics import MetricsRegistry, metrics
+
+_LAZY = {
+    "FederalAPIClient": ".http_client",
+    "SAMClient": ".http_client",
+    "DOLClient": ".http_client",
+    "OpportunitiesClient": ".http_client",
+    "CacheStore": ".http_client",
+    "RateLimiter": ".http_client",
+    "ClientRegistry": ".registry",
+    "clients": ".registry",
+    "CacheWarmer": ".cache_warmer"
+}
 
-from .http_client import (
-    FederalAPIClient,
-    SAMClient,
-    DOLClient,
-    CacheStore,
-    RateLimiter
-)
+__getattr__, __dir__ = lazy_module(globals(), _LAZY)
 
 __all__ = [
     "FederalAPIClient",
     "SAMClient",
     "DOLClient",
+    "OpportunitiesClient",
     "CacheStore",
-    "RateLimiter"
+    "RateLimiter",
+    "ClientRegistry",
+    "clients",
+    "CacheWarmer",
+    "MetricsRegistry",
+    "metrics"
 ]
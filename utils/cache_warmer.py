@@ -0,0 +1,325 @@
+"""
+Refresh-ahead cache warming.
+While the warmer runs, HTTP clients report every cached GET here (and the SAM
+client every entity cache lookup); keys asked for at least
+CACHE_WARM_MIN_HITS times, plus explicitly pinned targets (e.g. tracked UEIs in the
+entity cache), are re-fetched in the background once they are within
+CACHE_REFRESH_AHEAD_SECONDS of expiry. Refreshes draw from a per-API budget of
+CACHE_WARM_RATE_SHARE of that API's rate limit, on top of the shared limiter, so
+warming never starves interactive lookups.
+
+Each target's expiry is read from its cache once and kept in a heap, so a pass
+only asks the cache about targets that are new, were just refreshed, or are
+coming due (a lookup may have renewed them since).
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from collections import OrderedDict
+from heapq import heappush, heappop
+from typing import Optional, Dict, Any, List, Callable, Tuple
+import threading
+import time
+
+from config import Config
+from utils.metrics import metrics
+
+
+class WarmTarget:
+    """Something that can be refreshed ahead of expiry."""
+
+    __slots__ = ("key", "limiter", "expires_at", "refresh", "pinned", "hits", "last_access", "expires")
+
+    def __init__(self, key: str, limiter, expires_at: Callable[[], Optional[float]],
+                 refresh: Callable[[], Any], pinned: bool = False):
+        self.key = key
+        self.limiter = limiter
+        self.expires_at = expires_at
+        self.refresh = refresh
+        self.pinned = pinned
+        self.hits = 0
+        self.last_access = 0.0
+        # Last expiry read from the cache; None until read (again)
+        self.expires: Optional[float] = None
+
+    @property
+    def api(self) -> str:
+        return self.limiter.name or "default"
+
+
+class CacheWarmer:
+    """Tracks hot cache keys and pinned targets and refreshes them before they lapse.
+
+    `record` is cheap and safe to call on every lookup. Nothing is fetched until
+    `start` launches the background thread (long-running processes such as the MCP
+    server) or `run_once` is called (e.g. from cron). Clients only report lookups
+    to the warmer returned by `active`, so short CLI runs do no bookkeeping.
+    """
+
+    _default: Optional["CacheWarmer"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, rate_share: Optional[float] = None, interval: Optional[float] = None,
+                 refresh_ahead: Optional[float] = None, max_keys: Optional[int] = None,
+                 min_hits: Optional[int] = None):
+        self.rate_share = Config.CACHE_WARM_RATE_SHARE if rate_share is None else rate_share
+        self.interval = interval or Config.CACHE_WARM_INTERVAL_SECONDS
+        self.refresh_ahead = Config.CACHE_REFRESH_AHEAD_SECONDS if refresh_ahead is None else refresh_ahead
+        self.max_keys = max_keys or Config.CACHE_WARM_MAX_KEYS
+        self.min_hits = min_hits or Config.CACHE_WARM_MIN_HITS
+        # Keys not looked up for this long are no longer considered hot
+        self.idle_seconds = 2 * Config.CACHE_TTL_SECONDS
+        # Unpinned targets in LRU order (oldest first); pinned ones are never evicted
+        self._targets: "OrderedDict[str, WarmTarget]" = OrderedDict()
+        self._pinned: Dict[str, WarmTarget] = {}
+        # (expires, key) for targets with a known expiry; entries whose target was
+        # dropped or re-read since are skipped when popped
+        self._expiry: List[Tuple[float, str]] = []
+        # Keys whose expiry has to be read from the cache on the next pass
+        self._unknown: Dict[str, None] = {}
+        self._budgets: Dict[str, Any] = {}
+        self._revalidate: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def default(cls) -> "CacheWarmer":
+        """Process-wide warmer that every HTTP client reports to."""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def active(cls) -> Optional["CacheWarmer"]:
+        """The default warmer while its background thread runs, else None."""
+        warmer = cls._default
+        return warmer if warmer is not None and warmer.running else None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _get(self, key: str) -> Optional[WarmTarget]:
+        return self._pinned.get(key) or self._targets.get(key)
+
+    def _all(self) -> List[WarmTarget]:
+        return list(self._pinned.values()) + list(self._targets.values())
+
+    def record(self, client, endpoint: str, params: Dict[str, Any], cache_key: str,
+               ttl: Optional[float] = None) -> None:
+        """Count a cached GET so the key can be refreshed once it is hot."""
+        params = dict(params)
+        self.touch(cache_key, client.rate_limiter,
+                   lambda: client.cache.expires_at(cache_key),
+                   lambda: client.get(endpoint, params, refresh=True, ttl=ttl))
+
+    def touch(self, key: str, limiter, expires_at: Callable[[], Optional[float]],
+              refresh: Callable[[], Any]) -> None:
+        """Count a lookup of any cached target; the callables are kept from the first call."""
+        now = time.time()
+        with self._lock:
+            target = self._pinned.get(key)
+            if target is None:
+                target = self._targets.get(key)
+                if target is None:
+                    target = self._targets[key] = WarmTarget(key, limiter, expires_at, refresh)
+                    self._unknown[key] = None
+                    self._evict()
+                else:
+                    self._targets.move_to_end(key)
+            target.hits += 1
+            target.last_access = now
+
+    def pin(self, key: str, limiter, expires_at: Callable[[], Optional[float]],
+            refresh: Callable[[], Any]) -> bool:
+        """Always keep a target warm, whether or not it is looked up.
+
+        expires_at returns None when nothing is cached; pinned targets are then
+        fetched on the next pass. Pinned targets count toward max_keys; once they
+        fill it, further pins are refused and False is returned.
+        """
+        with self._lock:
+            if key not in self._pinned and len(self._pinned) >= self.max_keys:
+                return False
+            target = WarmTarget(key, limiter, expires_at, refresh, pinned=True)
+            previous = self._targets.pop(key, None) or self._pinned.get(key)
+            if previous is not None:
+                target.hits, target.last_access = previous.hits, previous.last_access
+            self._pinned[key] = target
+            self._unknown[key] = None
+            self._evict()
+        return True
+
+    def unpin(self, key: str) -> None:
+        with self._lock:
+            self._pinned.pop(key, None)
+            self._targets.pop(key, None)
+            self._unknown.pop(key, None)
+
+    def _evict(self) -> None:
+        """Drop least recently used unpinned keys beyond max_keys."""
+        while self._targets and len(self._targets) + len(self._pinned) > self.max_keys:
+            key, _ = self._targets.popitem(last=False)
+            self._unknown.pop(key, None)
+
+    def revalidate(self, key: str) -> None:
+        """Refresh a key that was just served stale, ahead of the next scheduled pass."""
+        with self._lock:
+            if self._get(key) is not None:
+                self._revalidate[key] = None
+        self._wake.set()
+
+    def _budget(self, target: WarmTarget):
+        """Token bucket holding this warmer to rate_share of the target API's limit."""
+        budget = self._budgets.get(target.api)
+        if budget is None:
+            from utils.http_client import RateLimiter
+            budget = RateLimiter(max(1, int(target.limiter.rate * self.rate_share)),
+                                 name=f"{target.api}_warmer")
+            self._budgets[target.api] = budget
+        return budget
+
+    def _hot(self, target: WarmTarget, now: float) -> bool:
+        return target.pinned or (target.hits >= self.min_hits and now - target.last_access <= self.idle_seconds)
+
+    def due(self, now: Optional[float] = None) -> List[Tuple[float, WarmTarget]]:
+        """Targets to refresh now, soonest expiry first: (expires, target).
+
+        Only targets with an unknown expiry or one within refresh_ahead are read
+        from their cache. Due targets are read again on the following pass.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            check = []
+            while self._expiry and self._expiry[0][0] - now <= self.refresh_ahead:
+                expires, key = heappop(self._expiry)
+                target = self._get(key)
+                if target is not None and target.expires == expires:
+                    target.expires = None
+                    self._unknown[key] = None
+            for key in list(self._unknown):
+                target = self._get(key)
+                if target is None:
+                    del self._unknown[key]
+                elif self._hot(target, now):
+                    del self._unknown[key]
+                    check.append(target)
+
+        due, known = [], []
+        for target in check:
+            try:
+                expires = target.expires_at()
+            except Exception:
+                known.append((target, None))
+                continue
+            if expires is None:
+                if target.pinned:
+                    due.append((now, target))
+                known.append((target, None))
+            elif expires - now <= self.refresh_ahead:
+                due.append((expires, target))
+                known.append((target, None))
+            else:
+                known.append((target, expires))
+
+        with self._lock:
+            for target, expires in known:
+                if self._get(target.key) is not target:
+                    continue
+                if expires is None:
+                    self._unknown[target.key] = None
+                else:
+                    target.expires = expires
+                    heappush(self._expiry, (expires, target.key))
+        due.sort(key=lambda item: (item[0], -item[1].hits))
+        return due
+
+    def run_once(self) -> Dict[str, int]:
+        """One pass: pending revalidations first, then due targets, until budgets run out."""
+        with self._lock:
+            urgent = [t for t in map(self._get, self._revalidate) if t is not None]
+            self._revalidate.clear()
+        queue = [(0.0, t) for t in urgent] + self.due()
+
+        counts = {"refreshed": 0, "failed": 0, "deferred": 0}
+        done = set()
+        for _, target in queue:
+            if self._stop.is_set():
+                break
+            if target.key in done:
+                continue
+            done.add(target.key)
+            if not self._budget(target).try_acquire():
+                counts["deferred"] += 1
+                metrics.inc("vault_cache_warm_total", api=target.api, result="deferred")
+                continue
+            try:
+                target.refresh()
+                counts["refreshed"] += 1
+                metrics.inc("vault_cache_warm_total", api=target.api, result="refreshed")
+            except Exception:
+                counts["failed"] += 1
+                metrics.inc("vault_cache_warm_total", api=target.api, result="failed")
+        return counts
+
+    def start(self) -> "CacheWarmer":
+        """Run passes every CACHE_WARM_INTERVAL_SECONDS in a daemon thread."""
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._stop.clear()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                pass
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            targets = self._all()
+            pending = len(self._revalidate)
+        return {
+            "running": self.running,
+            "tracked_keys": len(targets),
+            "pinned": sum(1 for t in targets if t.pinned),
+            "hot": sum(1 for t in targets if not t.pinned and self._hot(t, now)),
+            "pending_revalidations": pending,
+            "rate_share": self.rate_share,
+            "refresh_ahead_seconds": self.refresh_ahead
+        }
+
+
+def pin_entities(warmer: CacheWarmer, sam, ueis) -> int:
+    """Keep tracked UEIs warm in the SAM entity cache (see SAMEntityAPI.refresh_entity).
+
+    Without an entity cache, UEI lookups use the response cache and are warmed as hot keys.
+    Returns how many were pinned; UEIs beyond the warmer's max_keys are not.
+    """
+    if sam.entity_cache is None:
+        return 0
+    count = 0
+    for uei in ueis:
+        count += warmer.pin(f"SAM_entity_{uei}", sam.client.rate_limiter,
+                            lambda u=uei: sam.entity_expires_at(u),
+                            lambda u=uei: sam.refresh_entity(u))
+    return count
@@ -0,0 +1,117 @@
+"""
+Pluggable JSON codec shared by the HTTP client, response cache and workflow writers.
+Uses orjson when it is installed and falls back to the stdlib `json` module.
+Both codecs decode bytes directly, so response bodies and cache files are never
+decoded to str first.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import json
+import os
+import threading
+
+
+class JSONCodec:
+    """stdlib implementation; also the fallback for values a faster codec rejects."""
+
+    name = "stdlib"
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        options = self._options | (self._orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return self._orjson.dumps(obj, option=options)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which stdlib json accepts
+            return super().dumps(obj, pretty)
+
+
+_FACTORIES = {
+    "stdlib": JSONCodec,
+    "orjson": OrjsonCodec
+}
+_active: Optional[JSONCodec] = None
+_lock = threading.Lock()
+
+
+def register_codec(name: str, factory) -> None:
+    """Make another codec selectable via JSON_CODEC / set_codec."""
+    _FACTORIES[name] = factory
+
+
+def set_codec(name: str = "auto") -> JSONCodec:
+    """Select a codec by name. 'auto' prefers orjson and falls back to stdlib."""
+    global _active
+    with _lock:
+        if name == "auto":
+            try:
+                _active = OrjsonCodec()
+            except ImportError:
+                _active = JSONCodec()
+        else:
+            if name not in _FACTORIES:
+                raise ValueError(f"Unknown JSON codec '{name}'. Available: {', '.join(_FACTORIES)}")
+            _active = _FACTORIES[name]()
+        return _active
+
+
+def get_codec() -> JSONCodec:
+    if _active is None:
+        from config import Config
+        return set_codec(Config.JSON_CODEC)
+    return _active
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    return get_codec().loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    return get_codec().dumps(obj, pretty)
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    with open(path, "rb") as f:
+        return get_codec().loads(f.read())
+
+
+def dump_file(obj: Any, path: Union[str, Path], pretty: bool = False, atomic: bool = False) -> None:
+    """Write JSON to path. With atomic, write a temp file and rename it into place."""
+    path = Path(path)
+    payload = get_codec().dumps(obj, pretty)
+    target = path.with_name(path.name + ".tmp") if atomic else path
+    with open(target, "wb") as f:
+        f.write(payload)
+    if atomic:
+        os.replace(target, path)
+
+
+def accept_encoding() -> str:
+    """Content encodings this process can decode (gzip/deflate, plus br/zstd when installed)."""
+    from urllib3.util.request import ACCEPT_ENCODING
+    return ACCEPT_ENCODING
+
+
+def codec_info() -> Dict[str, str]:
+    return {"json": get_codec().name, "accept_encoding": accept_encoding()}
@@ -1,106 +1,244 @@
 """
 Resilient HTTP client with retry logic, rate limiting, and caching.
 Shared across all federal API modules.
+
+`requests` is imported on first network use so that commands which never hit an
+API (validation, usage, local stores) skip its import cost.
 """
+import random
 import time
-import json
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
-import requests
 import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from config import Config
+from utils.metrics import metrics
+from utils import codec
 
 
 class CacheStore:
-    """Simple file-based cache for API responses."""
+    """File-based cache for API responses with a shared in-memory LRU tier.
+    
+    Each entry gets its own expiry, CACHE_TTL_SECONDS plus or minus CACHE_TTL_JITTER,
+    so entries written together (e.g. by the nightly run) do not all lapse at once.
+    Expired entries are kept for CACHE_STALE_SECONDS so get_stale can serve them
+    while a refresh is under way.
+    
+    Values served from memory are shared objects; callers must treat them as read-only.
+    """
+    
+    _memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _memory_lock = threading.Lock()
     
     def __init__(self, cache_dir: str = "data/cache"):
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._dir_ready = False
         self.enabled = Config.CACHE_ENABLED
         self.ttl = Config.CACHE_TTL_SECONDS
+        self.jitter = Config.CACHE_TTL_JITTER
+        self.stale_seconds = Config.CACHE_STALE_SECONDS
+        self.memory_entries = Config.CACHE_MEMORY_ENTRIES
+        self._memory_prefix = str(self.cache_dir.resolve()) + "/"
     
     def _key_to_path(self, key: str) -> Path:
         """Convert cache key to safe filename."""
         safe_key = key.replace("/", "_").replace(":", "_")
         return self.cache_dir / f"{safe_key}.json"
     
-    def get(self, key: str) -> Optional[Dict[str, Any]]:
-        """Retrieve cached data if fresh."""
-        if not self.enabled:
-            return None
+    def _remember(self, key: str, expires: float, value: Dict[str, Any]) -> None:
+        if self.memory_entries <= 0:
+            return
+        with self._memory_lock:
+            self._memory[self._memory_prefix + key] = (expires, value)
+            self._memory.move_to_end(self._memory_prefix + key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+    
+    def _forget(self, key: str) -> None:
+        with self._memory_lock:
+            self._memory.pop(self._memory_prefix + key, None)
+    
+    def _entry(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """(expires, value) from memory or disk, fresh or not; drops entries past the stale window."""
+        with self._memory_lock:
+            entry = self._memory.get(self._memory_prefix + key)
+            if entry is not None:
+                self._memory.move_to_end(self._memory_prefix + key)
+        if entry is not None:
+            if time.time() - entry[0] <= self.stale_seconds:
+                return entry
+            self._forget(key)
         
         cache_file = self._key_to_path(key)
         if not cache_file.exists():
             return None
         
         try:
-            with open(cache_file, "r") as f:
-                data = json.load(f)
-            
-            if time.time() - data.get("timestamp", 0) > self.ttl:
+            data = codec.load_file(cache_file)
+            # Entries written before per-entry expiry only carry their timestamp
+            expires = data.get("expires") or data.get("timestamp", 0) + self.ttl
+            if time.time() - expires > self.stale_seconds:
                 cache_file.unlink()
                 return None
-            
-            return data.get("value")
+            self._remember(key, expires, data.get("value"))
+            return expires, data.get("value")
         except Exception:
             return None
     
-    def set(self, key: str, value: Dict[str, Any]) -> None:
-        """Store data in cache with timestamp."""
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve cached data if fresh, from memory first and then disk."""
+        if not self.enabled:
+            return None
+        entry = self._entry(key)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+    
+    def get_stale(self, key: str) -> Optional[Dict[str, Any]]:
+        """An expired value still within CACHE_STALE_SECONDS of its expiry, else None."""
+        if not self.enabled or self.stale_seconds <= 0:
+            return None
+        entry = self._entry(key)
+        if entry is None or entry[0] >= time.time():
+            return None
+        return entry[1]
+    
+    def expires_at(self, key: str) -> Optional[float]:
+        """Expiry timestamp of an entry (possibly already past), or None if not cached."""
+        if not self.enabled:
+            return None
+        entry = self._entry(key)
+        return entry[0] if entry is not None else None
+    
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        expires = self.expires_at(key)
+        return None if expires is None else expires - time.time()
+    
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store data in cache with timestamp and jittered expiry (ttl defaults to CACHE_TTL_SECONDS)."""
         if not self.enabled:
             return
         
         cache_file = self._key_to_path(key)
+        timestamp = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = timestamp + ttl * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._remember(key, expires, value)
         try:
-            with open(cache_file, "w") as f:
-                json.dump({
-                    "timestamp": time.time(),
-                    "value": value
-                }, f, indent=2)
+            if not self._dir_ready:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._dir_ready = True
+            # Entries are written compact; files from older versions (indented) still load
+            codec.dump_file({"timestamp": timestamp, "expires": expires, "value": value}, cache_file)
         except Exception:
             pass
 
 
+LIMITER_WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
 class RateLimiter:
-    """Token bucket rate limiter."""
+    """Token bucket rate limiter. Safe to share between threads."""
+    
+    _shared: Dict[str, "RateLimiter"] = {}
+    _shared_lock = threading.Lock()
     
-    def __init__(self, requests_per_minute: int):
+    def __init__(self, requests_per_minute: int, name: str = ""):
         self.rate = requests_per_minute
         self.tokens = requests_per_minute
         self.last_update = time.time()
+        self.name = name
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, api_name: str, requests_per_minute: int) -> "RateLimiter":
+        """One limiter per API so concurrent clients draw from the same quota."""
+        with cls._shared_lock:
+            limiter = cls._shared.get(api_name)
+            if limiter is None:
+                limiter = cls(requests_per_minute, name=api_name)
+                cls._shared[api_name] = limiter
+            return limiter
     
     def acquire(self) -> None:
         """Block until a token is available."""
+        started = time.perf_counter()
         while True:
+            with self._lock:
+                now = time.time()
+                elapsed = now - self.last_update
+                self.tokens = min(self.rate, self.tokens + elapsed * (self.rate / 60))
+                self.last_update = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+            
+            time.sleep(0.1)
+        
+        metrics.observe("vault_rate_limiter_wait_seconds", time.perf_counter() - started,
+                        buckets=LIMITER_WAIT_BUCKETS, api=self.name or "default")
+    
+    def try_acquire(self) -> bool:
+        """Take a token if one is available now, without waiting."""
+        with self._lock:
             now = time.time()
-            elapsed = now - self.last_update
-            self.tokens = min(self.rate, self.tokens + elapsed * (self.rate / 60))
+            self.tokens = min(self.rate, self.tokens + (now - self.last_update) * (self.rate / 60))
             self.last_update = now
-            
             if self.tokens >= 1:
                 self.tokens -= 1
-                return
-            
-            time.sleep(0.1)
+                return True
+            return False
+
+
+def _close_response(future) -> None:
+    if future.exception() is None:
+        future.result().close()
 
 
 class FederalAPIClient:
     """HTTP client with retry, rate limiting, and caching for federal APIs."""
     
+    # APIs that share an upstream key set this to share one rate limiter
+    rate_limit_group: Optional[str] = None
+    
     def __init__(self, api_name: str, api_key: str, base_url: str, rate_limit: int):
         self.api_name = api_name
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
-        self.rate_limiter = RateLimiter(rate_limit)
+        self.rate_limiter = RateLimiter.shared(self.rate_limit_group or api_name, rate_limit)
         self.cache = CacheStore()
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "WealthBridge-FederalAPIVault/0.1.0",
-            "Accept": "application/json"
-        })
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+        self._hedge_gets = 0
+        self._hedges_sent = 0
+    
+    @property
+    def session(self):
+        """Pooled requests session, built on first request."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_SIZE,
+                                          pool_maxsize=Config.HTTP_POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({
+                        "User-Agent": "WealthBridge-FederalAPIVault/0.1.0",
+                        "Accept": "application/json",
+                        "Accept-Encoding": codec.accept_encoding() if Config.HTTP_COMPRESSION else "identity"
+                    })
+                    self._session = session
+        return self._session
     
     def _build_cache_key(self, endpoint: str, params: Dict[str, Any]) -> str:
         """Generate unique cache key."""
@@ -108,51 +246,194 @@ class FederalAPIClient:
         return f"{self.api_name}_{endpoint}_{param_str}"
     
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
-            use_cache: bool = True) -> Dict[str, Any]:
-        """Execute GET request with retry logic and caching."""
+            use_cache: bool = True, refresh: bool = False,
+            ttl: Optional[float] = None) -> Dict[str, Any]:
+        """Execute GET request with retry logic and caching.
+        
+        Responses are cached for ttl seconds, CACHE_TTL_SECONDS by default.
+        While the cache warmer runs, cached lookups are reported to it so hot keys
+        are refreshed before they expire, and an entry that expired within
+        CACHE_STALE_SECONDS is returned as-is and refreshed in the background.
+        With refresh, the cache is not read but is still updated.
+        """
         params = params or {}
         cache_key = self._build_cache_key(endpoint, params)
         
-        if use_cache:
+        if use_cache and not refresh:
+            warmer = self._warmer()
+            if warmer is not None:
+                warmer.record(self, endpoint, params, cache_key, ttl)
             cached = self.cache.get(cache_key)
+            if cached is None and warmer is not None:
+                cached = self.cache.get_stale(cache_key)
+                if cached is not None:
+                    warmer.revalidate(cache_key)
+                    metrics.inc("vault_cache_requests_total", api=self.api_name, result="stale")
+                    return cached
+            metrics.inc("vault_cache_requests_total", api=self.api_name,
+                        result="hit" if cached is not None else "miss")
             if cached is not None:
                 return cached
         
+        data = self._request("GET", endpoint, params={**params, **self._get_auth_params()})
+        if use_cache:
+            self.cache.set(cache_key, data, ttl)
+        
+        return data
+    
+    @staticmethod
+    def _warmer():
+        if not Config.CACHE_WARM_ENABLED:
+            return None
+        from utils.cache_warmer import CacheWarmer
+        return CacheWarmer.active()
+    
+    def post(self, endpoint: str, json_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute POST request with retry logic. Responses are never cached."""
+        return self._request("POST", endpoint, params=self._get_auth_params(), json_body=json_body)
+    
+    def _request(self, method: str, endpoint: str, params: Dict[str, Any],
+                 json_body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send one logical request, retrying with exponential backoff."""
+        from requests.exceptions import RequestException
+        
+        session = self.session
         url = f"{self.base_url}{endpoint}"
         headers = self._get_auth_headers()
+        endpoint_label = endpoint or "/"
+        body = None
+        if json_body is not None:
+            body = codec.dumps(json_body)
+            headers = {**headers, "Content-Type": "application/json"}
         
         last_exception = None
         for attempt in range(Config.MAX_RETRIES):
+            if attempt:
+                metrics.inc("vault_retries_total", api=self.api_name)
+            started = time.perf_counter()
+            status = "error"
             try:
                 self.rate_limiter.acquire()
+                started = time.perf_counter()
                 
-                response = self.session.get(
-                    url,
-                    params=params,
-                    headers=headers,
-                    timeout=Config.REQUEST_TIMEOUT
-                )
+                response = self._send(session, method, url, params, body, headers, endpoint_label)
+                status = str(response.status_code)
+                content = response.content
+                metrics.inc("vault_response_bytes_total", len(content), api=self.api_name)
+                metrics.inc("vault_response_wire_bytes_total",
+                            int(response.headers.get("Content-Length") or len(content)),
+                            api=self.api_name,
+                            encoding=response.headers.get("Content-Encoding", "identity"))
                 response.raise_for_status()
                 
-                data = response.json()
-                if use_cache:
-                    self.cache.set(cache_key, data)
-                
-                return data
+                return codec.loads(content)
             
-            except requests.exceptions.RequestException as e:
+            except (RequestException, ValueError) as e:
                 last_exception = e
-                if attempt < Config.MAX_RETRIES - 1:
-                    wait = 2 ** attempt
-                    time.sleep(wait)
+            
+            finally:
+                metrics.observe("vault_request_duration_seconds", time.perf_counter() - started,
+                                api=self.api_name, endpoint=endpoint_label)
+                metrics.inc("vault_responses_total", api=self.api_name, status=status)
+            
+            if attempt < Config.MAX_RETRIES - 1:
+                self._backoff(attempt)
         
         raise last_exception or Exception(f"Request failed after {Config.MAX_RETRIES} attempts")
     
+    @staticmethod
+    def _backoff(attempt: int) -> None:
+        """Exponential wait before retry `attempt + 1` (its own frame for the profiler)."""
+        time.sleep(2 ** attempt)
+    
+    def _send(self, session, method: str, url: str, params: Dict[str, Any], body: Optional[bytes],
+              headers: Dict[str, str], endpoint_label: str):
+        """One attempt; a GET slower than the hedge delay gets a backup request.
+        
+        Whichever copy answers first wins. The backup takes its own rate limiter
+        token (skipped if none is free) and hedges are capped at HEDGE_MAX_RATIO
+        of GETs, so hedging trims the latency tail without eating the quota.
+        """
+        def send():
+            return session.request(method, url, params=params, data=body, headers=headers,
+                                   timeout=(Config.CONNECT_TIMEOUT, Config.READ_TIMEOUT))
+        
+        delay = self._hedge_delay(endpoint_label) if method == "GET" else None
+        if delay is None:
+            return send()
+        
+        from concurrent.futures import wait, FIRST_COMPLETED
+        from utils import profiling
+        
+        send = profiling.bind(send)
+        pool = self._hedge_pool()
+        primary = pool.submit(send)
+        with self._hedge_lock:
+            self._hedge_gets += 1
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        
+        # Reserve the hedge under the lock so concurrent GETs cannot overshoot the cap
+        with self._hedge_lock:
+            capped = self._hedges_sent + 1 > Config.HEDGE_MAX_RATIO * self._hedge_gets
+            if not capped:
+                self._hedges_sent += 1
+        if capped or not self.rate_limiter.try_acquire():
+            if not capped:
+                with self._hedge_lock:
+                    self._hedges_sent -= 1
+            metrics.inc("vault_hedged_requests_total", api=self.api_name,
+                        result="capped" if capped else "no_token")
+            return primary.result()
+        
+        backup = pool.submit(send)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                metrics.inc("vault_hedged_requests_total", api=self.api_name,
+                            result="won" if future is backup else "lost")
+                for other in pending:
+                    # The slower copy finishes in the background; release its connection
+                    other.add_done_callback(_close_response)
+                return future.result()
+        metrics.inc("vault_hedged_requests_total", api=self.api_name, result="failed")
+        raise error
+    
+    def _hedge_delay(self, endpoint_label: str) -> Optional[float]:
+        """Seconds to wait before hedging a GET, or None to send it alone."""
+        if not Config.HEDGE_ENABLED:
+            return None
+        estimate = metrics.quantile("vault_request_duration_seconds", Config.HEDGE_QUANTILE,
+                                    min_count=Config.HEDGE_MIN_SAMPLES,
+                                    api=self.api_name, endpoint=endpoint_label)
+        if estimate is None:
+            return None
+        return max(Config.HEDGE_MIN_DELAY_SECONDS, estimate)
+    
+    def _hedge_pool(self):
+        if self._hedge_executor is None:
+            with self._session_lock:
+                if self._hedge_executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=2 * Config.HTTP_POOL_SIZE, thread_name_prefix=f"{self.api_name}-hedge")
+        return self._hedge_executor
+    
     def _get_auth_headers(self) -> Dict[str, str]:
         """Override in subclasses for API-specific auth."""
         if self.api_key:
             return {"X-Api-Key": self.api_key}
         return {}
+    
+    def _get_auth_params(self) -> Dict[str, str]:
+        """Query-string credentials. Kept out of cache keys."""
+        return {}
 
 
 class SAMClient(FederalAPIClient):
@@ -179,3 +460,24 @@ class DOLClient(FederalAPIClient):
     
     def _get_auth_headers(self) -> Dict[str, str]:
         return {}
+
+
+
+class OpportunitiesClient(FederalAPIClient):
+    """SAM.gov Contract Opportunities API. Shares the SAM key and rate limit."""
+    
+    rate_limit_group = "SAM"
+    
+    def __init__(self):
+        super().__init__(
+            api_name="SAM_OPPORTUNITIES",
+            api_key=Config.SAM_API_KEY,
+            base_url=Config.SAM_OPPORTUNITIES_URL,
+            rate_limit=Config.RATE_LIMIT_SAM
+        )
+    
+    def _get_auth_headers(self) -> Dict[str, str]:
+        return {"X-Api-Key": self.api_key}
+    
+    def _get_auth_params(self) -> Dict[str, str]:
+        return {"api_key": self.api_key}
@@ -0,0 +1,31 @@
+"""
+Lazy package exports.
+A package maps each public name to the submodule that defines it; the submodule is
+imported the first time the name is accessed and the value is kept in the package
+namespace, so later lookups are plain attribute reads.
+"""
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_module(namespace: Dict[str, Any],
+                exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Module-level `__getattr__` and `__dir__` for a package, given its globals().
+
+    Usage in a package __init__:
+        __getattr__, __dir__ = lazy_module(globals(), {"Name": ".submodule"})
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,242 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+Counters, gauges and fixed-bucket histograms guarded by a single lock, cheap enough
+to leave on in production.
+"""
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
+import threading
+import time
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets):
+            in_bucket = self.counts[i]
+            if seen + in_bucket >= rank and in_bucket:
+                return lower + (bound - lower) * ((rank - seen) / in_bucket)
+            seen += in_bucket
+            lower = bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Process-wide registry of labelled counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self.started = time.time()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._types.setdefault(name, "counter")
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._types.setdefault(name, "gauge")
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._types.setdefault(name, "histogram")
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def quantile(self, name: str, q: float, min_count: int = 1, **labels: Any) -> Optional[float]:
+        """Estimated quantile for one histogram series, or None if it has fewer than min_count samples."""
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_label_key(labels))
+            return hist.quantile(q) if hist and hist.count >= max(1, min_count) else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._types.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._types):
+                kind = self._types[name]
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "histogram":
+                    for key, hist in sorted(self._histograms.get(name, {}).items()):
+                        cumulative = 0
+                        for bound, count in zip(hist.buckets, hist.counts):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                        lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                        lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+                else:
+                    source = self._counters if kind == "counter" else self._gauges
+                    for key, value in sorted(source.get(name, {}).items()):
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly snapshot with histogram percentiles."""
+        def label_str(key: LabelKey) -> str:
+            return ",".join(f"{k}={v}" for k, v in key) or "_"
+
+        with self._lock:
+            return {
+                "uptime_seconds": time.time() - self.started,
+                "counters": {
+                    name: {label_str(k): v for k, v in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: {label_str(k): v for k, v in series.items()}
+                    for name, series in self._gauges.items()
+                },
+                "histograms": {
+                    name: {
+                        label_str(k): {
+                            "count": h.count,
+                            "sum": h.sum,
+                            "mean": h.sum / h.count if h.count else None,
+                            "p50": h.quantile(0.5),
+                            "p90": h.quantile(0.9),
+                            "p99": h.quantile(0.99)
+                        }
+                        for k, h in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                }
+            }
+
+    def write_prometheus(self, path: str) -> Path:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(self.render_prometheus())
+        return out
+
+    def write_summary(self, path: str) -> Path:
+        # Imported here: json is most of this module's import cost and only end-of-run writes need it
+        import json
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return out
+
+    def record_workflow(self, workflow: str, units: int, seconds: float) -> None:
+        """Record per-workflow throughput for the run that just finished."""
+        self.inc("vault_workflow_runs_total", workflow=workflow)
+        self.set_gauge("vault_workflow_last_units", units, workflow=workflow)
+        self.set_gauge("vault_workflow_last_duration_seconds", seconds, workflow=workflow)
+        self.set_gauge("vault_workflow_last_units_per_second",
+                       units / seconds if seconds > 0 else 0.0, workflow=workflow)
+
+
+metrics = MetricsRegistry()
+
+metrics.describe("vault_request_duration_seconds", "Upstream request latency per attempt")
+metrics.describe("vault_responses_total", "Upstream responses by HTTP status (or 'error')")
+metrics.describe("vault_retries_total", "Request attempts retried after a failure")
+metrics.describe("vault_hedged_requests_total", "Backup GETs by outcome (won, lost, no_token, capped)")
+metrics.describe("vault_cache_requests_total", "Response cache lookups by result")
+metrics.describe("vault_response_bytes_total", "Response body bytes received (decoded)")
+metrics.describe("vault_response_wire_bytes_total", "Response body bytes on the wire by content encoding")
+metrics.describe("vault_rate_limiter_wait_seconds", "Time blocked waiting for a rate limiter token")
+metrics.describe("vault_cache_warm_total", "Refresh-ahead cache warming by result")
+metrics.describe("vault_pages_total", "Search result pages fetched")
+metrics.describe("vault_pages_discarded_total", "Prefetched pages dropped when the caller stopped early")
+metrics.describe("vault_entity_cache_requests_total", "Canonical entity cache lookups by identifier kind and result")
+metrics.describe("vault_workflow_units_total", "Work units completed by workflows")
+
+
+def serve_prometheus(port: int, registry: MetricsRegistry = metrics,
+                     host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve /metrics from a daemon thread (loopback only unless another host is given)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,135 @@
+"""
+Lazy, pipelined pagination over search endpoints.
+Records are yielded one page at a time while the next PAGE_PREFETCH pages are
+fetched in the background, so a full result set streams at close to network speed
+and only the pages in flight are held in memory. Whether pages are cached is up to
+the fetch function. Closing the iterator (or breaking out of a for loop) stops
+further requests.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from collections import deque
+from typing import Optional, Dict, Any, List, Callable, Tuple, Iterator
+
+from config import Config
+from utils.metrics import metrics
+
+
+# page number -> (records, total record count if the API reports it)
+PageFetcher = Callable[[int], Tuple[List[Dict[str, Any]], Optional[int]]]
+
+
+class Paginator:
+    """Iterates every record of a paged search.
+
+    fetch_page(n) returns page n (0-based) and the total record count, or None
+    when the API does not report one. Paging stops at the total, at max_records,
+    or at the first short page. Exceptions from fetch_page propagate to the caller
+    when the failed page is reached, after the records before it were yielded.
+    """
+
+    def __init__(self, fetch_page: PageFetcher, page_size: int, max_records: Optional[int] = None,
+                 prefetch: Optional[int] = None, name: str = ""):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_records = max_records
+        self.prefetch = Config.PAGE_PREFETCH if prefetch is None else max(0, prefetch)
+        self.name = name or "default"
+        self.total: Optional[int] = None
+        self.pages_fetched = 0
+
+    def _last_page(self) -> Optional[int]:
+        """Highest page number worth requesting, or None while unknown."""
+        limits = [n for n in (self.total, self.max_records) if n is not None]
+        if not limits:
+            return None
+        return (min(limits) - 1) // self.page_size
+
+    def _fetch(self, page: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        records, total = self.fetch_page(page)
+        metrics.inc("vault_pages_total", api=self.name)
+        return records, total
+
+    def pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield whole pages, trimmed to max_records."""
+        if self.max_records is not None and self.max_records <= 0:
+            return
+        records, self.total = self._fetch(0)
+        self.pages_fetched = 1
+        if not self.prefetch:
+            yield from self._sequential(records)
+            return
+
+        # Imported here: concurrent.futures is the bulk of this module's import cost
+        from concurrent.futures import ThreadPoolExecutor
+        from utils import profiling
+
+        fetch = profiling.bind(self._fetch)
+        pool = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix=f"{self.name}-pages")
+        pending: "deque" = deque()
+        next_page = 1
+        try:
+            page = 0
+            while True:
+                last = self._last_page()
+                more = records and len(records) >= self.page_size and (last is None or page < last)
+                # Keep the pipeline full before handing the current page to the caller
+                while more and len(pending) < self.prefetch and (last is None or next_page <= last):
+                    pending.append(pool.submit(fetch, next_page))
+                    next_page += 1
+                    if last is None:
+                        # Without a total, speculate one page ahead at most
+                        break
+                yield self._trim(page, records)
+                if not more or not pending:
+                    return
+                records, total = pending.popleft().result()
+                self.pages_fetched += 1
+                if total is not None:
+                    self.total = total
+                page += 1
+        finally:
+            for future in pending:
+                if future.cancel():
+                    continue
+                metrics.inc("vault_pages_discarded_total", api=self.name)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _sequential(self, records: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        page = 0
+        while True:
+            yield self._trim(page, records)
+            last = self._last_page()
+            if not records or len(records) < self.page_size or (last is not None and page >= last):
+                return
+            page += 1
+            records, total = self._fetch(page)
+            self.pages_fetched += 1
+            if total is not None:
+                self.total = total
+
+    def _trim(self, page: int, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.max_records is None:
+            return records
+        return records[:max(0, self.max_records - page * self.page_size)]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        pages = self.pages()
+        try:
+            for records in pages:
+                yield from records
+        finally:
+            # Stop prefetching as soon as the caller stops, not when pages is collected
+            pages.close()
+
+
+def total_records(response: Dict[str, Any]) -> Optional[int]:
+    """totalRecords from a SAM.gov search response, if present and numeric."""
+    try:
+        return int(response["totalRecords"])
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,330 @@
+"""
+Workflow profiling (`scripts/run.py <workflow> --profile`).
+Each stage runs under cProfile in its own thread, and a sampling thread records
+the Python stack of every thread every PROFILE_INTERVAL_MS. Samples are
+attributed to the stage running on that thread (or the only stage running at the
+time) and classified by what the stack is doing:
+
+    limiter   waiting in RateLimiter.acquire or backing off before a retry
+    network   inside a request (FederalAPIClient._send, requests, urllib3, sockets),
+              or waiting on one sent from a helper thread (hedging, page prefetch)
+    cache_io  response cache or entity cache reads and writes, including
+              (de)serializing the entries
+    json      encoding or decoding in utils/codec.py
+    cpu       anything else that is not an idle thread
+
+Each run writes to PROFILE_DIR/<workflow>-<timestamp>/:
+    <stage>.prof       cProfile stats (python -m pstats, snakeviz)
+    samples.folded     collapsed stacks, one "stage;frame;...;frame count" per line
+                       (flamegraph.pl, speedscope, inferno)
+    breakdown.json     seconds per stage and category
+
+Work handed to helper threads is wrapped with `bind()` so their samples count
+toward the submitting stage.
+
+Seconds are thread time, so concurrent stages can add up to more than the
+wall-clock run time. When no profiler is active, `stage()` does nothing and
+`bind()` returns the function unchanged.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Callable
+import sys
+import threading
+import time
+
+from config import Config
+
+
+CATEGORIES = ("network", "limiter", "cache_io", "json", "cpu")
+
+# (category, file name, qualified name prefix). A stack takes the category that comes
+# first in _PRIORITY among all its frames, e.g. a cache read that decodes JSON is cache_io.
+_RULES: Tuple[Tuple[str, str, str], ...] = (
+    ("limiter", "http_client.py", "RateLimiter.acquire"),
+    ("limiter", "http_client.py", "FederalAPIClient._backoff"),
+    ("network", "http_client.py", "FederalAPIClient._send"),
+    ("cache_io", "http_client.py", "CacheStore."),
+    ("cache_io", "entity_cache.py", "EntityCache."),
+    ("json", "codec.py", "")
+)
+_NETWORK_MODULES = ("/requests/", "/urllib3/", "/http/client.py", "/socket.py", "/ssl.py")
+# A thread whose innermost frame is one of these is blocked, not working
+_IDLE_MODULES = ("/threading.py", "/queue.py", "/selectors.py", "/concurrent/futures/")
+# ...unless it is blocked on work it handed to helper threads (besides _RULES frames,
+# e.g. a hedged request in FederalAPIClient._send), which takes that work's category
+_WAIT_RULES: Tuple[Tuple[str, str, str], ...] = (
+    ("network", "pagination.py", "Paginator.pages"),
+)
+_PRIORITY = {category: rank for rank, category in enumerate(("limiter", "network", "cache_io", "json"))}
+
+_active: Optional["WorkflowProfiler"] = None
+
+
+def active() -> Optional["WorkflowProfiler"]:
+    return _active
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Profile the enclosed code as stage `name` if a profiler is running."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def bind(fn: Callable) -> Callable:
+    """fn wrapped to run under the calling thread's stage, for submitting to a thread pool."""
+    profiler = _active
+    if profiler is None:
+        return fn
+    name = profiler.current_stage()
+    if name is None:
+        return fn
+
+    def run(*args, **kwargs):
+        with profiler.attach(name):
+            return fn(*args, **kwargs)
+    return run
+
+
+class WorkflowProfiler:
+    """Deterministic per-stage profiles plus an all-threads sampling profile for one run."""
+
+    def __init__(self, workflow: str, output_dir: Optional[str] = None,
+                 interval_ms: Optional[float] = None):
+        self.workflow = workflow
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.output_dir = Path(output_dir or Config.PROFILE_DIR) / f"{workflow}-{stamp}"
+        self.interval = (interval_ms or Config.PROFILE_INTERVAL_MS) / 1000
+        self._lock = threading.Lock()
+        # thread id -> stack of stage names running on it
+        self._thread_stages: Dict[int, List[str]] = {}
+        self._running: Counter = Counter()
+        self._wall: Dict[str, float] = {}
+        self._stacks: Counter = Counter()
+        self._categories: Dict[str, Counter] = {}
+        self._samples: Counter = Counter()
+        self._labels: Dict[Any, str] = {}
+        self._files: List[str] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.started = 0.0
+
+    def start(self) -> "WorkflowProfiler":
+        global _active
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        _active = self
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling, write the folded stacks and breakdown, and return the breakdown."""
+        global _active
+        if _active is self:
+            _active = None
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        return self._write()
+
+    def __enter__(self) -> "WorkflowProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._thread_stages.setdefault(ident, [])
+            nested = bool(stack)
+            stack.append(name)
+            self._running[name] += 1
+
+        # cProfile hooks only the calling thread; an outer stage on this thread already has it
+        profile = None
+        if not nested:
+            import cProfile
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler owns this interpreter (Python 3.12+); keep sampling only
+                profile = None
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                path = self.output_dir / f"{_safe(name)}.prof"
+                profile.dump_stats(str(path))
+                self._files.append(str(path))
+            with self._lock:
+                stack.pop()
+                if not stack:
+                    del self._thread_stages[ident]
+                self._running[name] -= 1
+                if not self._running[name]:
+                    del self._running[name]
+                self._wall[name] = self._wall.get(name, 0.0) + elapsed
+
+    def current_stage(self) -> Optional[str]:
+        with self._lock:
+            stack = self._thread_stages.get(threading.get_ident())
+            return stack[-1] if stack else None
+
+    @contextmanager
+    def attach(self, name: str) -> Iterator[None]:
+        """Attribute this thread's samples to stage `name` without profiling it as a new stage."""
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._thread_stages.setdefault(ident, [])
+            stack.append(name)
+        try:
+            yield
+        finally:
+            with self._lock:
+                stack.pop()
+                if not stack:
+                    del self._thread_stages[ident]
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            # Weight by the real gap: the sampler gets the GIL late when threads are busy
+            now = time.perf_counter()
+            weight, last = now - last, now
+            frames = sys._current_frames()
+            with self._lock:
+                stages = {ident: stack[-1] for ident, stack in self._thread_stages.items()}
+                running = list(self._running)
+            # Helper threads not started through bind() belong to the only stage
+            # running besides the workflow itself
+            inner = [name for name in running if name != self.workflow] or running
+            fallback = inner[0] if len(inner) == 1 else "(unattributed)"
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                self._record(stages.get(ident, fallback), frame, weight)
+
+    def _record(self, stage_name: str, frame, weight: float) -> None:
+        idle = any(module in frame.f_code.co_filename for module in _IDLE_MODULES)
+        category = None
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{Path(code.co_filename).name}:{_qualname(code, frame.f_globals)}"
+            labels.append(label)
+            found = _classify(code) or (_classify(code, _WAIT_RULES) if idle else None)
+            if found and (category is None or _PRIORITY[found] < _PRIORITY[category]):
+                category = found
+            frame = frame.f_back
+        category = category or ("idle" if idle else "cpu")
+
+        counts = self._categories.get(stage_name)
+        if counts is None:
+            counts = self._categories[stage_name] = Counter()
+        counts[category] += weight
+        self._samples[stage_name] += 1
+        if category != "idle":
+            labels.append(stage_name)
+            self._stacks[";".join(reversed(labels))] += 1
+
+    def _write(self) -> Dict[str, Any]:
+        folded = self.output_dir / "samples.folded"
+        with open(folded, "w") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        stages = {}
+        for name in sorted(set(self._wall) | set(self._categories)):
+            counts = self._categories.get(name, Counter())
+            stages[name] = {
+                "wall_seconds": round(self._wall.get(name, 0.0), 3),
+                "samples": self._samples[name],
+                "seconds": {c: round(counts[c], 3) for c in CATEGORIES},
+                "idle_seconds": round(counts["idle"], 3)
+            }
+        breakdown = {
+            "workflow": self.workflow,
+            "timestamp": datetime.now().isoformat(),
+            "wall_seconds": round(time.perf_counter() - self.started, 3),
+            "interval_ms": self.interval * 1000,
+            "stages": stages,
+            "files": sorted(self._files) + [str(folded)]
+        }
+        from utils import codec
+        codec.dump_file(breakdown, self.output_dir / "breakdown.json", pretty=True)
+        return breakdown
+
+
+def _classify(code, rules: Tuple[Tuple[str, str, str], ...] = _RULES) -> Optional[str]:
+    filename = code.co_filename
+    for category, file_name, qualname in rules:
+        if filename.endswith(file_name) and _qualname(code).startswith(qualname):
+            return category
+    if rules is _RULES and any(module in filename for module in _NETWORK_MODULES):
+        return "network"
+    return None
+
+
+# code object -> "Class.method", for interpreters whose code objects lack co_qualname
+_QUALNAMES: Dict[Any, str] = {}
+
+
+def _qualname(code, namespace: Optional[Dict[str, Any]] = None) -> str:
+    """Qualified name of a code object; before Python 3.11 it is looked up in the module's classes.
+
+    Pass the frame's globals the first time a code object is seen; later calls hit the cache.
+    """
+    qualname = getattr(code, "co_qualname", None)
+    if qualname is not None:
+        return qualname
+    qualname = _QUALNAMES.get(code)
+    if qualname is None:
+        qualname = _find_qualname(code, namespace or {})
+        if namespace is not None:
+            _QUALNAMES[code] = qualname
+    return qualname
+
+
+def _find_qualname(code, namespace: Dict[str, Any]) -> str:
+    """Class.method if code is a method (plain, static or class) of a class defined in the module."""
+    module = namespace.get("__name__")
+    for value in list(namespace.values()):
+        if not isinstance(value, type) or value.__module__ != module:
+            continue
+        for attr in vars(value).values():
+            if getattr(getattr(attr, "__func__", attr), "__code__", None) is code:
+                return f"{value.__qualname__}.{code.co_name}"
+    return code.co_name
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+
+def format_breakdown(breakdown: Dict[str, Any]) -> str:
+    """Text table of seconds per stage and category."""
+    lines = [f"{'stage':<16}{'wall':>9}" + "".join(f"{c:>10}" for c in CATEGORIES)]
+    for name, row in breakdown["stages"].items():
+        if not row["wall_seconds"] and not any(row["seconds"].values()):
+            continue
+        lines.append(f"{name:<16}{row['wall_seconds']:>8.2f}s"
+                     + "".join(f"{row['seconds'][c]:>9.2f}s" for c in CATEGORIES))
+    return "\n".join(lines)
@@ -0,0 +1,92 @@
+"""
+Lazy, process-wide registry of API clients and local stores.
+A client's module is imported and the client constructed the first time it is
+asked for, so short-lived commands only pay for what they touch.
+"""
+from typing import Any, Callable, Dict, List
+import threading
+
+
+def _sam(registry: "ClientRegistry") -> Any:
+    from sam.client import SAMEntityAPI
+    return SAMEntityAPI()
+
+
+def _sba(registry: "ClientRegistry") -> Any:
+    from sba.client import SBAOpportunitiesAPI
+    return SBAOpportunitiesAPI()
+
+
+def _dol(registry: "ClientRegistry") -> Any:
+    from dol.client import DOLAPI
+    return DOLAPI()
+
+
+def _series_store(registry: "ClientRegistry") -> Any:
+    from dol.series_store import BLSSeriesStore
+    return BLSSeriesStore(dol=registry.get("dol"))
+
+
+def _entity_store(registry: "ClientRegistry") -> Any:
+    from sam.entity_store import EntityStore
+    return EntityStore()
+
+
+class ClientRegistry:
+    """Named factories whose products are built once and then shared.
+    
+    Access by name (`clients.get("sam")`) or attribute (`clients.sam`).
+    """
+    
+    def __init__(self):
+        self._factories: Dict[str, Callable[["ClientRegistry"], Any]] = {
+            "sam": _sam,
+            "sba": _sba,
+            "dol": _dol,
+            "series_store": _series_store,
+            "entity_store": _entity_store
+        }
+        self._instances: Dict[str, Any] = {}
+        # Re-entrant: factories may pull in other registered clients
+        self._lock = threading.RLock()
+    
+    def register(self, name: str, factory: Callable[["ClientRegistry"], Any]) -> None:
+        """Add or replace a factory. An already-built instance is discarded."""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+    
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._instances:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"No client registered as '{name}'")
+                self._instances[name] = factory(self)
+            return self._instances[name]
+    
+    def warm(self, *names: str) -> None:
+        """Build the named clients (all registered ones by default) ahead of first use."""
+        for name in names or list(self._factories):
+            self.get(name)
+    
+    def loaded(self) -> List[str]:
+        return list(self._instances)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._instances.clear()
+    
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.get(name)
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+clients = ClientRegistry()
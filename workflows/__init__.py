@@ -1,18 +1,32 @@
-"""Workflows module for Federal API Vault."""
-from .implementations import (
-    run_nightly_sync,
-    run_opportunity_scan,
-    run_entity_refresh,
-    EntityRefreshWorkflow,
-    OpportunityScanWorkflow,
-    NightlySyncWorkflow
-)
+"""Workflows module for Federal API Vault.
 
-__all__ = [
-    "run_nightly_sync",
-    "run_opportunity_scan",
-    "run_entity_refresh",
-    "EntityRefreshWorkflow",
-    "OpportunityScanWorkflow",
-    "NightlySyncWorkflow"
-]
+Names are resolved on first access so importing the package does not load
+every workflow and API client.
+"""
+from utils.lazy import lazy_module
+
+_LAZY = {
+    "run_nightly_sync": ".implementations",
+    "run_opportunity_scan": ".implementations",
+    "run_entity_refresh": ".implementations",
+    "run_labor_sync": ".implementations",
+    "run_opportunity_matching": ".implementations",
+    "EntityRefreshWorkflow": ".implementations",
+    "OpportunityScanWorkflow": ".implementations",
+    "LaborStatsWorkflow": ".implementations",
+    "NightlySyncWorkflow": ".implementations",
+    "OpportunityMatchingWorkflow": ".implementations",
+    "MatchingEngine": ".matching",
+    "OpportunityIndex": ".matching",
+    "EntityProfile": ".matching",
+    "StageDAG": ".dag",
+    "Stage": ".dag",
+    "StageResult": ".dag",
+    "WorkflowCheckpoint": ".checkpoint",
+    "WorkQueue": ".work_queue",
+    "WorkItem": ".work_queue"
+}
+
+__getattr__, __dir__ = lazy_module(globals(), _LAZY)
+
+__all__ = list(_LAZY)
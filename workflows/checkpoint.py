@@ -0,0 +1,116 @@
+"""
+Durable checkpoints for long-running workflows.
+Each run appends completed units to a JSONL file so an interrupted run can resume
+without re-spending API quota on work already done.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+import os
+import threading
+import uuid
+
+from utils import codec
+
+
+class WorkflowCheckpoint:
+    """Completed-unit log for one workflow run.
+
+    Layout: data/checkpoints/<workflow>/<run_id>.jsonl, one header line, one
+    line per completed unit and a final completion marker.
+    """
+
+    def __init__(self, workflow: str, run_id: Optional[str] = None,
+                 checkpoint_dir: str = "data/checkpoints"):
+        self.workflow = workflow
+        self.run_id = run_id or self.new_run_id()
+        self.directory = Path(checkpoint_dir) / workflow
+        self.path = self.directory / f"{self.run_id}.jsonl"
+        self.completed: Dict[str, Any] = {}
+        self.resumed = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+
+    @classmethod
+    def start(cls, workflow: str, resume: bool = False,
+              checkpoint_dir: str = "data/checkpoints") -> "WorkflowCheckpoint":
+        """Open the latest unfinished run when resuming, otherwise begin a new one."""
+        if resume:
+            pending = cls.latest_incomplete(workflow, checkpoint_dir)
+            if pending is not None:
+                return pending
+
+        checkpoint = cls(workflow, checkpoint_dir=checkpoint_dir)
+        checkpoint._append({
+            "run_id": checkpoint.run_id,
+            "workflow": workflow,
+            "started": datetime.now().isoformat()
+        })
+        return checkpoint
+
+    @classmethod
+    def latest_incomplete(cls, workflow: str,
+                          checkpoint_dir: str = "data/checkpoints") -> Optional["WorkflowCheckpoint"]:
+        """Load the most recent run that never wrote its completion marker."""
+        directory = Path(checkpoint_dir) / workflow
+        if not directory.exists():
+            return None
+
+        runs = sorted(directory.glob("*.jsonl"))
+        if not runs:
+            return None
+
+        checkpoint = cls(workflow, run_id=runs[-1].stem, checkpoint_dir=checkpoint_dir)
+        if not checkpoint._load():
+            return None
+        checkpoint.resumed = True
+        return checkpoint
+
+    def _load(self) -> bool:
+        """Read completed units. Returns False if the run already finished."""
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = codec.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated final line
+                    continue
+                if entry.get("status") == "complete":
+                    return False
+                if "unit" in entry:
+                    self.completed[entry["unit"]] = entry.get("result")
+        return True
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(codec.dumps(entry) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def is_done(self, unit: str) -> bool:
+        return unit in self.completed
+
+    def pending(self, units: List[str]) -> List[str]:
+        """Units not yet completed, preserving order."""
+        return [u for u in units if u not in self.completed]
+
+    def record(self, unit: str, result: Any = None) -> None:
+        """Durably mark a unit complete along with its result."""
+        with self._lock:
+            self._append({"unit": unit, "result": result})
+            self.completed[unit] = result
+
+    def finish(self) -> None:
+        """Mark the run complete so it is never resumed, and drop older runs it supersedes."""
+        with self._lock:
+            self._append({"status": "complete", "finished": datetime.now().isoformat()})
+            for old in self.directory.glob("*.jsonl"):
+                if old.stem < self.run_id:
+                    old.unlink()
@@ -0,0 +1,164 @@
+"""
+Stage DAG executor for multi-API workflows.
+Independent stages run concurrently, bounded by per-API concurrency limits.
+Stages run in a copy of the caller's context, so the calling job (workflows.jobs)
+sees their output and cancelling it stops the DAG.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextvars import copy_context
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Iterable
+import threading
+import time
+import traceback
+
+from utils import profiling
+from workflows.jobs import JobCancelled
+
+
+class Stage:
+    """A named unit of work with declared dependencies and the upstream API it uses."""
+
+    def __init__(self, name: str, fn: Callable[[], Any], depends_on: Iterable[str] = (),
+                 api: Optional[str] = None):
+        self.name = name
+        self.fn = fn
+        self.depends_on = tuple(depends_on)
+        self.api = api
+
+
+class StageResult:
+    """Outcome and timing of a single stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Any = None
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "started": datetime.fromtimestamp(self.started).isoformat() if self.started else None,
+            "finished": datetime.fromtimestamp(self.finished).isoformat() if self.finished else None,
+            "duration_seconds": self.duration_seconds,
+            "error": self.error
+        }
+
+
+class StageDAG:
+    """Run stages as soon as their dependencies succeed.
+
+    A failed stage marks its transitive dependents as skipped; stages that do
+    not depend on it keep running. A stage raising JobCancelled stops new stages
+    from starting and re-raises it from run() once the running ones return.
+    """
+
+    def __init__(self, concurrency_limits: Optional[Dict[str, int]] = None):
+        self.stages: Dict[str, Stage] = {}
+        self._semaphores = {
+            api: threading.BoundedSemaphore(max(1, limit))
+            for api, limit in (concurrency_limits or {}).items()
+        }
+
+    def add_stage(self, name: str, fn: Callable[[], Any], depends_on: Iterable[str] = (),
+                  api: Optional[str] = None) -> Stage:
+        """Register a stage. Dependencies may be registered in any order."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        stage = Stage(name, fn, depends_on, api)
+        self.stages[name] = stage
+        return stage
+
+    def validate(self) -> List[str]:
+        """Check dependencies exist and the graph is acyclic. Returns a topological order."""
+        for stage in self.stages.values():
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            state[name] = 1
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _execute(self, stage: Stage, result: StageResult) -> None:
+        semaphore = self._semaphores.get(stage.api) if stage.api else None
+        if semaphore:
+            semaphore.acquire()
+        try:
+            result.status = "running"
+            result.started = time.time()
+            with profiling.stage(stage.name):
+                result.result = stage.fn()
+            result.status = "succeeded"
+        except JobCancelled:
+            result.status = "cancelled"
+            result.error = "job cancelled"
+            raise
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        finally:
+            result.finished = time.time()
+            if semaphore:
+                semaphore.release()
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, StageResult]:
+        """Execute the DAG and return per-stage results."""
+        self.validate()
+        results = {name: StageResult(name) for name in self.stages}
+        remaining = set(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers or max(1, len(self.stages))) as pool:
+            while remaining or running:
+                for name in sorted(remaining):
+                    deps = [results[d].status for d in self.stages[name].depends_on]
+                    if any(s in ("failed", "skipped") for s in deps):
+                        results[name].status = "skipped"
+                        results[name].error = "upstream stage did not succeed"
+                        remaining.discard(name)
+                    elif all(s == "succeeded" for s in deps):
+                        future = pool.submit(copy_context().run, self._execute,
+                                             self.stages[name], results[name])
+                        running[future] = name
+                        remaining.discard(name)
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    # Re-raises JobCancelled; _execute records every other failure
+                    future.result()
+
+        return results
@@ -6,37 +6,79 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from contextvars import copy_context
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import json
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
+import threading
+import time
 
-from sam.client import SAMEntityAPI, parse_entity_status
+from sam.client import SAMEntityAPI, parse_entity_status, lookup_failed
 from sba.client import SBAOpportunitiesAPI, extract_opportunities
 from dol.client import DOLAPI, wotc_eligibility
 from irs.client import validate_ein, TaxIDValidator
+from workflows.dag import StageDAG
+from workflows.checkpoint import WorkflowCheckpoint
+from workflows.jobs import Job
+from utils.metrics import metrics
+from utils import codec
+from config import Config
+
+# Stores, the work queue and the matching engine are imported where they are first
+# used, so importing the workflows (or one runner) does not load all of them
+if TYPE_CHECKING:
+    from sam.entity_table import EntityTable
+    from sam.entity_store import EntityStore
+    from workflows.work_queue import WorkQueue, WorkItem
+    from workflows.matching import EntityProfile, MatchingEngine
 
 
 class EntityRefreshWorkflow:
-    """Refresh SAM.gov entity registrations for tracked businesses."""
+    """Refresh SAM.gov entity registrations for tracked businesses.
+    
+    `run` refreshes in this process. For large watch lists, `enqueue` splits the UEIs
+    into a shared work queue, any number of `work` processes drain it, and `collect`
+    merges their results into the usual output file.
+    
+    Each run's results are also upserted into the entity history store at
+    DATABASE_URL (ENTITY_STORE_ENABLED).
+    """
     
-    def __init__(self):
-        self.sam = SAMEntityAPI()
+    QUEUE_NAME = "entity_refresh"
+    
+    def __init__(self, sam: Optional[SAMEntityAPI] = None, work_queue: Optional["WorkQueue"] = None,
+                 store: Optional["EntityStore"] = None):
+        self.sam = sam or SAMEntityAPI()
+        self._work_queue = work_queue
+        self._store = store
         self.entities_file = Path("data/tracked_entities.json")
+        self.output_file = Path("data/entity_refresh_results.json")
         self.entities_file.parent.mkdir(parents=True, exist_ok=True)
     
+    @property
+    def work_queue(self) -> "WorkQueue":
+        if self._work_queue is None:
+            from workflows.work_queue import WorkQueue
+            self._work_queue = WorkQueue(self.QUEUE_NAME)
+        return self._work_queue
+    
+    @property
+    def store(self) -> "EntityStore":
+        if self._store is None:
+            from sam.entity_store import EntityStore
+            self._store = EntityStore()
+        return self._store
+    
     def load_tracked_entities(self) -> List[str]:
         """Load list of UEIs to monitor."""
         if not self.entities_file.exists():
             return []
         
         try:
-            with open(self.entities_file, "r") as f:
-                data = json.load(f)
-                return data.get("ueis", [])
+            return codec.load_file(self.entities_file).get("ueis", [])
         except Exception:
             return []
     
-    def run(self) -> None:
+    def run(self, resume: bool = False, progress: Optional[Job] = None) -> None:
         """Execute entity refresh workflow."""
         print("=== Entity Refresh Workflow ===")
         print(f"Timestamp: {datetime.now().isoformat()}")
@@ -48,11 +90,28 @@ class EntityRefreshWorkflow:
             print("No entities tracked. Add UEIs to data/tracked_entities.json")
             return
         
-        results = []
-        for uei in ueis:
+        started = time.perf_counter()
+        checkpoint = WorkflowCheckpoint.start("entity_refresh", resume=resume)
+        if checkpoint.resumed:
+            print(f"Resuming run {checkpoint.run_id}: {len(checkpoint.completed)} entities already refreshed")
+        
+        pending = checkpoint.pending(ueis)
+        failed: Dict[str, Dict[str, Any]] = {}
+        for uei in pending:
+            if progress:
+                progress.check_cancelled()
             print(f"\nRefreshing {uei}...")
-            status = self.sam.validate_entity_status(uei)
-            results.append(status)
+            try:
+                status = self.sam.validate_entity_status(uei, raise_errors=True)
+            except Exception as e:
+                # Not checkpointed, so --resume retries it
+                failed[uei] = lookup_failed(uei, e)
+                print(f"  ❌ {failed[uei]['error']}")
+                continue
+            checkpoint.record(uei, status)
+            metrics.inc("vault_workflow_units_total", workflow="entity_refresh")
+            if progress:
+                progress.report("entity_refresh", len(checkpoint.completed), len(ueis), status)
             
             if not status.get("is_active"):
                 print(f"  ⚠️  INACTIVE: {status.get('legal_name')}")
@@ -60,18 +119,155 @@ class EntityRefreshWorkflow:
             if status.get("has_exclusions"):
                 print(f"  ⚠️  EXCLUSIONS: {status.get('exclusion_count')} found")
         
-        output_file = Path("data/entity_refresh_results.json")
-        with open(output_file, "w") as f:
-            json.dump({"timestamp": datetime.now().isoformat(), "results": results}, f, indent=2)
+        results = [checkpoint.completed[uei] if uei in checkpoint.completed else failed[uei] for uei in ueis]
+        self.save_results(checkpoint.run_id, results)
+        if failed:
+            print(f"\n⚠️  {len(failed)} lookups failed; run again with --resume to retry them")
+        else:
+            checkpoint.finish()
+        metrics.record_workflow("entity_refresh", len(pending), time.perf_counter() - started)
+        
+        print(f"\n✅ Results saved to {self.output_file}")
+    
+    def load_results(self) -> "EntityTable":
+        """Statuses from the last refresh as a compact table keyed by UEI."""
+        from sam.entity_table import EntityTable
+        if not self.output_file.exists():
+            return EntityTable()
+        try:
+            return EntityTable(codec.load_file(self.output_file).get("results", []))
+        except Exception:
+            return EntityTable()
+    
+    def save_results(self, run_id: str, results: List[Dict[str, Any]]) -> None:
+        codec.dump_file({
+            "timestamp": datetime.now().isoformat(),
+            "run_id": run_id,
+            "results": results
+        }, self.output_file, pretty=True)
+        if Config.ENTITY_STORE_ENABLED:
+            try:
+                counts = self.store.upsert_many(results, run_id=run_id)
+                print(f"History: {counts['new']} new, {counts['changed']} changed, "
+                      f"{counts['unchanged']} unchanged, {counts['skipped']} not refreshed")
+            except Exception as e:
+                print(f"⚠️  Entity history store not updated: {e}")
+    
+    def enqueue(self, run_id: Optional[str] = None) -> str:
+        """Queue every tracked UEI as a work item and return the run ID workers should drain."""
+        run_id = run_id or WorkflowCheckpoint.new_run_id()
+        ueis = self.load_tracked_entities()
+        added = self.work_queue.enqueue(run_id, ueis)
+        print(f"Queued {added} of {len(ueis)} entities for run {run_id}")
+        return run_id
+    
+    def work(self, run_id: Optional[str] = None, worker_id: Optional[str] = None,
+             threads: int = 1, poll_seconds: float = 2.0, progress: Optional[Job] = None) -> int:
+        """Claim, refresh and acknowledge items until the run is drained.
+        
+        Workers wait while other workers still hold live leases, so items from a
+        crashed worker are picked up once its visibility timeout passes.
+        """
+        run_id = run_id or self.work_queue.latest_run()
+        if run_id is None:
+            print("Nothing queued. Run the enqueue step first.")
+            return 0
+        worker_id = worker_id or self.work_queue.new_worker_id()
+        started = time.perf_counter()
+        counts: List[int] = []
+        
+        def loop(thread_worker_id: str) -> None:
+            counts.append(self._work_loop(run_id, thread_worker_id, poll_seconds, progress))
+        
+        # Each thread runs in a copy of this context so its output still goes to the calling job
+        workers = [
+            threading.Thread(target=copy_context().run,
+                             args=(loop, f"{worker_id}-{i}" if threads > 1 else worker_id),
+                             name=f"entity-worker-{i}")
+            for i in range(max(1, threads))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
         
-        print(f"\n✅ Results saved to {output_file}")
+        processed = sum(counts)
+        metrics.record_workflow("entity_refresh_worker", processed, time.perf_counter() - started)
+        print(f"Worker {worker_id} refreshed {processed} entities for run {run_id}")
+        return processed
+    
+    def _work_loop(self, run_id: str, worker_id: str, poll_seconds: float,
+                   progress: Optional[Job] = None) -> int:
+        queue = self.work_queue
+        processed = 0
+        while True:
+            items = queue.claim(run_id, worker_id, limit=Config.WORK_QUEUE_BATCH)
+            if not items:
+                if queue.is_drained(run_id):
+                    return processed
+                time.sleep(poll_seconds)
+                continue
+            
+            remaining = list(items)
+            try:
+                while remaining:
+                    if progress:
+                        progress.check_cancelled()
+                    item = remaining[0]
+                    if item.lease_expires - time.time() < queue.visibility_timeout / 2:
+                        if not queue.extend(item, worker_id):
+                            remaining.pop(0)
+                            continue
+                    processed += self._process_item(item, worker_id)
+                    remaining.pop(0)
+            finally:
+                for item in remaining:
+                    queue.release(item, worker_id)
+    
+    def _process_item(self, item: "WorkItem", worker_id: str) -> int:
+        try:
+            # Raises on lookup failures so they are retried up to WORK_QUEUE_MAX_ATTEMPTS
+            status = self.sam.validate_entity_status(item.key, raise_errors=True)
+        except Exception as e:
+            self.work_queue.nack(item, worker_id, f"{type(e).__name__}: {e}")
+            return 0
+        if not self.work_queue.ack(item, worker_id, status):
+            # Lease expired and another worker took the item over; its result wins
+            return 0
+        metrics.inc("vault_workflow_units_total", workflow="entity_refresh")
+        return 1
+    
+    def collect(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        """Merge queued results into the entity refresh output, in tracked order."""
+        run_id = run_id or self.work_queue.latest_run()
+        if run_id is None:
+            print("Nothing queued.")
+            return {}
+        
+        counts = self.work_queue.stats(run_id)
+        results = []
+        for row in self.work_queue.results(run_id):
+            if row["status"] == "done":
+                results.append(row["result"])
+            else:
+                results.append({
+                    "uei": row["key"],
+                    "error": row["error"] or f"Not refreshed ({row['status']})",
+                    "is_active": False
+                })
+        self.save_results(run_id, results)
+        
+        print(f"Run {run_id}: {counts['done']} done, {counts['failed']} failed, "
+              f"{counts['pending'] + counts['leased']} outstanding")
+        print(f"✅ Results saved to {self.output_file}")
+        return counts
 
 
 class OpportunityScanWorkflow:
     """Scan for relevant federal contracting opportunities."""
     
-    def __init__(self):
-        self.sba = SBAOpportunitiesAPI()
+    def __init__(self, sba: Optional[SBAOpportunitiesAPI] = None):
+        self.sba = sba or SBAOpportunitiesAPI()
         self.config_file = Path("data/opportunity_filters.json")
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
     
@@ -86,67 +282,300 @@ class OpportunityScanWorkflow:
             }
         
         try:
-            with open(self.config_file, "r") as f:
-                return json.load(f)
+            return codec.load_file(self.config_file)
         except Exception:
             return {"naics_codes": [], "set_asides": []}
     
-    def run(self) -> None:
+    def query_plan(self, filters: Dict[str, Any]) -> List[str]:
+        """One checkpoint unit per NAICS/set-aside search."""
+        return [
+            f"{naics}|{set_aside}"
+            for naics in filters.get("naics_codes", [])
+            for set_aside in filters.get("set_asides", [])
+        ]
+    
+    def run(self, resume: bool = False, progress: Optional[Job] = None) -> None:
         """Execute opportunity scan workflow."""
         print("=== Opportunity Scan Workflow ===")
         print(f"Timestamp: {datetime.now().isoformat()}")
         
         filters = self.load_filters()
-        all_opportunities = []
+        plan = self.query_plan(filters)
         
-        for naics in filters.get("naics_codes", []):
-            print(f"\nSearching NAICS {naics}...")
-            for set_aside in filters.get("set_asides", []):
-                ops = self.sba.search_opportunities(naics_code=naics, set_aside=set_aside, limit=20)
-                all_opportunities.extend(ops)
+        started = time.perf_counter()
+        checkpoint = WorkflowCheckpoint.start("opportunity_scan", resume=resume)
+        if checkpoint.resumed:
+            print(f"Resuming run {checkpoint.run_id}: {len(checkpoint.completed)} searches already done")
+        
+        pending = checkpoint.pending(plan)
+        failed = []
+        for unit in pending:
+            if progress:
+                progress.check_cancelled()
+            naics, set_aside = unit.split("|", 1)
+            print(f"\nSearching NAICS {naics} ({set_aside})...")
+            try:
+                ops = self.sba.search_opportunities(naics_code=naics, set_aside=set_aside, limit=20,
+                                                    raise_errors=True)
+            except Exception as e:
+                # Not checkpointed, so --resume retries it
+                failed.append(unit)
+                print(f"  ❌ Search failed: {e}")
+                continue
+            checkpoint.record(unit, ops)
+            metrics.inc("vault_workflow_units_total", workflow="opportunity_scan")
+            if progress:
+                progress.report("opportunity_scan", len(checkpoint.completed), len(plan),
+                                {"search": unit, "opportunities": len(ops)})
+        
+        all_opportunities = []
+        for unit in plan:
+            all_opportunities.extend(checkpoint.completed.get(unit, []))
         
         normalized = extract_opportunities({"opportunitiesData": all_opportunities})
         
         print(f"\n✅ {len(normalized)} opportunities found")
         
         output_file = Path("data/opportunities_scan_results.json")
-        with open(output_file, "w") as f:
-            json.dump({"timestamp": datetime.now().isoformat(), "opportunities": normalized}, f, indent=2)
+        codec.dump_file({
+            "timestamp": datetime.now().isoformat(),
+            "run_id": checkpoint.run_id,
+            "opportunities": normalized
+        }, output_file, pretty=True)
+        if failed:
+            print(f"⚠️  {len(failed)} searches failed; run again with --resume to retry them")
+        else:
+            checkpoint.finish()
+        metrics.record_workflow("opportunity_scan", len(pending), time.perf_counter() - started)
+
+
+class LaborStatsWorkflow:
+    """Pull tracked BLS series and area unemployment rates into the local series store."""
+    
+    def __init__(self, dol: Optional[DOLAPI] = None):
+        from dol.series_store import BLSSeriesStore
+        self.store = BLSSeriesStore(dol=dol or DOLAPI())
+        self.config_file = Path("data/labor_series.json")
+        self.config_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    def load_targets(self) -> Dict[str, Any]:
+        """Load BLS series IDs and area codes to keep current."""
+        if not self.config_file.exists():
+            return {"series_ids": [], "area_codes": []}
+        
+        try:
+            return codec.load_file(self.config_file)
+        except Exception:
+            return {"series_ids": [], "area_codes": []}
+    
+    def run(self, resume: bool = False, progress: Optional[Job] = None) -> None:
+        """Execute labor statistics refresh."""
+        print("=== Labor Statistics Workflow ===")
+        print(f"Timestamp: {datetime.now().isoformat()}")
+        
+        targets = self.load_targets()
+        area_codes = targets.get("area_codes", [])
+        series_ids = list(targets.get("series_ids", []))
+        series_ids += [DOLAPI.unemployment_series_id(area) for area in area_codes]
+        
+        if not series_ids:
+            print("No series tracked. Add series_ids/area_codes to data/labor_series.json")
+            return
+        
+        started = time.perf_counter()
+        checkpoint = WorkflowCheckpoint.start("labor_stats", resume=resume)
+        if checkpoint.resumed:
+            print(f"Resuming run {checkpoint.run_id}: {len(checkpoint.completed)} series already pulled")
+        
+        def record_batch(batch: Dict[str, int]) -> None:
+            for sid, count in batch.items():
+                checkpoint.record(sid, count)
+            metrics.inc("vault_workflow_units_total", len(batch), workflow="labor_stats")
+            if progress:
+                progress.report("labor_stats", len(checkpoint.completed), len(series_ids), batch)
+                progress.check_cancelled()
+        
+        failed: List[str] = []
+        
+        def record_failed(ids: List[str]) -> None:
+            # Not checkpointed, so --resume retries them
+            failed.extend(ids)
+            if progress:
+                progress.check_cancelled()
+        
+        if progress:
+            progress.check_cancelled()
+        pending = checkpoint.pending(series_ids)
+        self.store.refresh(pending, on_batch=record_batch, on_failed=record_failed)
+        added = sum(count or 0 for count in checkpoint.completed.values())
+        print(f"\n✅ {added} new or revised data points across {len(series_ids)} series")
+        
+        output_file = Path("data/labor_stats_results.json")
+        codec.dump_file({
+            "timestamp": datetime.now().isoformat(),
+            "latest": {sid: self.store.latest(sid) for sid in series_ids},
+            "run_id": checkpoint.run_id,
+            "areas": self.store.compare_areas(area_codes) if area_codes else {}
+        }, output_file, pretty=True)
+        if failed:
+            print(f"⚠️  {len(failed)} series failed; run again with --resume to retry them")
+        else:
+            checkpoint.finish()
+        metrics.record_workflow("labor_stats", len(pending), time.perf_counter() - started)
+
+
+class OpportunityMatchingWorkflow:
+    """Rank open opportunities for every tracked entity.
+    
+    Reads the latest entity refresh and opportunity scan outputs. Notices are added
+    to the persistent opportunity index and matched incrementally; only entities
+    whose capability profile changed are matched against every indexed notice.
+    """
+    
+    def __init__(self, sam: Optional[SAMEntityAPI] = None, engine: Optional["MatchingEngine"] = None):
+        self.sam = sam or SAMEntityAPI()
+        self.engine = engine
+        self.entities_file = Path("data/tracked_entities.json")
+        self.opportunities_file = Path("data/opportunities_scan_results.json")
+        self.filters_file = Path("data/opportunity_filters.json")
+        self.output_file = Path("data/opportunity_matches.json")
+    
+    def _load(self, path: Path, default: Dict[str, Any]) -> Dict[str, Any]:
+        if not path.exists():
+            return default
+        try:
+            return codec.load_file(path)
+        except Exception:
+            return default
+    
+    def build_profiles(self, ueis: List[str], agencies: List[str],
+                       progress: Optional[Job] = None) -> List["EntityProfile"]:
+        """Capability profiles from cached SAM records, eligibility from the last refresh."""
+        from workflows.matching import EntityProfile
+        refreshed = EntityRefreshWorkflow(sam=self.sam).load_results()
+        profiles = []
+        for uei in ueis:
+            if progress:
+                progress.check_cancelled()
+            entity = self.sam.get_entity_by_uei(uei)
+            if not entity:
+                continue
+            status = refreshed.get(uei)
+            eligible = None
+            if status is not None:
+                eligible = bool(status.get("is_active")) and not status.get("has_exclusions")
+            profile = EntityProfile.from_entity(entity, agencies=agencies, eligible=eligible)
+            if profile:
+                profiles.append(profile)
+        return profiles
+    
+    def run(self, resume: bool = False, progress: Optional[Job] = None) -> None:
+        """Execute opportunity matching."""
+        print("=== Opportunity Matching Workflow ===")
+        print(f"Timestamp: {datetime.now().isoformat()}")
+        
+        ueis = self._load(self.entities_file, {}).get("ueis", [])
+        if not ueis:
+            print("No entities tracked. Add UEIs to data/tracked_entities.json")
+            return
+        
+        from workflows.matching import MatchingEngine
+        started = time.perf_counter()
+        filters = self._load(self.filters_file, {})
+        engine = self.engine or MatchingEngine(min_days_to_respond=filters.get("min_days_to_respond", 0))
+        engine.load_state(self.output_file)
+        expired = engine.prune()
+        
+        changed = engine.set_profiles(self.build_profiles(ueis, filters.get("agencies", []), progress))
+        opportunities = self._load(self.opportunities_file, {}).get("opportunities", [])
+        added = engine.add_opportunities(opportunities)
+        engine.match_all(changed)
+        
+        matched = sum(1 for m in engine.matches.values() if m)
+        print(f"{len(engine.profiles)} profiles ({len(changed)} new or changed), "
+              f"{added} new notices, {len(engine.index)} indexed, {expired} expired matches dropped")
+        print(f"\n✅ {matched} entities with matches")
+        
+        engine.save_state(self.output_file, timestamp=datetime.now().isoformat())
+        metrics.inc("vault_workflow_units_total", len(engine.profiles), workflow="opportunity_matching")
+        metrics.record_workflow("opportunity_matching", len(engine.profiles), time.perf_counter() - started)
+        print(f"Results saved to {self.output_file}")
 
 
 class NightlySyncWorkflow:
-    """Combined nightly sync of all federal data sources."""
+    """Combined nightly sync of all federal data sources.
+    
+    Entity, opportunity and labor stages have no data dependencies on each other, so
+    they run concurrently and a failure in one does not block the others. Matching
+    runs once both entities and opportunities have succeeded.
+    """
+    
+    def __init__(self, sam: Optional[SAMEntityAPI] = None, sba: Optional[SBAOpportunitiesAPI] = None,
+                 dol: Optional[DOLAPI] = None):
+        self.sam = sam or SAMEntityAPI()
+        self.sba = sba or SBAOpportunitiesAPI()
+        self.dol = dol or DOLAPI()
     
-    def __init__(self):
-        self.sam = SAMEntityAPI()
-        self.sba = SBAOpportunitiesAPI()
-        self.dol = DOLAPI()
+    def build_dag(self, resume: bool = False, progress: Optional[Job] = None) -> StageDAG:
+        """Declare nightly stages, their dependencies and upstream APIs."""
+        dag = StageDAG(concurrency_limits={
+            "SAM": Config.STAGE_CONCURRENCY_SAM,
+            "DOL": Config.STAGE_CONCURRENCY_DOL
+        })
+        entities = EntityRefreshWorkflow(sam=self.sam)
+        opportunities = OpportunityScanWorkflow(sba=self.sba)
+        labor = LaborStatsWorkflow(dol=self.dol)
+        matching = OpportunityMatchingWorkflow(sam=self.sam)
+        dag.add_stage("entities", lambda: entities.run(resume, progress), api="SAM")
+        dag.add_stage("opportunities", lambda: opportunities.run(resume, progress), api="SAM")
+        dag.add_stage("labor", lambda: labor.run(resume, progress), api="DOL")
+        dag.add_stage("matching", lambda: matching.run(resume, progress),
+                      depends_on=("entities", "opportunities"), api="SAM")
+        return dag
     
-    def run(self) -> None:
+    def run(self, resume: bool = False, progress: Optional[Job] = None) -> Dict[str, Any]:
         """Execute comprehensive nightly sync."""
         print("=" * 50)
         print("NIGHTLY SYNC WORKFLOW")
         print("=" * 50)
-        print(f"Started: {datetime.now().isoformat()}\n")
+        started = datetime.now()
+        print(f"Started: {started.isoformat()}\n")
         
-        print("[1/3] Refreshing entity data...")
-        EntityRefreshWorkflow().run()
+        results = self.build_dag(resume=resume, progress=progress).run()
         
-        print("\n[2/3] Scanning opportunities...")
-        OpportunityScanWorkflow().run()
+        print(f"\n{'=' * 50}")
+        for result in results.values():
+            duration = result.duration_seconds
+            timing = f"{duration:.1f}s" if duration is not None else "-"
+            line = f"  {result.name:<15} {result.status:<10} {timing}"
+            if result.error:
+                line += f"  ({result.error})"
+            print(line)
         
-        print("\n[3/3] Updating labor statistics...")
-        print("✅ Labor statistics placeholder")
+        finished = datetime.now()
+        report = {
+            "started": started.isoformat(),
+            "finished": finished.isoformat(),
+            "duration_seconds": (finished - started).total_seconds(),
+            "stages": [r.to_dict() for r in results.values()]
+        }
+        codec.dump_file(report, Path("data/nightly_sync_report.json"), pretty=True)
         
-        print(f"\n{'=' * 50}")
-        print(f"Completed: {datetime.now().isoformat()}")
+        print(f"Completed: {finished.isoformat()}")
+        return report
+
+
+def run_nightly_sync(resume: bool = False):
+    NightlySyncWorkflow().run(resume=resume)
 
+def run_opportunity_scan(resume: bool = False):
+    OpportunityScanWorkflow().run(resume=resume)
 
-def run_nightly_sync():
-    NightlySyncWorkflow().run()
+def run_entity_refresh(resume: bool = False):
+    EntityRefreshWorkflow().run(resume=resume)
 
-def run_opportunity_scan():
-    OpportunityScanWorkflow().run()
+def run_labor_sync(resume: bool = False):
+    LaborStatsWorkflow().run(resume=resume)
 
-def run_entity_refresh():
-    EntityRefreshWorkflow().run()
+def run_opportunity_matching(resume: bool = False):
+    OpportunityMatchingWorkflow().run(resume=resume)
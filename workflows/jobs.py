@@ -0,0 +1,251 @@
+"""
+In-process background job queue for long-running workflows.
+Jobs report progress and partial results while they run and can be cancelled.
+Scheduling is round-robin across clients so one caller's long sync cannot starve others.
+The running job is tracked in a context variable, so threads a workflow starts with a
+copy of its context (e.g. StageDAG stages) report to the same job.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from collections import deque, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Deque
+import threading
+import traceback
+import uuid
+
+
+class JobCancelled(Exception):
+    """Raised inside a workflow when its job has been cancelled."""
+
+
+_current_job: "ContextVar[Optional[Job]]" = ContextVar("current_job", default=None)
+
+
+def current_job() -> Optional["Job"]:
+    """Job whose workflow is running in the calling context, if any."""
+    return _current_job.get()
+
+
+class Job:
+    """A queued workflow run with progress, partial results and cancellation."""
+
+    MAX_PARTIAL_RESULTS = 1000
+    MAX_LOG_LINES = 500
+
+    def __init__(self, workflow: str, fn: Callable[["Job"], Any], client: str = "",
+                 options: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.workflow = workflow
+        self.client = client or "default"
+        # Arguments the run was requested with (e.g. resume); part of its identity for dedupe
+        self.options = dict(options or {})
+        self.fn = fn
+        self.status = "queued"
+        self.created = datetime.now()
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
+        self.progress: Dict[str, Dict[str, int]] = {}
+        self.partial_results: Deque[Any] = deque(maxlen=self.MAX_PARTIAL_RESULTS)
+        self.partial_count = 0
+        self.log: Deque[str] = deque(maxlen=self.MAX_LOG_LINES)
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def report(self, scope: str, done: int, total: int, item: Any = None) -> None:
+        """Update progress for one scope (e.g. a nightly stage) and record a partial result."""
+        with self._lock:
+            self.progress[scope] = {"done": done, "total": total}
+            if item is not None:
+                self.partial_results.append(item)
+                self.partial_count += 1
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled if cancellation was requested. Call between work units."""
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def write_log(self, text: str) -> None:
+        with self._lock:
+            for line in text.splitlines():
+                if line.strip():
+                    self.log.append(line)
+
+    def partial(self, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Window over retained partial results (the oldest are dropped beyond MAX_PARTIAL_RESULTS)."""
+        with self._lock:
+            items = list(self.partial_results)
+            dropped = self.partial_count - len(items)
+        start = max(0, offset - dropped)
+        return {
+            "job_id": self.id,
+            "total": self.partial_count,
+            "offset": max(offset, dropped),
+            "items": items[start:start + limit]
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            progress = {scope: dict(p) for scope, p in self.progress.items()}
+            log_tail = list(self.log)[-10:]
+        return {
+            "job_id": self.id,
+            "workflow": self.workflow,
+            "client": self.client,
+            "options": self.options,
+            "status": self.status,
+            "cancel_requested": self.cancel_requested,
+            "created": self.created.isoformat(),
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+            "progress": progress,
+            "partial_results": self.partial_count,
+            "error": self.error,
+            "log_tail": log_tail
+        }
+
+
+class JobQueue:
+    """Background worker pool with per-client fairness and per-workflow concurrency caps."""
+
+    def __init__(self, workers: int = 4, max_per_workflow: int = 1, history: int = 200):
+        self.max_per_workflow = max_per_workflow
+        self.history = history
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: "OrderedDict[str, Deque[Job]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def current_job(self) -> Optional[Job]:
+        """Job being executed in the calling context (a worker thread or a thread it started)."""
+        return current_job()
+
+    def submit(self, workflow: str, fn: Callable[[Job], Any], client: str = "",
+               dedupe: bool = True, options: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue a workflow run.
+
+        With dedupe, an unfinished run of the same workflow with the same options is
+        returned instead.
+        """
+        options = dict(options or {})
+        with self._cond:
+            if dedupe:
+                for job in self.jobs.values():
+                    if (job.workflow == workflow and job.options == options
+                            and not job.done and not job.cancel_requested):
+                        return job
+
+            job = Job(workflow, fn, client, options)
+            self.jobs[job.id] = job
+            self._pending.setdefault(job.client, deque()).append(job)
+            self._trim_history()
+            self._cond.notify_all()
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        return list(self.jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job. Queued jobs never start; running jobs stop at their next unit boundary."""
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.done:
+                return job
+            job.cancel()
+            if job.status == "queued":
+                queue = self._pending.get(job.client)
+                if queue and job in queue:
+                    queue.remove(job)
+                job.status = "cancelled"
+                job.finished = datetime.now()
+            return job
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopped = True
+            for job in self.jobs.values():
+                if not job.done:
+                    job.cancel()
+            self._cond.notify_all()
+
+    def _trim_history(self) -> None:
+        finished = [jid for jid, job in self.jobs.items() if job.done]
+        for jid in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[jid]
+
+    def _next_job(self) -> Optional[Job]:
+        """Round-robin over clients, skipping workflows already at their concurrency cap."""
+        for client in list(self._pending):
+            queue = self._pending[client]
+            for job in queue:
+                if self._running.get(job.workflow, 0) < self.max_per_workflow:
+                    queue.remove(job)
+                    # Rotate this client to the back so others get the next slot
+                    self._pending.move_to_end(client)
+                    if not queue:
+                        del self._pending[client]
+                    return job
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopped:
+                    job = self._next_job()
+                    if job:
+                        break
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                self._running[job.workflow] = self._running.get(job.workflow, 0) + 1
+                job.status = "running"
+                job.started = datetime.now()
+
+            token = _current_job.set(job)
+            result, status, error = None, "failed", None
+            try:
+                result = job.fn(job)
+                status = "cancelled" if job.cancel_requested else "succeeded"
+            except JobCancelled:
+                status = "cancelled"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                job.write_log(traceback.format_exc())
+            finally:
+                _current_job.reset(token)
+                with self._cond:
+                    job.result = result
+                    job.error = error
+                    job.status = status
+                    job.finished = datetime.now()
+                    self._running[job.workflow] -= 1
+                    self._trim_history()
+                    self._cond.notify_all()
@@ -0,0 +1,457 @@
+"""
+Opportunity-to-entity matching.
+Notices are indexed by (NAICS, set-aside) and by (NAICS, set-aside, agency), each
+posting list sorted by response deadline. An entity's capability profile expands to
+the few keys it can bid on (its NAICS codes x its eligible set-asides, plus its
+preferred agencies), so matching reads only the head of those lists instead of
+scanning every notice.
+
+Matches are kept as a ranked top-N per entity. New notices are matched by probing
+every profile against an index of just those notices and merging the results, so a
+nightly run only re-probes all notices for entities whose profile changed.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+from heapq import merge
+from itertools import groupby
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator
+import math
+import threading
+import time
+
+from config import Config
+from utils import codec
+
+
+# check_certifications() flag -> typeOfSetAside codes it makes an entity eligible for
+SET_ASIDE_CODES = {
+    "small_business": ("SBA", "SBP"),
+    "8a_program": ("8A", "8AN"),
+    "hubzone": ("HUBZONE", "HZC", "HZS"),
+    "wosb": ("WOSB", "WOSBSS"),
+    "edwosb": ("EDWOSB", "EDWOSBSS", "WOSB", "WOSBSS"),
+    "sdvosb": ("SDVOSBC", "SDVOSBS")
+}
+UNRESTRICTED = ""
+
+PRIMARY_NAICS_WEIGHT = 0.6
+SECONDARY_NAICS_WEIGHT = 0.45
+SMALL_BUSINESS_WEIGHT = 0.2
+SOCIOECONOMIC_WEIGHT = 0.3
+AGENCY_WEIGHT = 0.1
+
+# (score, deadline timestamp, opportunity key)
+Match = Tuple[float, float, str]
+
+
+def normalize_set_aside(value: Optional[str]) -> str:
+    code = (value or "").strip().upper()
+    return UNRESTRICTED if code in ("NONE", "N/A") else code
+
+
+def set_aside_weight(code: str) -> float:
+    if code == UNRESTRICTED:
+        return 0.0
+    if code in SET_ASIDE_CODES["small_business"]:
+        return SMALL_BUSINESS_WEIGHT
+    return SOCIOECONOMIC_WEIGHT
+
+
+@lru_cache(maxsize=8192)
+def parse_deadline(value: Optional[str]) -> float:
+    """Response deadline as a timestamp; notices without one never expire."""
+    if not value:
+        return math.inf
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return math.inf
+
+
+def opportunity_key(opportunity: Dict[str, Any]) -> Optional[str]:
+    return (opportunity.get("notice_id") or opportunity.get("solicitation_number")
+            or opportunity.get("url"))
+
+
+class EntityProfile:
+    """What an entity can bid on: NAICS codes (primary first), set-asides, preferred agencies."""
+
+    __slots__ = ("uei", "name", "naics", "set_asides", "agencies", "eligible")
+
+    def __init__(self, uei: str, name: Optional[str] = None, naics: Iterable[str] = (),
+                 set_asides: Iterable[str] = (), agencies: Iterable[str] = (), eligible: bool = True):
+        self.uei = uei
+        self.name = name
+        self.naics = tuple(dict.fromkeys(n for n in naics if n))
+        self.set_asides = frozenset(normalize_set_aside(s) for s in set_asides) | {UNRESTRICTED}
+        self.agencies = frozenset(a.upper() for a in agencies if a)
+        self.eligible = eligible
+
+    @classmethod
+    def from_entity(cls, entity: Dict[str, Any], agencies: Iterable[str] = (),
+                    eligible: Optional[bool] = None) -> Optional["EntityProfile"]:
+        """Profile from a SAM record with entityRegistration/coreData and assertions.
+
+        eligible defaults to an active registration; pass the entity refresh result
+        (active and no exclusions) when it is known.
+        """
+        reg = entity.get("entityRegistration") or {}
+        core = entity.get("coreData") or {}
+        uei = reg.get("ueiSAM") or core.get("ueiSAM")
+        if not uei:
+            return None
+        goods = (entity.get("assertions") or {}).get("goodsAndServices") or {}
+        naics = [goods.get("primaryNaics")]
+        naics += [item.get("naicsCode") for item in goods.get("naicsList") or []]
+        from sba.client import SBACertificationChecker
+        certifications = SBACertificationChecker.check_certifications(entity)
+        set_asides = [
+            code for flag, held in certifications.items() if held
+            for code in SET_ASIDE_CODES.get(flag, ())
+        ]
+        if eligible is None:
+            eligible = reg.get("registrationStatus", "Active") == "Active"
+        return cls(uei, reg.get("legalBusinessName") or core.get("legalBusinessName"),
+                   naics, set_asides, agencies, eligible)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EntityProfile":
+        return cls(data["uei"], data.get("name"), data.get("naics", ()), data.get("set_asides", ()),
+                   data.get("agencies", ()), data.get("eligible", True))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uei": self.uei,
+            "name": self.name,
+            "naics": list(self.naics),
+            "set_asides": sorted(self.set_asides - {UNRESTRICTED}),
+            "agencies": sorted(self.agencies),
+            "eligible": self.eligible
+        }
+
+    def explain(self, opportunity: Dict[str, Any]) -> List[str]:
+        """Why a notice matched, for the match report."""
+        reasons = []
+        naics = opportunity.get("naics_code")
+        if naics in self.naics:
+            reasons.append(f"{'primary' if naics == self.naics[0] else 'secondary'} NAICS {naics}")
+        set_aside = normalize_set_aside(opportunity.get("set_aside"))
+        reasons.append(f"{set_aside} set-aside" if set_aside else "unrestricted")
+        if (opportunity.get("agency") or "").upper() in self.agencies:
+            reasons.append("preferred agency")
+        return reasons
+
+
+class OpportunityIndex:
+    """Normalized notices (see sba.client.extract_opportunities) indexed for matching.
+
+    With a path, notices are appended to a JSONL log as they arrive and reloaded on
+    first use. Replaced notices (same key, amended content) are tombstoned; they and
+    notices past their deadline are dropped at the next compaction.
+    """
+
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.records: List[Optional[Dict[str, Any]]] = []
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        # (naics, set_aside) and (naics, set_aside, agency) -> [(deadline, id)]
+        self._postings: Dict[tuple, List[Tuple[float, int]]] = {}
+        self._unsorted: set = set()
+        self._log_lines = 0
+        self._loaded = self.path is None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        self._ensure_loaded()
+        return key in self._ids
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        opp_id = self._ids.get(key)
+        return self.records[opp_id] if opp_id is not None else None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path and self.path.exists():
+                with open(self.path, "rb") as f:
+                    for line in f:
+                        try:
+                            record = codec.loads(line)
+                        except ValueError:
+                            # Truncated last line from an interrupted append
+                            continue
+                        key = opportunity_key(record)
+                        if key:
+                            self._replace(key, record)
+                        self._log_lines += 1
+            self._loaded = True
+
+    def add_many(self, opportunities: Iterable[Dict[str, Any]]) -> List[int]:
+        """Index new or amended notices, log them in one write, and return their IDs."""
+        self._ensure_loaded()
+        added = []
+        changed = []
+        with self._lock:
+            for opportunity in opportunities:
+                key = opportunity_key(opportunity)
+                if not key:
+                    continue
+                previous = self._ids.get(key)
+                if previous is not None and self.records[previous] == opportunity:
+                    continue
+                added.append(self._replace(key, opportunity))
+                changed.append(opportunity)
+            if changed and self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(b"".join(codec.dumps(r) + b"\n" for r in changed))
+                self._log_lines += len(changed)
+                if self._log_lines > len(self._ids) * (1 + self.COMPACT_RATIO) + 100:
+                    self.compact()
+                    added = [self._ids[opportunity_key(r)] for r in changed
+                             if opportunity_key(r) in self._ids]
+        return added
+
+    def _replace(self, key: str, record: Dict[str, Any]) -> int:
+        previous = self._ids.get(key)
+        if previous is not None:
+            self.records[previous] = None
+        opp_id = len(self.records)
+        self.records.append(record)
+        self._keys.append(key)
+        self._ids[key] = opp_id
+
+        entry = (parse_deadline(record.get("response_deadline")), opp_id)
+        pair = (record.get("naics_code") or "", normalize_set_aside(record.get("set_aside")))
+        for key in (pair, pair + ((record.get("agency") or "").upper(),)):
+            postings = self._postings.get(key)
+            if postings is None:
+                postings = self._postings[key] = []
+            postings.append(entry)
+            self._unsorted.add(key)
+        return opp_id
+
+    def compact(self, now: Optional[float] = None) -> None:
+        """Rebuild without replaced or past-deadline notices and rewrite the log."""
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        with self._lock:
+            live = [
+                r for r in self.records
+                if r is not None and parse_deadline(r.get("response_deadline")) >= now
+            ]
+            self.records = []
+            self._keys = []
+            self._ids = {}
+            self._postings = {}
+            self._unsorted = set()
+            for record in live:
+                self._replace(opportunity_key(record), record)
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(b"".join(codec.dumps(r) + b"\n" for r in live))
+                tmp.replace(self.path)
+                self._log_lines = len(live)
+
+    def subset(self, ids: Iterable[int]) -> "OpportunityIndex":
+        """In-memory index over some notices, e.g. the ones a scan just added."""
+        delta = OpportunityIndex()
+        for opp_id in ids:
+            record = self.records[opp_id]
+            if record is not None:
+                delta._replace(self._keys[opp_id], record)
+        return delta
+
+    def probe(self, profile: EntityProfile, limit: int, cutoff: float = 0.0) -> List[Match]:
+        """Top notices for one profile, best score first, then earliest deadline.
+
+        Only notices with a NAICS code the entity registered, a set-aside it is
+        eligible for (or none) and a deadline at or after cutoff are considered.
+        """
+        self._ensure_loaded()
+        if not profile.eligible or not profile.naics:
+            return []
+        with self._lock:
+            if self._unsorted:
+                for key in self._unsorted:
+                    self._postings[key].sort()
+                self._unsorted.clear()
+
+            # Each (naics, set-aside) pair has one score; notices from preferred
+            # agencies are also reached through their own, higher-scoring postings
+            candidates: List[Tuple[float, tuple]] = []
+            for rank, naics in enumerate(profile.naics):
+                weight = PRIMARY_NAICS_WEIGHT if rank == 0 else SECONDARY_NAICS_WEIGHT
+                for set_aside in profile.set_asides:
+                    pair = (naics, set_aside)
+                    if pair not in self._postings:
+                        continue
+                    score = weight + set_aside_weight(set_aside)
+                    candidates.append((round(score, 3), pair))
+                    for agency in profile.agencies:
+                        if pair + (agency,) in self._postings:
+                            candidates.append((round(score + AGENCY_WEIGHT, 3), pair + (agency,)))
+            candidates.sort(key=lambda item: -item[0])
+
+            found: List[Match] = []
+            seen = set()
+            for score, tier in groupby(candidates, key=lambda item: item[0]):
+                streams = [self._open(key, cutoff) for _, key in tier]
+                for _, opp_id in merge(*streams):
+                    if opp_id in seen or self.records[opp_id] is None:
+                        continue
+                    seen.add(opp_id)
+                    found.append((score, self._deadline(opp_id), self._keys[opp_id]))
+                    if len(found) >= limit:
+                        return found
+            return found
+
+    def _open(self, key: tuple, cutoff: float) -> Iterator[Tuple[float, int]]:
+        postings = self._postings[key]
+        start = bisect_left(postings, (cutoff,))
+        return (postings[i] for i in range(start, len(postings)))
+
+    def _deadline(self, opp_id: int) -> float:
+        return parse_deadline(self.records[opp_id].get("response_deadline"))
+
+
+class MatchingEngine:
+    """Ranked top-N notices per tracked entity, maintained incrementally."""
+
+    def __init__(self, index: Optional[OpportunityIndex] = None, limit: Optional[int] = None,
+                 min_days_to_respond: float = 0):
+        self.index = index if index is not None else OpportunityIndex(Config.MATCH_INDEX_PATH)
+        self.limit = limit or Config.MATCH_LIMIT
+        self.min_days_to_respond = min_days_to_respond
+        self.profiles: Dict[str, EntityProfile] = {}
+        self.matches: Dict[str, List[Match]] = {}
+
+    def cutoff(self) -> float:
+        return time.time() + self.min_days_to_respond * 86400
+
+    def set_profiles(self, profiles: Iterable[EntityProfile]) -> List[str]:
+        """Replace the tracked profiles. Returns UEIs that are new or changed and need match_all."""
+        profiles = {p.uei: p for p in profiles}
+        changed = [
+            uei for uei, profile in profiles.items()
+            if uei not in self.profiles or self.profiles[uei].to_dict() != profile.to_dict()
+        ]
+        self.profiles = profiles
+        self.matches = {uei: m for uei, m in self.matches.items() if uei in profiles}
+        return changed
+
+    def match_all(self, ueis: Optional[Iterable[str]] = None) -> int:
+        """Probe the full index for the given entities (default: all). Returns match count."""
+        cutoff = self.cutoff()
+        total = 0
+        for uei in (self.profiles if ueis is None else ueis):
+            found = self.index.probe(self.profiles[uei], self.limit, cutoff)
+            self.matches[uei] = found
+            total += len(found)
+        return total
+
+    def add_opportunities(self, opportunities: Iterable[Dict[str, Any]]) -> int:
+        """Index notices and fold the new or amended ones into every entity's matches."""
+        new_ids = self.index.add_many(opportunities)
+        if not new_ids:
+            return 0
+        if len(new_ids) * 2 >= len(self.index):
+            # Mostly new notices (e.g. first run): probing the full index is cheaper
+            self.match_all()
+            return len(new_ids)
+
+        delta = self.index.subset(new_ids)
+        new_keys = {opportunity_key(self.index.records[i]) for i in new_ids}
+        cutoff = self.cutoff()
+        refill = []
+        for uei, profile in self.profiles.items():
+            found = delta.probe(profile, self.limit, cutoff)
+            current = self.matches.get(uei, [])
+            kept = [m for m in current if m[2] not in new_keys]
+            if len(kept) < len(current) and len(current) >= self.limit:
+                # An amended notice left a full list; lower-ranked notices may now qualify
+                refill.append(uei)
+            elif found or len(kept) < len(current):
+                self.matches[uei] = self._top(kept + found)
+        self.match_all(refill)
+        return len(new_ids)
+
+    def prune(self) -> int:
+        """Drop matches past the response cutoff or no longer in the index.
+
+        Entities whose full list lost entries are re-probed to fill it back up.
+        """
+        cutoff = self.cutoff()
+        dropped = 0
+        refill = []
+        for uei, current in self.matches.items():
+            kept = [m for m in current if m[1] >= cutoff and m[2] in self.index]
+            if len(kept) < len(current):
+                dropped += len(current) - len(kept)
+                if len(current) >= self.limit and uei in self.profiles:
+                    refill.append(uei)
+            self.matches[uei] = kept
+        self.match_all(refill)
+        return dropped
+
+    def _top(self, matches: List[Match]) -> List[Match]:
+        matches.sort(key=lambda m: (-m[0], m[1], m[2]))
+        return matches[:self.limit]
+
+    def ranked(self, uei: str) -> List[Dict[str, Any]]:
+        """Matches for one entity with notice details and match reasons."""
+        profile = self.profiles.get(uei)
+        results = []
+        for score, _, key in self.matches.get(uei, []):
+            opportunity = self.index.get(key)
+            if opportunity is None:
+                continue
+            results.append({
+                "key": key,
+                "score": score,
+                "reasons": profile.explain(opportunity) if profile else [],
+                **opportunity
+            })
+        return results
+
+    def load_state(self, path: Path) -> None:
+        """Restore profiles and matches saved by save_state."""
+        if not path.exists():
+            return
+        try:
+            state = codec.load_file(path)
+        except (OSError, ValueError):
+            return
+        self.profiles = {
+            data["uei"]: EntityProfile.from_dict(data) for data in state.get("profiles", [])
+        }
+        self.matches = {
+            uei: [(m["score"], parse_deadline(m.get("response_deadline")), m["key"]) for m in matches]
+            for uei, matches in state.get("matches", {}).items()
+        }
+
+    def save_state(self, path: Path, **extra: Any) -> None:
+        codec.dump_file({
+            **extra,
+            "opportunities_indexed": len(self.index),
+            "profiles": [p.to_dict() for p in self.profiles.values()],
+            "matches": {uei: self.ranked(uei) for uei in self.profiles}
+        }, path, pretty=True, atomic=True)
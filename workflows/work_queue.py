@@ -0,0 +1,255 @@
+"""
+Durable work queue with leases and visibility timeouts.
+Lets several worker processes share one workflow run: each claims a batch of items,
+holds a lease while working and acknowledges the result. Items whose lease expires
+(crashed or stalled worker) become claimable again until max_attempts is reached.
+
+Backed by a local SQLite file in WAL mode, which is safe for many processes on one
+host. Hosts sharing a network filesystem should not point at the same file.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from typing import Optional, Dict, Any, List, Iterable
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import Config
+from utils import codec
+
+
+class WorkItem:
+    """One claimed item. Only the leasing worker can ack or nack it."""
+
+    __slots__ = ("run_id", "key", "payload", "attempts", "lease_expires")
+
+    def __init__(self, run_id: str, key: str, payload: Any, attempts: int, lease_expires: float):
+        self.run_id = run_id
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_expires = lease_expires
+
+    def __repr__(self) -> str:
+        return f"WorkItem({self.run_id!r}, {self.key!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """Named SQLite-backed queue of work items grouped by run ID."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS work_items (
+            queue TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            payload BLOB,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL NOT NULL DEFAULT 0,
+            result BLOB,
+            error TEXT,
+            enqueued REAL NOT NULL DEFAULT 0,
+            updated REAL NOT NULL,
+            PRIMARY KEY (queue, run_id, item_key)
+        );
+        CREATE INDEX IF NOT EXISTS work_items_claim
+            ON work_items (queue, run_id, status, lease_expires);
+        CREATE INDEX IF NOT EXISTS work_items_enqueued ON work_items (queue, enqueued);
+    """
+
+    # Expired leases that already used their last attempt can never be claimed again
+    EFFECTIVE_STATUS = (
+        "CASE WHEN status IN ('pending', 'leased') AND attempts >= ? AND lease_expires < ? "
+        "THEN 'failed' ELSE status END"
+    )
+
+    def __init__(self, queue: str, path: Optional[str] = None,
+                 visibility_timeout: Optional[float] = None,
+                 max_attempts: Optional[int] = None):
+        self.queue = queue
+        self.path = Path(path or Config.WORK_QUEUE_PATH)
+        self.visibility_timeout = visibility_timeout or Config.WORK_QUEUE_VISIBILITY_SECONDS
+        self.max_attempts = max_attempts or Config.WORK_QUEUE_MAX_ATTEMPTS
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def new_worker_id() -> str:
+        return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; writers serialize through BEGIN IMMEDIATE."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._connect()
+        return _Transaction(conn)
+
+    def enqueue(self, run_id: str, items: Iterable[str],
+                payloads: Optional[Dict[str, Any]] = None) -> int:
+        """Add items to a run in one transaction. Keys already in the run are ignored."""
+        payloads = payloads or {}
+        now = time.time()
+        with self._transaction() as conn:
+            start = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM work_items WHERE queue = ? AND run_id = ?",
+                (self.queue, run_id)
+            ).fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO work_items (queue, run_id, item_key, seq, payload, enqueued, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (self.queue, run_id, key, start + i,
+                     codec.dumps(payloads[key]) if key in payloads else None, now, now)
+                    for i, key in enumerate(items)
+                ]
+            )
+            return conn.total_changes - before
+
+    def claim(self, run_id: str, worker_id: str, limit: int = 10) -> List[WorkItem]:
+        """Lease up to `limit` pending or lease-expired items, oldest first."""
+        now = time.time()
+        expires = now + self.visibility_timeout
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT item_key, payload, attempts FROM work_items "
+                "WHERE queue = ? AND run_id = ? AND attempts < ? "
+                "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY seq LIMIT ?",
+                (self.queue, run_id, self.max_attempts, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE work_items SET status = 'leased', attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires = ?, updated = ? "
+                "WHERE queue = ? AND run_id = ? AND item_key = ?",
+                [(worker_id, expires, now, self.queue, run_id, key) for key, _, _ in rows]
+            )
+        return [
+            WorkItem(run_id, key, codec.loads(payload) if payload else None, attempts + 1, expires)
+            for key, payload, attempts in rows
+        ]
+
+    def extend(self, item: WorkItem, worker_id: str) -> bool:
+        """Renew a lease for slow items. False if the lease was already lost."""
+        expires = time.time() + self.visibility_timeout
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET lease_expires = ?, updated = ? "
+                "WHERE queue = ? AND run_id = ? AND item_key = ? AND status = 'leased' AND lease_owner = ?",
+                (expires, time.time(), self.queue, item.run_id, item.key, worker_id)
+            )
+        if cursor.rowcount:
+            item.lease_expires = expires
+        return bool(cursor.rowcount)
+
+    def ack(self, item: WorkItem, worker_id: str, result: Any = None) -> bool:
+        """Mark an item done. False if another worker has since taken over the lease."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET status = 'done', result = ?, error = NULL, "
+                "lease_owner = NULL, updated = ? "
+                "WHERE queue = ? AND run_id = ? AND item_key = ? AND status = 'leased' AND lease_owner = ?",
+                (codec.dumps(result), time.time(), self.queue, item.run_id, item.key, worker_id)
+            )
+        return bool(cursor.rowcount)
+
+    def nack(self, item: WorkItem, worker_id: str, error: str = "") -> bool:
+        """Release an item for retry, or fail it once it has used all its attempts."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_owner = NULL, lease_expires = 0, updated = ? "
+                "WHERE queue = ? AND run_id = ? AND item_key = ? AND status = 'leased' AND lease_owner = ?",
+                (self.max_attempts, error, time.time(), self.queue, item.run_id, item.key, worker_id)
+            )
+        return bool(cursor.rowcount)
+
+    def release(self, item: WorkItem, worker_id: str) -> bool:
+        """Hand back an unstarted item (e.g. on shutdown) without spending an attempt."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET status = 'pending', attempts = MAX(attempts - 1, 0), "
+                "lease_owner = NULL, lease_expires = 0, updated = ? "
+                "WHERE queue = ? AND run_id = ? AND item_key = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time(), self.queue, item.run_id, item.key, worker_id)
+            )
+        return bool(cursor.rowcount)
+
+    def stats(self, run_id: str) -> Dict[str, int]:
+        """Item counts by status; expired leases that ran out of attempts count as failed."""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        now = time.time()
+        rows = self._connect().execute(
+            f"SELECT {self.EFFECTIVE_STATUS}, COUNT(*) "
+            "FROM work_items WHERE queue = ? AND run_id = ? GROUP BY 1",
+            (self.max_attempts, now, self.queue, run_id)
+        ).fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def is_drained(self, run_id: str) -> bool:
+        """True once no item can still be claimed or is held under a live lease."""
+        counts = self.stats(run_id)
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def results(self, run_id: str) -> List[Dict[str, Any]]:
+        """All items of a run in enqueue order with status, attempts, result and error."""
+        rows = self._connect().execute(
+            f"SELECT item_key, {self.EFFECTIVE_STATUS}, attempts, result, error FROM work_items "
+            "WHERE queue = ? AND run_id = ? ORDER BY seq",
+            (self.max_attempts, time.time(), self.queue, run_id)
+        ).fetchall()
+        return [
+            {
+                "key": key,
+                "status": status,
+                "attempts": attempts,
+                "result": codec.loads(result) if result else None,
+                "error": error
+            }
+            for key, status, attempts, result, error in rows
+        ]
+
+    def latest_run(self) -> Optional[str]:
+        """Run that items were most recently enqueued to (run IDs need not sort by time)."""
+        row = self._connect().execute(
+            "SELECT run_id FROM work_items WHERE queue = ? ORDER BY enqueued DESC, rowid DESC LIMIT 1",
+            (self.queue,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def purge(self, run_id: str) -> int:
+        with self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM work_items WHERE queue = ? AND run_id = ?",
+                                  (self.queue, run_id))
+        return cursor.rowcount
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK on an autocommit connection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")